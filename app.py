@@ -7,9 +7,14 @@ GitHub: https://github.com/siddhesh17b
 """
 
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, simpledialog
+from collections import Counter
 
-from data_manager import load_data, save_data, get_app_data, parse_timetable_csv
+from data_manager import load_data, save_data, get_app_data, parse_timetable_csv, ALL_CHANGES, flush, \
+    check_save_error, AttendanceError
+import profile_manager
+import profiling
+from profiling import timed
 from modern_dialogs import messagebox
 from setup_tab import SetupTab
 from timetable_tab import TimetableTab
@@ -20,6 +25,88 @@ from summary_tab import SummaryTab
 COLOR_INFO = "#007bff"
 COLOR_BG_LIGHT = "#ffffff"  # Pure white for modern look
 
+SAVE_ERROR_POLL_MS = 1000  # How often background save failures are checked
+
+
+class ChangeBus:
+    """
+    Change-notification bus between the tabs
+    
+    Mutations publish WHAT changed (topics like CHANGE_HOLIDAYS, CHANGE_ABSENCES,
+    see data_manager) and optionally which dates; each tab subscribes to the
+    topics it displays and updates only the affected widgets.
+    
+    Tabs that are not visible are not repainted: their changes are accumulated
+    (marked stale) and delivered in one go by deliver_stale() when the tab is
+    shown again.
+    """
+    
+    def __init__(self):
+        self.subscribers = []
+    
+    def subscribe(self, callback, topics, is_visible=None):
+        """
+        Call callback(changed_topics, dates) when any of the topics is published
+        
+        Args:
+            callback: Handler taking (set of changed topics, set of dates or None)
+            topics: Topics the subscriber displays
+            is_visible: Optional function returning False while the subscriber
+                        is hidden - changes are then deferred until it is shown
+        """
+        self.subscribers.append({
+            "callback": callback,
+            "topics": frozenset(topics),
+            "is_visible": is_visible,
+            "stale_changes": set(),
+            "stale_dates": set(),
+        })
+    
+    def publish(self, topics, dates=None):
+        """Notify subscribers watching any of the changed topics
+        
+        Args:
+            topics: Set of changed topics
+            dates: Set of affected "YYYY-MM-DD" dates, or None if not date-specific
+        """
+        for subscriber in self.subscribers:
+            changed = subscriber["topics"] & topics
+            if not changed:
+                continue
+            
+            changed_dates = None if dates is None else set(dates)
+            
+            # Merge with anything already pending for this subscriber
+            if subscriber["stale_changes"]:
+                changed = changed | subscriber["stale_changes"]
+                stale_dates = subscriber["stale_dates"]
+                if changed_dates is not None and stale_dates is not None:
+                    changed_dates |= stale_dates
+                else:
+                    changed_dates = None
+            
+            if subscriber["is_visible"] is not None and not subscriber["is_visible"]():
+                # Hidden - repaint later, when shown
+                subscriber["stale_changes"] = set(changed)
+                subscriber["stale_dates"] = changed_dates
+                continue
+            
+            subscriber["stale_changes"] = set()
+            subscriber["stale_dates"] = set()
+            subscriber["callback"](changed, changed_dates)
+    
+    def deliver_stale(self):
+        """Deliver deferred changes to subscribers that have become visible"""
+        for subscriber in self.subscribers:
+            if not subscriber["stale_changes"]:
+                continue
+            if subscriber["is_visible"] is not None and not subscriber["is_visible"]():
+                continue
+            changed, dates = subscriber["stale_changes"], subscriber["stale_dates"]
+            subscriber["stale_changes"] = set()
+            subscriber["stale_dates"] = set()
+            subscriber["callback"](changed, dates)
+
 
 class BunkBuddyApp:
     """Main application class"""
@@ -40,8 +127,16 @@ class BunkBuddyApp:
         # Optimize rendering
         self.root.update_idletasks()
         
+        # Changes waiting to be published (coalesced until the next refresh)
+        self.change_bus = ChangeBus()
+        self.pending_changes = set()
+        self.pending_dates = set()
+        self.refresh_scheduled = False
+        
         # Load data first, then check if setup is needed
+        # Only the active profile's file is read at startup
         # Note: load_data() updates app_data in-place, so we must call it BEFORE get_app_data()
+        profile_manager.activate_active_profile()
         data_loaded = load_data()
         app_data = get_app_data()  # Now get reference to the loaded data
         
@@ -51,6 +146,95 @@ class BunkBuddyApp:
         # Create main UI
         self.create_ui()
         # Initial tab will refresh on its own during creation
+        
+        # Saves are written behind - make sure the last ones reach the disk,
+        # and tell the user right away if one fails
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(SAVE_ERROR_POLL_MS, self.poll_save_errors)
+        
+        # Timing panel - only when started with BUNKMETER_PROFILE set
+        if profiling.ENABLED:
+            self.root.bind_all("<Control-P>", self.show_profile_stats)
+    
+    def on_profile_selected(self, event=None):
+        """Switch to the selected profile without restarting"""
+        name = self.profile_var.get()
+        try:
+            switched = profile_manager.switch_profile(name)
+        except AttendanceError as e:
+            # Unsaved changes or an unreadable file - the current profile stays
+            switched = False
+            messagebox.showerror("Error", f"Could not switch to profile '{name}':\n{str(e)}")
+        else:
+            if not switched:
+                messagebox.showerror("Error", f"Could not switch to profile '{name}'")
+        if not switched:
+            self.profile_var.set(profile_manager.get_active_profile())
+            return
+        
+        # Everything on screen belongs to the previous profile
+        self.refresh_all_tabs()
+        if not get_app_data().get("batch"):
+            messagebox.showinfo(
+                "Setup Required",
+                f"Profile '{name}' has no data yet.\nPlease select a batch and semester dates in the Setup tab."
+            )
+            self.notebook.select(0)
+    
+    def on_new_profile(self):
+        """Create a profile (seeded with this batch, semester and holidays) and switch to it"""
+        name = simpledialog.askstring("New Profile", "Student / profile name:", parent=self.root)
+        if name is None:
+            return
+        name = name.strip()
+        if not profile_manager.create_profile(name):
+            messagebox.showerror("Error", "Please enter a new, non-empty profile name")
+            return
+        self.profile_combo.configure(values=profile_manager.list_profiles())
+        self.profile_var.set(name)
+        self.on_profile_selected()
+    
+    def poll_save_errors(self):
+        """Show background save failures (the write is retried meanwhile)"""
+        check_save_error()
+        self.root.after(SAVE_ERROR_POLL_MS, self.poll_save_errors)
+    
+    def on_close(self):
+        """Flush pending saves, then close the window"""
+        flush()
+        self.root.destroy()
+    
+    def show_profile_stats(self, event=None):
+        """Ctrl+Shift+P - window with the call counts and times of the timed functions"""
+        window = tk.Toplevel(self.root)
+        window.title("BunkMeter - Timings")
+        window.geometry("820x520")
+        
+        text = tk.Text(window, font=("Consolas", 10), wrap=tk.NONE)
+        scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        
+        def fill():
+            text.configure(state=tk.NORMAL)
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, profiling.format_stats())
+            cprofile_text = profiling.format_cprofile()
+            if cprofile_text:
+                text.insert(tk.END, "\n\ncProfile (cumulative):\n" + cprofile_text)
+            text.configure(state=tk.DISABLED)
+        
+        def reset():
+            profiling.reset_stats()
+            fill()
+        
+        buttons = ttk.Frame(window, padding=8)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X)
+        ttk.Button(buttons, text="Refresh", command=fill).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Reset", command=reset).pack(side=tk.LEFT, padx=8)
+        ttk.Button(buttons, text="Close", command=window.destroy).pack(side=tk.RIGHT)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text.pack(fill=tk.BOTH, expand=True)
+        fill()
     
     def show_first_time_setup(self):
         """
@@ -212,7 +396,7 @@ class BunkBuddyApp:
             1. Check if batch is selected
             2. Parse timetable to get subjects for selected batch
             3. Ensure subjects exist (prevents empty subject list)
-            4. Initialize all subjects with empty absent_dates (present by default)
+            4. Initialize all subjects with an empty absence store (present by default)
             
             To add custom validation:
             - Add checks before the app_data initialization
@@ -248,7 +432,7 @@ class BunkBuddyApp:
                     "weekly_count": count,
                     "total_override": None,
                     "attendance_override": None,
-                    "absent_dates": []  # All classes present by default
+                    "absent_dates": Counter()  # {date: classes missed} - all present by default
                 }
                 for subject, count in weekly_counts.items()
             ]
@@ -281,6 +465,42 @@ class BunkBuddyApp:
             fg="white"
         ).pack(side=tk.LEFT, padx=25, pady=12)
         
+        # Profile (student) selector on the right
+        tk.Button(
+            title_frame,
+            text="+ New",
+            font=("Segoe UI", 10, "bold"),
+            bg="#1a73e8",
+            fg="white",
+            activebackground="#1557b0",
+            activeforeground="white",
+            relief=tk.FLAT,
+            bd=0,
+            padx=12,
+            cursor="hand2",
+            command=self.on_new_profile
+        ).pack(side=tk.RIGHT, padx=(5, 25), pady=12)
+        
+        self.profile_var = tk.StringVar(value=profile_manager.get_active_profile())
+        self.profile_combo = ttk.Combobox(
+            title_frame,
+            textvariable=self.profile_var,
+            values=profile_manager.list_profiles(),
+            state="readonly",
+            width=18,
+            font=("Segoe UI", 11)
+        )
+        self.profile_combo.pack(side=tk.RIGHT, pady=12)
+        self.profile_combo.bind("<<ComboboxSelected>>", self.on_profile_selected)
+        
+        tk.Label(
+            title_frame,
+            text="Profile:",
+            font=("Segoe UI", 11),
+            bg="#000000",
+            fg="#bbbbbb"
+        ).pack(side=tk.RIGHT, padx=8, pady=12)
+        
         # Configure ttk style for modern ribbon-style tabs
         style = ttk.Style()
         style.theme_use('clam')  # Use clam theme for better customization
@@ -347,6 +567,8 @@ class BunkBuddyApp:
                 self.current_tab_index = new_index
                 # Quick flash effect
                 self.notebook.configure(style='TNotebook')
+                # Repaint the newly shown tab if it went stale while hidden
+                self.change_bus.deliver_stale()
         
         self.notebook.bind('<<NotebookTabChanged>>', on_tab_changed)
         
@@ -377,32 +599,67 @@ class BunkBuddyApp:
         
         # Create tabs
         self.setup_tab = SetupTab(self.notebook, self.refresh_all_tabs)
-        self.notebook.add(self.setup_tab.create(), text="⚙️ Setup")
+        setup_frame = self.setup_tab.create()
+        self.notebook.add(setup_frame, text="⚙️ Setup")
         
         self.timetable_tab = TimetableTab(self.notebook, self.refresh_all_tabs)
-        self.notebook.add(self.timetable_tab.create(), text="📋 Timetable")
+        timetable_frame = self.timetable_tab.create()
+        self.notebook.add(timetable_frame, text="📋 Timetable")
         
         self.attendance_calendar = AttendanceCalendar(self.notebook, self.refresh_all_tabs)
-        self.notebook.add(self.attendance_calendar.create(), text="📅 Mark Attendance")
+        calendar_frame = self.attendance_calendar.create()
+        self.notebook.add(calendar_frame, text="📅 Mark Attendance")
         
         self.summary_tab = SummaryTab(self.notebook, self.refresh_all_tabs)
-        self.notebook.add(self.summary_tab.create(), text="📊 Summary")
+        summary_frame = self.summary_tab.create()
+        self.notebook.add(summary_frame, text="📊 Summary")
+        
+        # Each tab subscribes to the changes it displays; hidden tabs are only
+        # marked stale and repainted when the user switches to them
+        self.change_bus.subscribe(self.setup_tab.on_data_changed, SetupTab.WATCHED_CHANGES,
+                                  self._tab_visibility(setup_frame))
+        self.change_bus.subscribe(self.timetable_tab.on_data_changed, TimetableTab.WATCHED_CHANGES,
+                                  self._tab_visibility(timetable_frame))
+        self.change_bus.subscribe(self.attendance_calendar.on_data_changed, AttendanceCalendar.WATCHED_CHANGES,
+                                  self._tab_visibility(calendar_frame))
+        self.change_bus.subscribe(self.summary_tab.on_data_changed, SummaryTab.WATCHED_CHANGES,
+                                  self._tab_visibility(summary_frame))
+    
+    def _tab_visibility(self, tab_frame):
+        """Return a function telling whether tab_frame is the selected notebook tab"""
+        return lambda: self.notebook.select() == str(tab_frame)
     
-    def refresh_all_tabs(self):
-        """Refresh all tab displays"""
+    def refresh_all_tabs(self, *changes, dates=None):
+        """
+        Publish a data change to the tabs
+        
+        Args:
+            *changes: Changed topics (data_manager.CHANGE_*); none = everything changed
+            dates: Optional iterable of affected "YYYY-MM-DD" dates
+                   (None = not limited to specific dates)
+        
+        Changes published in quick succession are coalesced into one refresh.
+        """
+        self.pending_changes.update(changes or ALL_CHANGES)
+        if dates is None:
+            self.pending_dates = None
+        elif self.pending_dates is not None:
+            self.pending_dates.update(dates)
+        
         # Defer refresh to avoid blocking UI
-        self.root.after(10, self._do_refresh)
+        if not self.refresh_scheduled:
+            self.refresh_scheduled = True
+            self.root.after(10, self._do_refresh)
     
+    @timed()
     def _do_refresh(self):
-        """Actual refresh logic with optimized order"""
-        if hasattr(self, 'setup_tab'):
-            self.setup_tab.refresh()
-        if hasattr(self, 'timetable_tab'):
-            self.timetable_tab.refresh()
-        if hasattr(self, 'attendance_calendar'):
-            self.attendance_calendar.refresh()
-        if hasattr(self, 'summary_tab'):
-            self.summary_tab.refresh()
+        """Deliver the pending changes to the subscribed tabs"""
+        changes, dates = self.pending_changes, self.pending_dates
+        self.pending_changes = set()
+        self.pending_dates = set()
+        self.refresh_scheduled = False
+        if changes:
+            self.change_bus.publish(changes, dates)
 
 
 def main():
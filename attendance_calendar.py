@@ -15,8 +15,16 @@ from tkinter import ttk
 import calendar
 from datetime import datetime, date
 
-from data_manager import get_app_data, save_data, get_subjects_for_day
+from data_manager import (
+    get_app_data, save_data, get_subjects_for_day, get_subject,
+    set_absent_count, remove_absence, get_day_absent_count,
+    add_holiday, remove_holiday_days, find_holiday,
+    add_skipped_period, remove_skipped_days, find_skipped_period,
+    ALL_CHANGES, CHANGE_HOLIDAYS, CHANGE_SKIPPED, CHANGE_ABSENCES, CHANGE_OVERRIDES,
+)
+from calculations import get_holiday_index, get_month_statuses
 from modern_dialogs import messagebox
+from profiling import timed
 
 # Color scheme for day status
 COLOR_PRESENT = "#ACDAAD"  #  all classes present
@@ -27,11 +35,26 @@ COLOR_TODAY = "#A7D9FD"    # current day
 COLOR_WEEKEND = "#C9C9C9"  # weekend
 COLOR_FUTURE = "#FFFFFF"   # future dates (outside semester)
 COLOR_FUTURE_IN_SEM = "#C0C8F8"  #  future dates within semester
+COLOR_EMPTY_CELL = "#FAFAFA"  # grid cells outside the month
+
+# Color of past days by status (see calculations.get_month_statuses)
+STATUS_COLORS = {
+    "no_class": COLOR_FUTURE,  # Outside semester or no classes
+    "holiday": COLOR_HOLIDAY,
+    "skipped": COLOR_SKIPPED,  # All classes absent
+    "absent": COLOR_ABSENT,
+    "present": COLOR_PRESENT,
+}
 
 
 class AttendanceCalendar:
     """Google Calendar-style monthly attendance view"""
     
+    # Change topics this tab displays (see app.ChangeBus)
+    WATCHED_CHANGES = ALL_CHANGES - {CHANGE_OVERRIDES}
+    # Changes that can be applied by recoloring the affected dates only
+    DATE_SCOPED_CHANGES = frozenset({CHANGE_HOLIDAYS, CHANGE_SKIPPED, CHANGE_ABSENCES})
+    
     def __init__(self, notebook, refresh_callback):
         self.notebook = notebook
         self.refresh_all_tabs = refresh_callback
@@ -40,7 +63,9 @@ class AttendanceCalendar:
         self.selected_date = None
         self.calendar_frame = None
         self.subjects_panel = None
-        self.day_buttons = {}
+        self.day_buttons = {}  # date_str -> pooled button showing it
+        self.cell_buttons = []  # Persistent 7x6 pool of date buttons
+        self.cell_dates = []  # Date shown by each pooled button (None = empty cell)
         self.check_vars = {}  # Store checkbox variables at class level
     
     def create(self):
@@ -256,12 +281,11 @@ class AttendanceCalendar:
         # Check if ALL subjects (including multiple occurrences) are already absent
         all_absent = True
         for subject in subjects:
-            subject_data = next((s for s in app_data["subjects"] if s["name"] == subject), None)
+            subject_data = get_subject(subject)
             if subject_data:
-                absent_dates = subject_data.get("absent_dates", [])
-                # For subjects with multiple classes, check if date appears correct number of times
+                # For subjects with multiple classes, check the absence count covers every class
                 subject_count_on_day = subjects.count(subject)
-                absent_count_for_date = absent_dates.count(date_str)
+                absent_count_for_date = get_day_absent_count(app_data, subject_data, date_str)
                 if absent_count_for_date < subject_count_on_day:
                     all_absent = False
                     break
@@ -269,28 +293,17 @@ class AttendanceCalendar:
                 all_absent = False
                 break
         
-        # Initialize skipped_days if not exists
-        if "skipped_days" not in app_data:
-            app_data["skipped_days"] = []
-        
         # Check if this date is already a holiday (holidays take priority)
-        existing_holidays = set(h.get("date", h.get("start", "")) for h in app_data.get("holidays", []))
-        is_holiday = date_str in existing_holidays
+        is_holiday = self.is_holiday_date(date_str)
         
         if all_absent:
-            # Already completely skipped - make all present (remove ALL absences for this date)
-            for subject in subjects:
-                subject_data = next((s for s in app_data["subjects"] if s["name"] == subject), None)
+            # Already completely skipped - make all present: take the day out
+            # of its skipped period (splitting it if needed) and drop any marks
+            remove_skipped_days(app_data, date_str)
+            for subject in set(subjects):
+                subject_data = get_subject(subject)
                 if subject_data:
-                    # Remove ALL occurrences of this date (in case subject appears multiple times)
-                    while date_str in subject_data.get("absent_dates", []):
-                        subject_data["absent_dates"].remove(date_str)
-            
-            # Remove from skipped_days list (new format: {reason, date})
-            app_data["skipped_days"] = [
-                skipped for skipped in app_data["skipped_days"]
-                if skipped.get("date", skipped.get("start", "")) != date_str
-            ]
+                    remove_absence(subject_data, date_str)
         else:
             # Check if this date is a holiday - if so, don't allow marking absent
             if is_holiday:
@@ -298,30 +311,17 @@ class AttendanceCalendar:
                 return
             
             # Check if already a skipped day
-            existing_skipped = set(s.get("date", s.get("start", "")) for s in app_data.get("skipped_days", []))
-            if date_str in existing_skipped:
+            if find_skipped_period(app_data, date_str) is not None:
                 messagebox.showinfo("Info", "This date is already marked as skipped.")
                 return
             
-            # Not completely skipped - mark ALL occurrences of all subjects as absent
-            for subject in subjects:
-                subject_data = next((s for s in app_data["subjects"] if s["name"] == subject), None)
-                if subject_data:
-                    if "absent_dates" not in subject_data:
-                        subject_data["absent_dates"] = []
-                    # Add date (will be added once per occurrence in subjects list)
-                    subject_data["absent_dates"].append(date_str)
-            
-            # Add to skipped_days list (new format: {reason, date})
+            # Not completely skipped - a one-day skipped period marks ALL
+            # occurrences of all subjects absent
             formatted_date = date_obj.strftime("%d %b %Y")
-            app_data["skipped_days"].append({
-                "reason": f"Right-click: {formatted_date}",
-                "date": date_str
-            })
+            add_skipped_period(app_data, f"Right-click: {formatted_date}", date_str, date_str)
         
         save_data()
-        self.refresh()
-        self.refresh_all_tabs()
+        self.refresh_all_tabs(CHANGE_ABSENCES, CHANGE_SKIPPED, dates=[date_str])
     
     def show_subjects_panel(self, date_str, subjects):
         """Display subjects with checkboxes in side panel"""
@@ -464,7 +464,7 @@ class AttendanceCalendar:
         subject_absent_count = {}  # Track how many absences already accounted for
         
         for idx, subject in enumerate(subjects):
-            subject_data = next((s for s in app_data["subjects"] if s["name"] == subject), None)
+            subject_data = get_subject(subject)
             
             # Track occurrence number for subjects that appear multiple times
             occurrence = subject_occurrence_count.get(subject, 0) + 1
@@ -474,13 +474,12 @@ class AttendanceCalendar:
             subject_key = f"{subject}__occurrence_{occurrence}" if subjects.count(subject) > 1 else subject
             
             # Check if currently marked absent
-            # For subjects with multiple occurrences, we need to count how many times
-            # this date appears in absent_dates and match against occurrences
+            # For subjects with multiple occurrences, the first N occurrences
+            # are shown absent where N is the absence count for this date
             is_present = True
             if subject_data:
-                absent_dates = subject_data.get("absent_dates", [])
                 # Count total absences for this date
-                total_absences_for_date = absent_dates.count(date_str)
+                total_absences_for_date = get_day_absent_count(app_data, subject_data, date_str)
                 # How many have we already accounted for?
                 already_counted = subject_absent_count.get(subject, 0)
                 
@@ -536,76 +535,56 @@ class AttendanceCalendar:
     def save_attendance(self, date_str):
         """Save attendance for the selected date
         
-        Also syncs with skipped_days list:
-        - If ALL subjects are marked absent → add to skipped_days
-        - If ANY subject is marked present → remove from skipped_days
+        Also syncs with the skipped periods:
+        - If ALL subjects are marked absent → the date becomes a one-day skipped period
+        - If ANY subject is marked present → the date is cut out of its period
+          (splitting it) and the remaining absences are marked explicitly
         """
         app_data = get_app_data()
         
-        # Initialize skipped_days if not exists
-        if "skipped_days" not in app_data:
-            app_data["skipped_days"] = []
-        
         # Track if all subjects will be absent after save
         all_will_be_absent = True
         
-        # Update absent_dates for each subject based on checkbox state
+        # Count unchecked (absent) classes per subject
         # Handle subjects with multiple occurrences (e.g., "Physics Lab__occurrence_1")
+        absent_counts = {}
         for subject_key, var in self.check_vars.items():
             # Extract actual subject name (remove occurrence suffix if present)
             subject_name = subject_key.split("__occurrence_")[0] if "__occurrence_" in subject_key else subject_key
             
-            subject_data = next((s for s in app_data["subjects"] if s["name"] == subject_name), None)
+            subject_data = get_subject(subject_name)
             if not subject_data:
                 continue
             
-            if "absent_dates" not in subject_data:
-                subject_data["absent_dates"] = []
-            
             is_present = var.get()
             
             if is_present:
                 all_will_be_absent = False
             
-            if not is_present:
-                # Mark as absent - add to absent_dates (can have multiple entries for same date)
-                subject_data["absent_dates"].append(date_str)
-            else:
-                # Mark as present - remove ONE occurrence from absent_dates if exists
-                if date_str in subject_data["absent_dates"]:
-                    subject_data["absent_dates"].remove(date_str)
-        
-        # Sync with skipped_days list
-        # Check if this date is already in skipped_days
-        existing_skipped_dates = set(
-            s.get("date", s.get("start", "")) for s in app_data.get("skipped_days", [])
-        )
-        is_already_skipped = date_str in existing_skipped_dates
+            absent_counts[subject_name] = absent_counts.get(subject_name, 0) + (0 if is_present else 1)
         
-        if all_will_be_absent and not is_already_skipped:
-            # All subjects absent - add to skipped_days
-            try:
+        is_already_skipped = find_skipped_period(app_data, date_str) is not None
+        if all_will_be_absent:
+            # All subjects absent - a one-day skipped period stands for every class
+            if not is_already_skipped:
                 date_obj = datetime.strptime(date_str, "%Y-%m-%d")
                 formatted_date = date_obj.strftime("%d %b %Y")
-                app_data["skipped_days"].append({
-                    "reason": f"All absent: {formatted_date}",
-                    "date": date_str
-                })
-            except ValueError:
-                pass
-        elif not all_will_be_absent and is_already_skipped:
-            # Some subjects now present - remove from skipped_days
-            app_data["skipped_days"] = [
-                s for s in app_data["skipped_days"]
-                if s.get("date", s.get("start", "")) != date_str
-            ]
+                add_skipped_period(app_data, f"All absent: {formatted_date}", date_str, date_str)
+        else:
+            # Leave the skipped period first, so the explicit marks below count
+            if is_already_skipped:
+                remove_skipped_days(app_data, date_str)
+            
+            # The date's absence count now matches the checkboxes exactly
+            # (re-saving an already absent class doesn't add a second absence)
+            for subject_name, count in absent_counts.items():
+                set_absent_count(get_subject(subject_name), date_str, count)
         
         # Save to file
         save_data()
         
-        # Refresh all displays
-        self.refresh()
-        self.refresh_all_tabs()
+        # Publish the change - this tab recolors just this date
+        self.refresh_all_tabs(CHANGE_ABSENCES, CHANGE_SKIPPED, dates=[date_str])
         
         messagebox.showinfo("Success", "Attendance saved successfully!")
     
@@ -669,20 +648,10 @@ class AttendanceCalendar:
     def toggle_holiday(self, date_str):
         """Toggle a date as holiday"""
         app_data = get_app_data()
-        holidays = app_data.get("holidays", [])
-        
-        # Check if date is already a holiday (support both old and new format)
-        existing_idx = None
-        for idx, holiday in enumerate(holidays):
-            # New format: {name, date} or Old format: {name, start, end}
-            holiday_date = holiday.get("date", holiday.get("start", ""))
-            if holiday_date == date_str:
-                existing_idx = idx
-                break
         
-        if existing_idx is not None:
-            # Remove holiday
-            del holidays[existing_idx]
+        if find_holiday(app_data, date_str) is not None:
+            # Remove just this day - a longer holiday range is split around it
+            remove_holiday_days(app_data, date_str)
             messagebox.showinfo("Updated", "Date marked as regular day")
         else:
             # Validate date is within semester when adding
@@ -697,16 +666,12 @@ class AttendanceCalendar:
                     )
                     return
             
-            # Add as single-day holiday (new format)
-            holidays.append({
-                "name": "Holiday",
-                "date": date_str
-            })
+            # Single-day range, merged with a neighbouring "Holiday" range
+            add_holiday(app_data, "Holiday", date_str, date_str)
             messagebox.showinfo("Updated", "Date marked as holiday")
         
         save_data()
-        self.refresh()
-        self.refresh_all_tabs()
+        self.refresh_all_tabs(CHANGE_HOLIDAYS, dates=[date_str])
     
     def is_holiday_date(self, date_str):
         """Check if a date is marked as holiday"""
@@ -714,89 +679,52 @@ class AttendanceCalendar:
             return False
         
         app_data = get_app_data()
-        holidays = app_data.get("holidays", [])
-        
-        for holiday in holidays:
-            try:
-                # Support both new format {name, date} and old format {name, start, end}
-                if "date" in holiday:
-                    if holiday.get("date") == date_str:
-                        return True
-                elif "start" in holiday and "end" in holiday:
-                    start = holiday.get("start", "")
-                    end = holiday.get("end", "")
-                    if start and end and start <= date_str <= end:
-                        return True
-            except (TypeError, KeyError):
-                continue
-        return False
+        # Binary search over the merged holiday ranges
+        return get_holiday_index(app_data.get("holidays", [])).contains(date_str)
     
-    def get_day_status(self, date_str):
-        """Get the status of a day (present/absent/skipped/holiday/no_class)"""
-        app_data = get_app_data()
+    def get_month_colors(self, year, month):
+        """
+        Compute the background color of every day in a month in one batch
         
-        # Check if date is within semester range
+        Day statuses come from a single get_month_statuses() call; only the
+        today/Sunday/future overrides are applied here.
+        
+        Returns:
+            list: Color per day of the month (index 0 = day 1)
+        """
+        app_data = get_app_data()
+        today = datetime.now().date()
         semester_start = app_data.get("semester_start")
         semester_end = app_data.get("semester_end")
-        if semester_start and semester_end:
-            if not (semester_start <= date_str <= semester_end):
-                return "no_class"  # Outside semester range
-        
-        if self.is_holiday_date(date_str):
-            return "holiday"
-        
-        try:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        except ValueError:
-            return "no_class"  # Invalid date format
-        
-        day_name = date_obj.strftime("%A").upper()
-        batch = app_data.get("batch", "B1/B3")
-        subjects = get_subjects_for_day(day_name, batch)
-        
-        if not subjects:
-            return "no_class"
-        
-        # Check if ALL subjects are absent (completely skipped day)
-        # For subjects with multiple classes per day, need to check count matches
-        all_absent = True
-        has_absent = False
-        for subject in subjects:
-            subject_data = next((s for s in app_data["subjects"] if s["name"] == subject), None)
-            if subject_data:
-                absent_dates = subject_data.get("absent_dates", [])
-                # Count how many times this subject appears on this day
-                subject_count_on_day = subjects.count(subject)
-                # Count how many times this date appears in absent_dates for this subject
-                absent_count_for_date = absent_dates.count(date_str)
-                
-                if absent_count_for_date > 0:
-                    has_absent = True
-                # Only considered fully absent if ALL occurrences are marked absent
-                if absent_count_for_date < subject_count_on_day:
-                    all_absent = False
+        statuses = get_month_statuses(app_data, year, month)
+        
+        colors = []
+        for day, status in enumerate(statuses, start=1):
+            date_obj = date(year, month, day)
+            if date_obj == today:
+                colors.append(COLOR_TODAY)
+            elif date_obj.weekday() == 6:  # Sunday only (Saturday has classes)
+                colors.append(COLOR_WEEKEND)
+            elif date_obj > today:
+                # Future dates - different colors for in-semester vs outside
+                date_str = date_obj.strftime("%Y-%m-%d")
+                if semester_start and semester_end and semester_start <= date_str <= semester_end:
+                    colors.append(COLOR_HOLIDAY if status == "holiday" else COLOR_FUTURE_IN_SEM)
+                else:
+                    colors.append(COLOR_FUTURE)
             else:
-                all_absent = False
-        
-        if all_absent and has_absent:
-            return "skipped"  # All subjects absent
-        
-        return "absent" if has_absent else "present"
+                colors.append(STATUS_COLORS[status])
+        return colors
     
-    def draw_calendar(self):
-        """Draw the monthly calendar grid"""
-        # Defer widget destruction for smoother rendering
-        self.calendar_frame.update_idletasks()
-        
-        # Clear existing calendar
-        for widget in self.calendar_frame.winfo_children():
-            widget.destroy()
-        self.day_buttons = {}
-        
-        # Update month label
-        month_name = calendar.month_name[self.current_month]
-        self.month_label.config(text=f"{month_name} {self.current_year}")
+    def build_calendar_grid(self):
+        """
+        Create the persistent calendar grid (called once)
         
+        Creates the weekday header row and a pool of 7x6 date buttons. Months
+        are shown by reconfiguring these widgets in place (see draw_calendar),
+        so navigating or saving never re-allocates Tk widgets. Clicks are bound
+        once per cell and resolved through self.cell_dates.
+        """
         # Day headers (Mon-Sun)
         days_of_week = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
         for col, day in enumerate(days_of_week):
@@ -813,98 +741,123 @@ class AttendanceCalendar:
             label.grid(row=0, column=col, sticky=(tk.W, tk.E, tk.N, tk.S), padx=1, pady=1)
             self.calendar_frame.columnconfigure(col, weight=1, minsize=80)  # Responsive columns
         
+        # Configure rows to be responsive (header row + up to 6 week rows)
+        for row in range(7):
+            self.calendar_frame.rowconfigure(row, weight=1, minsize=40)
+        
+        # Pooled date cells - one per grid position
+        self.cell_buttons = []
+        self.cell_dates = [None] * 42
+        for idx in range(42):
+            btn = tk.Button(
+                self.calendar_frame,
+                text="",
+                font=("Segoe UI", 11, "normal"),
+                bg=COLOR_EMPTY_CELL,
+                relief="solid",
+                borderwidth=1,
+                padx=10,
+                pady=20,
+                command=lambda i=idx: self.on_cell_clicked(i)
+            )
+            btn.grid(
+                row=idx // 7 + 1,
+                column=idx % 7,
+                sticky=(tk.W, tk.E, tk.N, tk.S),
+                padx=1,
+                pady=1
+            )
+            # Add right-click binding
+            btn.bind("<Button-3>", lambda e, i=idx: self.on_cell_right_clicked(i))
+            self.cell_buttons.append(btn)
+    
+    def on_cell_clicked(self, idx):
+        """Left click on a pooled cell - ignored for cells outside the month"""
+        date_str = self.cell_dates[idx]
+        if date_str:
+            self.on_date_clicked(date_str)
+    
+    def on_cell_right_clicked(self, idx):
+        """Right click on a pooled cell - ignored for cells outside the month"""
+        date_str = self.cell_dates[idx]
+        if date_str:
+            self.on_date_right_clicked(date_str)
+    
+    @timed()
+    def draw_calendar(self):
+        """Show the current month by reconfiguring the pooled grid in place"""
+        if not self.cell_buttons:
+            self.build_calendar_grid()
+        
+        # Update month label
+        month_name = calendar.month_name[self.current_month]
+        self.month_label.config(text=f"{month_name} {self.current_year}")
+        
         # Get calendar data for the month
         cal = calendar.monthcalendar(self.current_year, self.current_month)
+        colors = self.get_month_colors(self.current_year, self.current_month)
         today = datetime.now().date()
+        self.day_buttons = {}
         
-        # Configure rows to be responsive (header row + up to 6 week rows)
-        for row in range(7):
-            self.calendar_frame.rowconfigure(row, weight=1, minsize=40)
+        for idx, btn in enumerate(self.cell_buttons):
+            week_idx, day_idx = divmod(idx, 7)
+            if week_idx >= len(cal):
+                # Month has fewer than 6 weeks - hide the spare row
+                self.cell_dates[idx] = None
+                btn.grid_remove()
+                continue
+            btn.grid()
+            
+            day = cal[week_idx][day_idx]
+            if day == 0:
+                # Empty cell for days not in this month
+                self.cell_dates[idx] = None
+                btn.config(text="", bg=COLOR_EMPTY_CELL, cursor="",
+                           font=("Segoe UI", 11, "normal"))
+                continue
+            
+            date_obj = date(self.current_year, self.current_month, day)
+            date_str = date_obj.strftime("%Y-%m-%d")
+            self.cell_dates[idx] = date_str
+            btn.config(
+                text=str(day),
+                bg=colors[day - 1],
+                cursor="hand2",
+                font=("Segoe UI", 11, "bold" if date_obj == today else "normal")
+            )
+            self.day_buttons[date_str] = btn
+    
+    def update_day_cells(self, dates):
+        """Recolor only the given dates (those not in the visible month are ignored)"""
+        buttons = [(date_str, self.day_buttons[date_str]) for date_str in dates if date_str in self.day_buttons]
+        if not buttons:
+            return
+        # One batch for the visible month instead of a month lookup per date
+        colors = self.get_month_colors(self.current_year, self.current_month)
+        for date_str, btn in buttons:
+            btn.config(bg=colors[int(date_str[8:10]) - 1])
+    
+    def on_data_changed(self, changes, dates):
+        """
+        Change-bus handler
         
-        # Draw date cells
-        for week_idx, week in enumerate(cal, start=1):
-            for day_idx, day in enumerate(week):
-                if day == 0:
-                    # Empty cell for days not in this month
-                    label = tk.Label(
-                        self.calendar_frame, 
-                        text="", 
-                        bg="#FAFAFA",
-                        relief="solid", 
-                        borderwidth=1
-                    )
-                    label.grid(
-                        row=week_idx, 
-                        column=day_idx, 
-                        sticky=(tk.W, tk.E, tk.N, tk.S),
-                        padx=1, 
-                        pady=1
-                    )
-                    continue
-                
-                # Create date object
-                date_obj = date(self.current_year, self.current_month, day)
-                date_str = date_obj.strftime("%Y-%m-%d")
-                
-                # Determine background color based on status
-                bg_color = COLOR_FUTURE
-                
-                if date_obj == today:
-                    bg_color = COLOR_TODAY
-                elif day_idx == 6:  # Sunday only (Saturday has classes)
-                    bg_color = COLOR_WEEKEND
-                elif date_obj > today:
-                    # Future dates - different colors for in-semester vs outside
-                    app_data = get_app_data()
-                    semester_start = app_data.get("semester_start")
-                    semester_end = app_data.get("semester_end")
-                    if semester_start and semester_end and semester_start <= date_str <= semester_end:
-                        # Future date within semester - use distinct color
-                        if self.is_holiday_date(date_str):
-                            bg_color = COLOR_HOLIDAY  # Show holidays even in future
-                        else:
-                            bg_color = COLOR_FUTURE_IN_SEM  # Light indigo for future dates in semester
-                    else:
-                        bg_color = COLOR_FUTURE  # White for outside semester
-                else:
-                    # Past dates - show actual status
-                    status = self.get_day_status(date_str)
-                    if status == "no_class":
-                        bg_color = COLOR_FUTURE  # Outside semester or no classes
-                    elif status == "holiday":
-                        bg_color = COLOR_HOLIDAY
-                    elif status == "skipped":
-                        bg_color = COLOR_SKIPPED  # All classes absent
-                    elif status == "absent":
-                        bg_color = COLOR_ABSENT
-                    elif status == "present":
-                        bg_color = COLOR_PRESENT
-                
-                # Create clickable button for the date
-                btn = tk.Button(
-                    self.calendar_frame, 
-                    text=str(day),
-                    font=("Segoe UI", 11, "bold" if date_obj == today else "normal"),
-                    bg=bg_color, 
-                    relief="solid", 
-                    borderwidth=1,
-                    cursor="hand2",
-                    padx=10,
-                    pady=20,
-                    command=lambda d=date_str: self.on_date_clicked(d)
-                )
-                btn.grid(
-                    row=week_idx, 
-                    column=day_idx, 
-                    sticky=(tk.W, tk.E, tk.N, tk.S),
-                    padx=1, 
-                    pady=1
-                )
-                
-                # Add right-click binding
-                btn.bind("<Button-3>", lambda e, d=date_str: self.on_date_right_clicked(d))
-                
-                self.day_buttons[date_str] = btn
+        Date-specific changes (attendance or holiday toggled on some dates) only
+        recolor those cells and reload the side panel if it shows one of them;
+        anything else (timetable, batch, semester, bulk edits) redraws the month.
+        """
+        if dates is None or changes - self.DATE_SCOPED_CHANGES:
+            self.refresh()
+            return
+        
+        self.update_day_cells(dates)
+        if self.selected_date in dates:
+            date_obj = datetime.strptime(self.selected_date, "%Y-%m-%d")
+            app_data = get_app_data()
+            subjects = get_subjects_for_day(date_obj.strftime("%A").upper(), app_data.get("batch", "B1/B3"))
+            if subjects:
+                self.show_subjects_panel(self.selected_date, subjects)
+            else:
+                self.clear_subjects_panel()
     
     def refresh(self):
         """Refresh the entire calendar display"""
@@ -0,0 +1,1515 @@
+"""
+Attendance Core - Timetable parsing, class counting and persistence
+The engine behind the GUI: no tkinter imports, problems are raised as
+typed exceptions (data_manager turns them into dialogs)
+
+Author: Siddhesh Bisen
+GitHub: https://github.com/siddhesh17b
+"""
+
+import json
+import os
+import csv
+import re
+import time
+import atexit
+import threading
+from collections import Counter
+from datetime import date
+from calculations import get_holiday_index, get_skipped_index, count_weekday_pattern
+from storage import SqliteStorage, create_storage, write_file_atomic
+from profiling import timed
+
+
+class AttendanceError(Exception):
+    """Base class of the errors raised by the attendance engine"""
+
+
+class DataError(AttendanceError):
+    """The data file exists but cannot be read or decoded"""
+
+
+class TimetableError(AttendanceError):
+    """A timetable (custom JSON or imported CSV) is missing, malformed or unusable"""
+
+
+class StorageError(AttendanceError):
+    """Pending changes could not be written (the original error is __cause__)"""
+
+
+DATA_FILE = "data.json"
+CUSTOM_TIMETABLE_FILE = "custom_timetable.json"
+TIMETABLE_DATA = {
+    "MONDAY": {
+        "09:00-10:00": "Minor",
+        "10:00-11:00": "DM",
+        "11:00-12:00": "DAA",
+        "12:00-01:00": "Lunch Break",
+        "01:00-02:00": "TOC",
+        "02:00-03:00": "CN",
+        "03:00-04:00": "",
+        "04:00-05:00": ""
+    },
+    "TUESDAY": {
+        "09:00-10:00": "Minor",
+        "10:00-11:00": "CN",
+        "11:00-12:00": "TOC",
+        "12:00-01:00": "Lunch Break",
+        "01:00-02:00": "DAA",
+        "02:00-03:00": "",
+        "03:00-04:00": "",
+        "04:00-05:00": ""
+    },
+    "WEDNESDAY": {
+        "09:00-10:00": "Minor",
+        "10:00-11:00": "",
+        "11:00-12:00": "",
+        "12:00-01:00": "DM",
+        "01:00-02:00": "Lunch Break",
+        "02:00-03:00": "DAA",
+        "03:00-04:00": "CN Lab (B1&B3) / DAA Lab (B2&B4)",
+        "04:00-05:00": "CN Lab (B1&B3) / DAA Lab (B2&B4)"
+    },
+    "THURSDAY": {
+        "09:00-10:00": "MDM",
+        "10:00-11:00": "",
+        "11:00-12:00": "DM",
+        "12:00-01:00": "Lunch Break",
+        "01:00-02:00": "TOC",
+        "02:00-03:00": "CN Lab (B2&B4) / DAA Lab (B1&B3)",
+        "03:00-04:00": "CN Lab (B2&B4) / DAA Lab (B1&B3)",
+        "04:00-05:00": ""
+    },
+    "FRIDAY": {
+        "09:00-10:00": "MDM",
+        "10:00-11:00": "Software Lab (B1&B3) / Software Lab (B2&B4)",
+        "11:00-12:00": "Software Lab (B1&B3) / Software Lab (B2&B4)",
+        "12:00-01:00": "Lunch Break",
+        "01:00-02:00": "CN",
+        "02:00-03:00": "Technical Skill",
+        "03:00-04:00": "Technical Skill",
+        "04:00-05:00": ""
+    },
+    "SATURDAY": {
+        "09:00-10:00": "MDM",
+        "10:00-11:00": "OE",
+        "11:00-12:00": "Mentor-Mentee Meeting",
+        "12:00-01:00": "HONORS",
+        "01:00-02:00": "HONORS",
+        "02:00-03:00": "HONORS",
+        "03:00-04:00": "HONORS",
+        "04:00-05:00": ""
+    }
+}
+
+app_data = {
+    "batch": None,
+    "semester_start": None,
+    "semester_end": None,
+    "holidays": [],
+    "subjects": []
+}
+
+def extract_subject_name(cell_value):
+    """Extract subject name - now keeps full names, only excludes lunch/empty"""
+    if not cell_value or cell_value.strip() == "":
+        return None
+    cell_value = cell_value.strip()
+    
+    # Only exclude Lunch Break and empty cells
+    if "Lunch" in cell_value:
+        return None
+    
+    # Return the full subject name as-is (no more code extraction)
+    # This allows ANY subject name, batch name, or course name
+    return cell_value
+
+
+# Weekday order used by datetime.weekday(): 0=Monday ... 6=Sunday
+WEEKDAY_NAMES = ["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"]
+
+
+def normalize_batch_text(text):
+    """
+    Normalize a batch name (or a timetable cell part) for flexible matching
+    
+    B1/B3 matches B1&B3, Group A matches GroupA, Group-A, etc.
+    Removes slashes, ampersands, spaces and hyphens and upper-cases the rest.
+    """
+    return text.replace("/", "").replace("&", "").replace(" ", "").replace("-", "").upper()
+
+
+def resolve_cell_for_batch(cell_value, normalized_batch):
+    """
+    Resolve a timetable cell to the text that applies to one batch
+    
+    - Single subject: "DAA" → "DAA" (same for all batches)
+    - Batch-specific: "CN Lab (B1&B3) / DAA Lab (B2&B4)" → "CN Lab" for B1/B3,
+      "DAA Lab" for B2/B4, "" for a batch that is not listed
+    
+    Args:
+        cell_value: Raw timetable cell text
+        normalized_batch: Batch name already passed through normalize_batch_text()
+    
+    Returns:
+        str: Resolved cell text ("" if nothing applies to this batch)
+    """
+    if not cell_value:
+        return ""
+    if "/" in cell_value and "(" in cell_value and "Lunch" not in cell_value:
+        # Format: "Subject1 (Batch1) / Subject2 (Batch2)"
+        for part in cell_value.split("/"):
+            if normalized_batch and normalized_batch in normalize_batch_text(part):
+                lab_subject = part.split("(")[0].strip()
+                if lab_subject:
+                    return lab_subject
+        return ""
+    return cell_value
+
+
+def extract_batch_names(timetable):
+    """
+    Extract all unique batch names from a timetable
+    
+    Scans the cells for entries like:
+    - "CN Lab (B1&B3) / DAA Lab (B2&B4)" → B1&B3, B2&B4
+    - "Software Lab (Group A) / Software Lab (Group B)" → Group A, Group B
+    
+    How it works:
+    1. Uses regex \\(([^)]+)\\) to find text inside parentheses
+    2. Filters out common words like "Lab", "Tutorial"
+    3. Returns unique sorted batch names
+    4. Falls back to default B1/B3, B2/B4 if none found
+    
+    To modify:
+    - Add more filter words to the exclusion list ["Lab", "Tutorial", ...]
+    - Change regex pattern for different parentheses formats
+    - Update fallback batch names
+    
+    Returns:
+        list: Sorted list of unique batch names (the values stored as app_data["batch"])
+    """
+    batch_names = set()
+    for time_slots_dict in timetable.values():
+        for cell_value in time_slots_dict.values():
+            # Skip empty cells and lunch breaks
+            if not cell_value or "Lunch" in cell_value:
+                continue
+            for match in re.findall(r'\(([^)]+)\)', cell_value):
+                batch_name = match.strip()
+                # Exclude common non-batch words
+                if batch_name and batch_name not in ["Lab", "Tutorial"]:
+                    batch_names.add(batch_name)
+    
+    # Fallback: Use default batches if none detected
+    if not batch_names:
+        batch_names = {"B1/B3", "B2/B4"}
+    return sorted(batch_names)
+
+
+class ScheduleIndex:
+    """
+    Weekly schedule for one batch, compiled once from the active timetable
+    
+    Every cell is split on "/" and batch-matched exactly once here, so the
+    hot lookups (subjects on a day, class counts, timetable grid cells) become
+    plain dict/list reads instead of repeated string parsing.
+    
+    Attributes:
+        day_subjects: {"MONDAY": ["DAA", "CN", "CN"], ...} in slot order (duplicates kept)
+        weekday_counts: [Counter, ...] indexed by weekday (0=Monday) → {subject: occurrences}
+        weekly_counts: {subject: classes per week} in first-seen timetable order
+        slot_cells: {("MONDAY", "09:00-10:00"): resolved cell text}
+    """
+    
+    @timed()
+    def __init__(self, timetable, batch):
+        self.batch = batch
+        self.day_subjects = {}
+        self.weekday_counts = [Counter() for _ in WEEKDAY_NAMES]
+        self.weekly_counts = Counter()
+        self.slot_cells = {}
+        self._patterns = {}
+        
+        normalized_batch = normalize_batch_text(batch) if batch else ""
+        
+        for day, time_slots_dict in timetable.items():
+            day_upper = day.upper()
+            subjects = self.day_subjects.setdefault(day_upper, [])
+            for time_slot, cell_value in time_slots_dict.items():
+                resolved = resolve_cell_for_batch(cell_value, normalized_batch)
+                self.slot_cells[(day_upper, time_slot)] = resolved
+                # Skip empty cells and lunch breaks
+                subject = extract_subject_name(resolved)
+                if subject:
+                    # Allow duplicate subjects - same subject can appear in multiple time slots
+                    subjects.append(subject)
+                    self.weekly_counts[subject] += 1
+                    if day_upper in WEEKDAY_NAMES:
+                        self.weekday_counts[WEEKDAY_NAMES.index(day_upper)][subject] += 1
+    
+    def get_subjects_for_day(self, day_name):
+        """List of subjects on a day (one entry per class, in slot order)"""
+        return list(self.day_subjects.get(day_name.upper(), []))
+    
+    def get_slot_cell(self, day_name, time_slot):
+        """Resolved cell text for a day/time slot ("" if empty or not for this batch)"""
+        return self.slot_cells.get((day_name.upper(), time_slot), "")
+    
+    def get_weekday_pattern(self, subject_name):
+        """Tuple of 7 per-weekday class counts for a subject (0=Monday)"""
+        pattern = self._patterns.get(subject_name)
+        if pattern is None:
+            pattern = tuple(counts.get(subject_name, 0) for counts in self.weekday_counts)
+            self._patterns[subject_name] = pattern
+        return pattern
+
+
+# Compiled schedule indexes, keyed by (timetable version, normalized batch)
+_schedule_index_cache = {}
+
+
+def get_schedule_index(batch):
+    """
+    Get the compiled ScheduleIndex for a batch
+    
+    Built once per (timetable version, batch) and reused until the timetable
+    changes (see get_timetable_version()). Spellings that match the same
+    cells (B1/B3, B1&B3) share one index.
+    """
+    timetable = get_active_timetable()
+    key = (get_timetable_version(), normalize_batch_text(batch) if batch else "")
+    index = _schedule_index_cache.get(key)
+    if index is None:
+        # Drop indexes compiled from an older timetable
+        if any(cached_key[0] != key[0] for cached_key in _schedule_index_cache):
+            _schedule_index_cache.clear()
+        index = ScheduleIndex(timetable, batch)
+        _schedule_index_cache[key] = index
+    return index
+
+
+def parse_timetable_csv(batch):
+    """
+    Parse timetable and count weekly classes for each subject based on batch
+    
+    How it works:
+    1. Scans entire week's timetable
+    2. For shared slots with "/", extracts subject for selected batch only
+    3. Counts occurrences of each subject across the week
+    
+    Timetable cell formats:
+    - Single subject: "DAA" → Counted for all batches
+    - Batch-specific: "CN Lab (B1&B3) / DAA Lab (B2&B4)" → Filters by batch
+    
+    Args:
+        batch: Selected batch name (e.g., "B1/B3", "Group A")
+    
+    Returns:
+        dict: {subject_name: weekly_count}
+        Example: {"DAA": 3, "CN": 2, "CN Lab": 2}
+    
+    To modify batch matching:
+    - Change normalize_batch_text() / resolve_cell_for_batch()
+    - The result comes from the cached ScheduleIndex for this batch
+    
+    Raises:
+        TimetableError: If the active timetable cannot be parsed
+    """
+    if not batch:
+        return {}
+    try:
+        return dict(get_schedule_index(batch).weekly_counts)
+    except Exception as e:
+        raise TimetableError(f"Failed to parse timetable: {str(e)}") from e
+
+
+def get_subjects_for_day(day_name, batch):
+    """List of subjects scheduled on a day for a batch (duplicates = multiple classes)"""
+    if not day_name or not batch:
+        return []
+    try:
+        return get_schedule_index(batch).get_subjects_for_day(day_name)
+    except Exception as e:
+        print(f"Error reading timetable for day {day_name}: {e}")
+        return []
+
+
+@timed()
+def count_subject_classes(subject_name, batch, start_date_str, end_date_str, holidays):
+    """
+    Count actual number of classes for a subject between two dates.
+    
+    This is MORE ACCURATE than weekly_count × weeks because it:
+    1. Counts actual occurrences of the subject's scheduled days
+    2. Excludes holidays from the count
+    3. Handles subjects that appear multiple times on the same day
+    
+    How it works (no day-by-day loop):
+    1. Full weeks in the range × classes per week
+    2. Plus the leftover days of the final partial week
+    3. Minus the classes that fall on holidays (looked up in the HolidayIndex)
+    So the cost depends on the number of holidays, not on the length of the range.
+    
+    Args:
+        subject_name: Name of the subject (e.g., "Physics Lab")
+        batch: User's batch (e.g., "Group A")
+        start_date_str: Start date (YYYY-MM-DD)
+        end_date_str: End date (YYYY-MM-DD) - inclusive
+        holidays: List of holiday dicts ({name, start, end} or legacy {name, date})
+                  or a prebuilt HolidayIndex
+    
+    Returns:
+        int: Total number of classes for this subject in the date range
+    
+    Example:
+        Physics Lab on Tuesday (twice per day)
+        Nov 8 to Dec 4: 4 Tuesdays (Nov 11, 18, 25, Dec 2)
+        Result: 4 × 2 = 8 classes
+    """
+    from datetime import datetime
+    
+    try:
+        start = datetime.strptime(start_date_str, "%Y-%m-%d")
+        end = datetime.strptime(end_date_str, "%Y-%m-%d")
+    except (ValueError, TypeError):
+        return 0
+    
+    if start > end:
+        return 0
+    
+    # Get which days of the week this subject appears on and how many times
+    # Days: 0=Monday, 1=Tuesday, ..., 5=Saturday, 6=Sunday
+    if not batch:
+        return 0
+    pattern = get_schedule_index(batch).get_weekday_pattern(subject_name)
+    if not any(pattern):
+        return 0
+    
+    start_ordinal = start.toordinal()
+    end_ordinal = end.toordinal()
+    total_classes = count_weekday_pattern(start_ordinal, end_ordinal, pattern)
+    
+    # Remove classes that fall on holidays
+    holiday_index = get_holiday_index(holidays)
+    total_classes -= holiday_index.count_pattern_in_range(start_ordinal, end_ordinal, pattern)
+    
+    return total_classes
+
+# Change topics - published by the tabs after a mutation so that every other
+# tab only updates what is affected (see BunkBuddyApp.refresh_all_tabs)
+CHANGE_HOLIDAYS = "holidays"
+CHANGE_SKIPPED = "skipped_days"
+CHANGE_ABSENCES = "absences"
+CHANGE_OVERRIDES = "overrides"
+CHANGE_TIMETABLE = "timetable"
+CHANGE_BATCH = "batch"
+CHANGE_SEMESTER = "semester"
+CHANGE_PROFILE = "profile"  # Another student's data was switched in
+ALL_CHANGES = frozenset({
+    CHANGE_HOLIDAYS, CHANGE_SKIPPED, CHANGE_ABSENCES, CHANGE_OVERRIDES,
+    CHANGE_TIMETABLE, CHANGE_BATCH, CHANGE_SEMESTER, CHANGE_PROFILE,
+})
+
+# Data revision - bumped whenever app_data changes (save/load) or the timetable
+# is reloaded, so derived results can be memoized per revision
+_data_revision = 0
+
+
+def bump_data_revision():
+    """Mark app_data as changed (invalidates memoized statistics)"""
+    global _data_revision
+    _data_revision += 1
+
+
+def get_data_revision():
+    """Current data revision number"""
+    return _data_revision
+
+
+# Absence store
+# Each subject keeps its absences as subject["absent_dates"] = Counter({"YYYY-MM-DD": count})
+# - a day with two classes of a subject can be missed twice. Older data files
+# stored a flat list with one entry per missed class; those are converted on
+# load (and lazily by get_absences), and saved back in the {date: count} form.
+
+def _decode_absences(value):
+    """Convert stored absences (legacy list or {date: count} dict) to a Counter"""
+    if isinstance(value, dict):
+        return Counter({d: int(c) for d, c in value.items() if int(c) > 0})
+    return Counter(value or ())
+
+
+def get_absences(subject_data):
+    """Get a subject's absence Counter {date: count}, migrating legacy lists in place"""
+    absences = subject_data.get("absent_dates")
+    if not isinstance(absences, Counter):
+        absences = _decode_absences(absences)
+        subject_data["absent_dates"] = absences
+    return absences
+
+
+def get_absent_count(subject_data, date_str):
+    """Number of classes of a subject marked absent on a date"""
+    return get_absences(subject_data).get(date_str, 0)
+
+
+def get_total_absences(subject_data):
+    """Total number of classes of a subject marked absent"""
+    return sum(get_absences(subject_data).values())
+
+
+def add_absence(subject_data, date_str, count=1):
+    """Mark count more classes of a subject absent on a date"""
+    get_absences(subject_data)[date_str] += count
+
+
+def set_absent_count(subject_data, date_str, count):
+    """Set the number of classes of a subject marked absent on a date"""
+    if count > 0:
+        get_absences(subject_data)[date_str] = count
+    else:
+        get_absences(subject_data).pop(date_str, None)
+
+
+def remove_absence(subject_data, date_str, count=None):
+    """
+    Unmark absences of a subject on a date
+    
+    Args:
+        subject_data: Subject record
+        date_str: Date "YYYY-MM-DD"
+        count: How many to remove (None = all of that date)
+    
+    Returns:
+        int: Number of absences actually removed
+    """
+    absences = get_absences(subject_data)
+    current = absences.get(date_str, 0)
+    removed = current if count is None else min(count, current)
+    if removed >= current:
+        absences.pop(date_str, None)
+    else:
+        absences[date_str] = current - removed
+    return removed
+
+
+def list_absent_dates(subject_data, reverse=False, app_data=None):
+    """
+    Sorted absent dates, one entry per missed class (for display)
+    
+    Args:
+        app_data: List the absences derived from its skipped periods instead
+                  of the marks on those days (see get_day_absent_count)
+    """
+    absences = get_absences(subject_data)
+    if app_data is not None:
+        skipped_index = get_skipped_index(get_skipped_days(app_data))
+        holiday_index = get_holiday_index(get_holidays(app_data))
+        absences = Counter({d: c for d, c in absences.items()
+                            if not skipped_index.contains(d) or holiday_index.contains(d)})
+        absences.update(dict(iter_skipped_absences(app_data, subject_data["name"])))
+    return [d for d in sorted(absences, reverse=reverse) for _ in range(absences[d])]
+
+
+# Date range stores
+# app_data["holidays"] and app_data["skipped_days"] are lists of
+# {label, "start", "end"} ranges ("name" for holidays, "reason" for skipped
+# periods), sorted by start and never overlapping; touching ranges with the
+# same label are merged. A month-long vacation is one entry instead of 30.
+# Older data files stored one {label, "date"} entry per day - those are
+# merged into ranges on load.
+
+def _range_span(entry):
+    """(start_ordinal, end_ordinal) of a range or legacy single-day entry, None if invalid"""
+    try:
+        start = date.fromisoformat(entry.get("start") or entry["date"])
+        end = date.fromisoformat(entry.get("end") or entry["date"])
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+    if start > end:
+        return None
+    return start.toordinal(), end.toordinal()
+
+
+def _build_ranges(spans, label):
+    """Range entries from sorted, non-overlapping (start, end, text) spans (merges same-text neighbours)"""
+    ranges = []
+    previous = None
+    for start, end, text in spans:
+        if previous is not None and previous[2] == text and start == previous[1] + 1:
+            previous = (previous[0], end, text)
+        else:
+            if previous is not None:
+                ranges.append(previous)
+            previous = (start, end, text)
+    if previous is not None:
+        ranges.append(previous)
+    return [
+        {label: text, "start": date.fromordinal(start).isoformat(), "end": date.fromordinal(end).isoformat()}
+        for start, end, text in ranges
+    ]
+
+
+def _range_spans(entries, label):
+    """(start_ordinal, end_ordinal, text) of normalized range entries"""
+    return [(*_range_span(e), e[label]) for e in entries]
+
+
+def _normalize_ranges(entries, label, labels, default):
+    """
+    Sorted, non-overlapping range entries from any list of range or
+    single-day entries (labels: keys to read the text from, in order)
+    
+    Where entries overlap, the earlier-starting one keeps the shared days.
+    """
+    spans = []
+    for position, entry in enumerate(entries or []):
+        span = _range_span(entry) if isinstance(entry, dict) else None
+        if span is not None:
+            text = next((entry[key] for key in labels if entry.get(key)), default)
+            spans.append((span[0], position, span[1], text))
+    spans.sort()
+    
+    clipped = []
+    last_end = None
+    for start, _, end, text in spans:
+        if last_end is not None and start <= last_end:
+            start = last_end + 1  # Days already covered by an earlier range
+        if start <= end:
+            clipped.append((start, end, text))
+            last_end = end
+    return _build_ranges(clipped, label)
+
+
+# Range lists known to be normalized: label -> (list, its length when checked).
+# The accessors re-validate a list only when it was replaced or changed length,
+# so a lookup stays a binary search instead of re-parsing every date.
+_normalized_ranges = {}
+
+
+def _mark_normalized(entries, label):
+    _normalized_ranges[label] = (entries, len(entries))
+
+
+def _is_known_normalized(entries, label):
+    known = _normalized_ranges.get(label)
+    return known is not None and known[0] is entries and known[1] == len(entries)
+
+
+def _is_normalized(entries, label):
+    last_end = None
+    for entry in entries:
+        if not isinstance(entry, dict) or "date" in entry or label not in entry:
+            return False
+        span = _range_span(entry)
+        if span is None or (last_end is not None and span[0] <= last_end):
+            return False
+        last_end = span[1]
+    return True
+
+
+def _expand(start_ordinal, end_ordinal):
+    return [date.fromordinal(o).isoformat() for o in range(start_ordinal, end_ordinal + 1)]
+
+
+def _add_range(entries, label, text, start, end):
+    """Cover the uncovered days of [start, end] with new ranges - returns the (start, end) ordinals added"""
+    new_start, new_end = _range_span({"start": start, "end": end})
+    spans = _range_spans(entries, label)
+    
+    # Gaps of [new_start, new_end] not covered by existing ranges
+    pieces = []
+    cursor = new_start
+    for span_start, span_end, _ in spans:
+        if span_end < cursor:
+            continue
+        if span_start > new_end:
+            break
+        if span_start > cursor:
+            pieces.append((cursor, span_start - 1, text))
+        cursor = max(cursor, span_end + 1)
+    if cursor <= new_end:
+        pieces.append((cursor, new_end, text))
+    
+    if pieces:
+        entries[:] = _build_ranges(sorted(spans + pieces), label)
+        _mark_normalized(entries, label)
+    return [(piece_start, piece_end) for piece_start, piece_end, _ in pieces]
+
+
+def _remove_range(entries, label, start, end):
+    """Uncover the days of [start, end], trimming or splitting ranges - returns the dates removed"""
+    remove_start, remove_end = _range_span({"start": start, "end": end or start})
+    kept = []
+    removed = []
+    for span_start, span_end, text in _range_spans(entries, label):
+        if span_end < remove_start or span_start > remove_end:
+            kept.append((span_start, span_end, text))
+            continue
+        if span_start < remove_start:
+            kept.append((span_start, remove_start - 1, text))
+        if span_end > remove_end:
+            kept.append((remove_end + 1, span_end, text))
+        removed.extend(_expand(max(span_start, remove_start), min(span_end, remove_end)))
+    if removed:
+        entries[:] = _build_ranges(kept, label)
+        _mark_normalized(entries, label)
+    return removed
+
+
+def _find_range(entries, date_str):
+    """Index of the range containing a date (binary search), or None"""
+    try:
+        date_str = date.fromisoformat(date_str).isoformat()
+    except (TypeError, ValueError):
+        return None
+    # ISO dates sort chronologically, so the strings can be compared directly
+    lo, hi = 0, len(entries)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if entries[mid]["start"] <= date_str:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo > 0 and date_str <= entries[lo - 1]["end"]:
+        return lo - 1
+    return None
+
+
+def _range_day_count(entry):
+    span = _range_span(entry)
+    return span[1] - span[0] + 1 if span else 0
+
+
+def _iter_range_days(entries, label):
+    for entry in entries:
+        span = _range_span(entry)
+        if span is not None:
+            for date_str in _expand(*span):
+                yield entry[label], date_str
+
+
+# Holiday store - {"name", "start", "end"} ranges
+
+def normalize_holidays(holidays):
+    """
+    Convert any holidays list (legacy per-day entries, unsorted or overlapping
+    ranges) to sorted, non-overlapping range entries
+    
+    Where entries overlap, the earlier-starting one keeps the shared days.
+    """
+    return _normalize_ranges(holidays, "name", ("name",), "Holiday")
+
+
+def get_holidays(app_data):
+    """Get the holiday ranges of app data, migrating legacy per-day entries in place"""
+    holidays = app_data.get("holidays")
+    if holidays is None:
+        holidays = app_data["holidays"] = []
+    elif not _is_known_normalized(holidays, "name"):
+        if not _is_normalized(holidays, "name"):
+            holidays[:] = normalize_holidays(holidays)
+        _mark_normalized(holidays, "name")
+    return holidays
+
+
+def add_holiday(app_data, name, start, end):
+    """
+    Make the days from start to end (inclusive) holidays
+    
+    Days that already are holidays keep their existing name; the new days
+    are inserted as ranges and merged with touching ranges of the same name.
+    
+    Returns:
+        list: Dates ("YYYY-MM-DD") that became holidays
+    """
+    added = _add_range(get_holidays(app_data), "name", name, start, end)
+    return [d for piece in added for d in _expand(*piece)]
+
+
+def remove_holiday_days(app_data, start, end=None):
+    """
+    Make the days from start to end (inclusive) regular days again
+    
+    A range that only partly overlaps is trimmed, one that contains the
+    removed days is split in two.
+    
+    Returns:
+        list: Dates ("YYYY-MM-DD") that stopped being holidays
+    """
+    return _remove_range(get_holidays(app_data), "name", start, end)
+
+
+def find_holiday(app_data, date_str):
+    """Index of the holiday range containing a date (binary search), or None"""
+    return _find_range(get_holidays(app_data), date_str)
+
+
+def get_holiday_day_count(holiday):
+    """Number of days of a holiday range"""
+    return _range_day_count(holiday)
+
+
+def iter_holiday_days(holidays):
+    """Yield (name, "YYYY-MM-DD") for every day of every holiday range (per-day display)"""
+    return _iter_range_days(holidays, "name")
+
+
+# Skipped period store - {"reason", "start", "end"} ranges
+# A skipped period means every scheduled class of its days was missed. Those
+# absences are NOT written into the subjects' absent_dates: they are derived
+# from the schedule index when counted (holidays excluded), so a month of
+# illness is one entry and removing it is a single range delete. Explicit
+# marks on a skipped day are kept but not counted while the period covers
+# it - removing the period brings back the attendance marked before.
+
+def normalize_skipped_days(skipped_days):
+    """
+    Convert any skipped_days list (legacy {reason, date} or {name, start, end}
+    entries) to sorted, non-overlapping {reason, start, end} ranges
+    """
+    return _normalize_ranges(skipped_days, "reason", ("reason", "name"), "Skipped")
+
+
+def _unmark_legacy_skipped_days(app_data, skipped_days):
+    """
+    Take back the marks older versions added for each legacy per-day entry
+    (one per scheduled class, like their Remove button did), leaving the
+    marks the user made before skipping the day
+    """
+    subjects = {s["name"]: s for s in app_data.get("subjects", [])}
+    schedule = get_schedule_index(app_data.get("batch", ""))
+    for entry in skipped_days:
+        if not isinstance(entry, dict) or "date" not in entry:
+            continue
+        try:
+            weekday = date.fromisoformat(entry["date"]).weekday()
+        except (TypeError, ValueError):
+            continue
+        for name, count in schedule.weekday_counts[weekday].items():
+            if name in subjects:
+                remove_absence(subjects[name], entry["date"], count)
+
+
+def get_skipped_days(app_data):
+    """
+    Get the skipped periods of app data, migrating legacy entries in place
+    
+    Older versions stored one entry per day AND marked every class of it in
+    absent_dates; on migration those marks are taken back (the period now
+    accounts for them), so removing the period later restores the day.
+    """
+    skipped_days = app_data.get("skipped_days")
+    if skipped_days is None:
+        skipped_days = app_data["skipped_days"] = []
+    elif not _is_known_normalized(skipped_days, "reason"):
+        if not _is_normalized(skipped_days, "reason"):
+            _unmark_legacy_skipped_days(app_data, skipped_days)
+            skipped_days[:] = normalize_skipped_days(skipped_days)
+        _mark_normalized(skipped_days, "reason")
+    return skipped_days
+
+
+def add_skipped_period(app_data, reason, start, end):
+    """
+    Mark every class from start to end (inclusive) as missed
+    
+    Days already inside a skipped period keep their reason. Explicit
+    absences on the newly covered days stay stored (see the store notes).
+    
+    Returns:
+        list: Dates ("YYYY-MM-DD") that became skipped
+    """
+    added = _add_range(get_skipped_days(app_data), "reason", reason, start, end)
+    return [d for piece in added for d in _expand(*piece)]
+
+
+def remove_skipped_days(app_data, start, end=None):
+    """
+    Make the days from start to end (inclusive) attended again
+    
+    Trims or splits the periods like remove_holiday_days; the derived
+    absences go with them and the days' own marks count again.
+    
+    Returns:
+        list: Dates ("YYYY-MM-DD") that stopped being skipped
+    """
+    return _remove_range(get_skipped_days(app_data), "reason", start, end)
+
+
+def find_skipped_period(app_data, date_str):
+    """Index of the skipped period containing a date (binary search), or None"""
+    return _find_range(get_skipped_days(app_data), date_str)
+
+
+def get_skipped_day_count(period):
+    """Number of days of a skipped period"""
+    return _range_day_count(period)
+
+
+def get_day_absent_count(app_data, subject_data, date_str):
+    """
+    Classes of a subject missed on a date
+    
+    Inside a skipped period that is every scheduled class of the subject
+    (none on holidays), otherwise the explicitly marked count.
+    """
+    if find_skipped_period(app_data, date_str) is None or find_holiday(app_data, date_str) is not None:
+        return get_absent_count(subject_data, date_str)
+    schedule = get_schedule_index(app_data.get("batch", ""))
+    return schedule.weekday_counts[date.fromisoformat(date_str).weekday()].get(subject_data["name"], 0)
+
+
+def iter_skipped_absences(app_data, subject_name, until=None):
+    """
+    Yield ("YYYY-MM-DD", count) for each day a skipped period makes a
+    subject absent (scheduled, not a holiday), in date order
+    
+    Args:
+        until: Last date to include (None = to the end of the periods)
+    """
+    schedule = get_schedule_index(app_data.get("batch", ""))
+    pattern = schedule.get_weekday_pattern(subject_name)
+    if not any(pattern):
+        return
+    holiday_index = get_holiday_index(app_data.get("holidays", []))
+    last = date.fromisoformat(until).toordinal() if until else None
+    for start, end, _ in _range_spans(get_skipped_days(app_data), "reason"):
+        if last is not None:
+            end = min(end, last)
+        for ordinal in range(start, end + 1):
+            count = pattern[date.fromordinal(ordinal).weekday()]
+            if count and not holiday_index.contains(ordinal):
+                yield date.fromordinal(ordinal).isoformat(), count
+
+
+def encode_app_data(data):
+    """
+    Build the JSON-ready form of app data
+    
+    Absence Counters are written as {date: count} objects in date order;
+    everything else is stored as is.
+    """
+    encoded = dict(data)
+    # Copy the lists so a background save doesn't iterate the live ones
+    for key in ("holidays", "skipped_days"):
+        if key in data:
+            encoded[key] = list(data[key])
+    encoded["subjects"] = []
+    for subject_data in data.get("subjects", []):
+        subject_copy = dict(subject_data)
+        absences = get_absences(subject_data)
+        subject_copy["absent_dates"] = {d: absences[d] for d in sorted(absences)}
+        encoded["subjects"].append(subject_copy)
+    return encoded
+
+
+def decode_app_data(data):
+    """
+    Convert loaded JSON app data to the in-memory form (migrates legacy absences, holidays and skipped days)
+    
+    Range lists that need migrating are replaced by normalized copies, and
+    the normalized-list markers are left alone: decoding another profile's
+    file must not make the live lists look unchecked.
+    """
+    for subject_data in data.get("subjects", []):
+        get_absences(subject_data)
+    holidays = data.get("holidays")
+    if holidays is not None and not _is_normalized(holidays, "name"):
+        data["holidays"] = normalize_holidays(holidays)
+    skipped_days = data.get("skipped_days")
+    if skipped_days is not None and not _is_normalized(skipped_days, "reason"):
+        _unmark_legacy_skipped_days(data, skipped_days)
+        data["skipped_days"] = normalize_skipped_days(skipped_days)
+    return data
+
+
+# Storage backend for DATA_FILE (see storage.py) - JSON snapshot by default,
+# or the append-only journal when BUNKMETER_STORAGE=journal
+_storage = {"path": None, "backend": None}
+
+
+def get_storage():
+    """Get the storage backend of the current DATA_FILE"""
+    if _storage["path"] != DATA_FILE:
+        _storage["path"] = DATA_FILE
+        _storage["backend"] = create_storage(DATA_FILE)
+    return _storage["backend"]
+
+
+# Write-behind persistence
+# save_data() only marks the data dirty and starts a short timer; the timer
+# thread encodes app_data and hands it to the storage backend, which writes
+# atomically (temp file + fsync + os.replace, or a journal append), so a
+# burst of clicks costs one write and never blocks Tk.
+# flush() writes pending changes synchronously and is called on exit.
+# A failed background write is retried every SAVE_RETRY_DELAY seconds; the UI
+# polls pop_save_error() to tell the user (once per failure streak).
+SAVE_DELAY = 0.5  # Seconds to coalesce mutations before writing
+SAVE_RETRY_DELAY = 5.0  # Seconds before a failed background write is retried
+SAVE_RETRIES = 5  # Attempts to serialize if app_data changes mid-dump
+
+_save_lock = threading.Lock()  # Serializes file writes (timer thread vs flush)
+_save_state = {"timer": None, "dirty": False, "error": None, "unreported": None}
+
+
+def _snapshot_app_data():
+    """JSON-ready copy of app_data (retries if the UI mutates it meanwhile)"""
+    for attempt in range(SAVE_RETRIES):
+        try:
+            return encode_app_data(app_data)
+        except RuntimeError:
+            # Dict/Counter changed size during iteration - try again
+            if attempt == SAVE_RETRIES - 1:
+                raise
+            time.sleep(0.01)
+
+
+@timed()
+def _write_pending():
+    """Write app_data if there are unsaved changes; returns the error or None"""
+    with _save_lock:
+        if not _save_state["dirty"]:
+            return None
+        # Clear first so changes made while writing schedule another save
+        _save_state["dirty"] = False
+        try:
+            get_storage().save(_snapshot_app_data())
+            _save_state["error"] = None
+        except Exception as e:
+            _save_state["dirty"] = True  # Keep it pending for the next attempt
+            _save_state["error"] = e
+        return _save_state["error"]
+
+
+def _schedule_save(delay):
+    """Start the write-behind timer unless one is already pending"""
+    if _save_state["timer"] is None:
+        timer = threading.Timer(delay, _background_save)
+        timer.daemon = True
+        _save_state["timer"] = timer
+        timer.start()
+
+
+def _background_save():
+    """
+    Timer callback - runs off the UI thread, so errors are recorded for the
+    UI (see pop_save_error) and the write is retried later
+    """
+    _save_state["timer"] = None
+    was_failing = _save_state["error"] is not None
+    error = _write_pending()
+    if error is not None:
+        print(f"Background save failed: {error}")
+        if not was_failing:
+            _save_state["unreported"] = error
+        _schedule_save(SAVE_RETRY_DELAY)
+
+
+@timed()
+def save_data():
+    """Mark app_data as changed and schedule a write-behind save"""
+    # Every mutation path ends with save_data(), so this is where the revision moves
+    bump_data_revision()
+    _save_state["dirty"] = True
+    _schedule_save(SAVE_DELAY)
+
+
+def flush():
+    """
+    Write pending changes now (blocking) - call before exit or switching files
+    
+    Returns:
+        bool: True (everything is on disk)
+    
+    Raises:
+        StorageError: If the write failed (the changes stay pending)
+    """
+    timer = _save_state["timer"]
+    if timer is not None:
+        timer.cancel()
+        _save_state["timer"] = None
+    
+    error = _write_pending()
+    if error is not None:
+        raise StorageError(f"Failed to save data: {str(error)}") from error
+    return True
+
+
+def get_last_save_error():
+    """Error of the last failed background save, or None"""
+    return _save_state["error"]
+
+
+def pop_save_error():
+    """Get (and clear) a background save error the user hasn't been told about"""
+    error = _save_state["unreported"]
+    _save_state["unreported"] = None
+    return error
+
+
+def get_query_storage():
+    """
+    Storage backend that answers statistics queries for app_data, or None
+    
+    Only the SQLite backend can (get_absent_counts / get_date_absences).
+    Pending saves are written first so the database matches app_data; if
+    that fails, None is returned and the caller counts in memory.
+    """
+    storage = get_storage()
+    if not isinstance(storage, SqliteStorage):
+        return None
+    try:
+        flush()
+    except StorageError:
+        return None
+    return storage
+
+
+# Don't lose a pending write if the interpreter exits without flush()
+atexit.register(_write_pending)
+
+@timed()
+def load_data():
+    """
+    Load data from JSON file and update the global app_data dictionary.
+    
+    IMPORTANT: We use .clear() and .update() instead of assignment (=) because:
+    - Assignment creates a NEW dict, breaking references held by other modules
+    - .update() modifies the SAME dict object in-place
+    - This ensures all modules see the same data after loading
+    
+    Without this fix:
+    - Module A calls get_app_data() → gets reference to dict_X
+    - load_data() does app_data = new_dict → now app_data points to dict_Y
+    - Module A still has reference to empty dict_X!
+    
+    With this fix:
+    - Module A calls get_app_data() → gets reference to dict_X
+    - load_data() updates dict_X in-place
+    - Module A's reference to dict_X now has the loaded data!
+    
+    Returns:
+        bool: True if loaded, False if there is no data file yet
+    
+    Raises:
+        DataError: If the data file exists but cannot be read
+    """
+    global app_data
+    storage = get_storage()
+    if storage.exists():
+        try:
+            loaded_data = decode_app_data(storage.load())
+            # Clear existing data and update with loaded data IN-PLACE
+            # This preserves references held by other modules
+            app_data.clear()
+            app_data.update(loaded_data)
+            rebuild_subject_index()
+            bump_data_revision()
+            if isinstance(storage, SqliteStorage):
+                # Statistics queries read the database - store what decoding migrated
+                _save_state["dirty"] = True
+            return True
+        except Exception as e:
+            raise DataError(f"Failed to load data: {str(e)}") from e
+    return False
+
+def get_app_data():
+    return app_data
+
+
+def replace_app_data(new_data):
+    """Replace the contents of app_data IN PLACE (see load_data for why)"""
+    app_data.clear()
+    app_data.update(decode_app_data(new_data))
+    rebuild_subject_index()
+    bump_data_revision()
+
+
+def set_data_file(path):
+    """Use another data file (profiles) - flush() pending saves first"""
+    global DATA_FILE
+    DATA_FILE = path
+
+
+def get_data_file():
+    return DATA_FILE
+
+
+# Subject name index - {name: subject record} over app_data["subjects"]
+# Marking paths look subjects up once per (date, subject), so a dict lookup
+# replaces the linear next(...) search. Records are shared with the list,
+# so edits through the index are edits to app_data.
+_subject_index = {"subjects": None, "length": 0, "by_name": {}}
+
+
+def rebuild_subject_index():
+    """Rebuild the name -> subject index (after load or subject list changes)"""
+    subjects = app_data.get("subjects", [])
+    _subject_index["subjects"] = subjects
+    _subject_index["length"] = len(subjects)
+    _subject_index["by_name"] = {s["name"]: s for s in subjects}
+
+
+def get_subject_index():
+    """
+    Get the {name: subject record} index for the current subjects
+    
+    The index is rebuilt automatically if app_data["subjects"] was replaced
+    by a new list or grew/shrank, so a missed rebuild can't go stale.
+    """
+    subjects = app_data.get("subjects", [])
+    if subjects is not _subject_index["subjects"] or len(subjects) != _subject_index["length"]:
+        rebuild_subject_index()
+    return _subject_index["by_name"]
+
+
+def get_subject(name):
+    """Get the subject record for a name in O(1), or None if it doesn't exist"""
+    return get_subject_index().get(name)
+
+
+# Compiled timetable cache
+# The calendar and counting code ask for the timetable many times per refresh,
+# so the parsed timetable is kept in memory and only re-read when the file on
+# disk changes (cheap os.stat check) or when it is invalidated explicitly.
+_timetable_cache = {
+    "timetable": None,   # Parsed timetable dict (None = not loaded yet)
+    "signature": None,   # (mtime_ns, size) of CUSTOM_TIMETABLE_FILE, None if missing
+    "version": 0,        # Bumped on every (re)load so derived caches can key on it
+    "error": None,       # TimetableError of the last load that fell back to the default
+    "pinned": False      # True = in-memory timetable from use_timetable(), files are ignored
+}
+
+
+def _get_timetable_file_signature():
+    """Return (mtime_ns, size) of the custom timetable file, or None if it doesn't exist"""
+    try:
+        stat_result = os.stat(CUSTOM_TIMETABLE_FILE)
+    except OSError:
+        return None
+    return (stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def invalidate_timetable_cache():
+    """Drop the cached timetable so the next lookup re-reads it from disk"""
+    _timetable_cache["timetable"] = None
+    _timetable_cache["signature"] = None
+    _timetable_cache["pinned"] = False
+    _timetable_cache["version"] += 1
+    bump_data_revision()
+
+
+def use_timetable(timetable, schedule_indexes=()):
+    """
+    Use an in-memory timetable instead of the files until the next invalidation
+    
+    Report worker processes get the parent's timetable once this way, so they
+    neither re-read nor stat the timetable file for every profile.
+    
+    Args:
+        timetable: Timetable dict {"MONDAY": {"09:00-10:00": "DAA", ...}, ...}
+        schedule_indexes: ScheduleIndex objects already compiled from this
+            timetable (installed as is; other batches compile on first use)
+    """
+    _timetable_cache["timetable"] = timetable
+    _timetable_cache["signature"] = None
+    _timetable_cache["pinned"] = True
+    _timetable_cache["version"] += 1
+    _schedule_index_cache.clear()
+    for index in schedule_indexes:
+        key = (_timetable_cache["version"], normalize_batch_text(index.batch) if index.batch else "")
+        _schedule_index_cache[key] = index
+    bump_data_revision()
+
+
+def set_timetable_file(path):
+    """Read the custom timetable from another file (e.g. a server-side copy)"""
+    global CUSTOM_TIMETABLE_FILE
+    CUSTOM_TIMETABLE_FILE = path
+    invalidate_timetable_cache()
+
+
+def get_timetable_version():
+    """Version number of the active timetable (changes whenever it is reloaded)"""
+    get_active_timetable()  # Revalidate against the file first
+    return _timetable_cache["version"]
+
+
+@timed()
+def read_timetable_file(path):
+    """
+    Read and validate a timetable JSON file
+    
+    Returns:
+        dict: {"MONDAY": {"09:00-10:00": "DAA", ...}, ...}
+    
+    Raises:
+        TimetableError: If the file can't be read or isn't {day: {time: subject}}
+    """
+    try:
+        with open(path, 'r') as f:
+            custom_timetable = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        raise TimetableError(f"Corrupted timetable file: {str(e)}") from e
+    # Validate structure - must be dict with day keys
+    if not isinstance(custom_timetable, dict):
+        raise TimetableError("Custom timetable is not a dictionary")
+    # Validate each day has time slots dict
+    for day, time_slots in custom_timetable.items():
+        if not isinstance(time_slots, dict):
+            raise TimetableError(f"Day {day} does not have valid time slots")
+    return custom_timetable
+
+
+def _load_timetable_file():
+    """Read the custom timetable file, falling back to the default on error"""
+    try:
+        return read_timetable_file(CUSTOM_TIMETABLE_FILE)
+    except TimetableError as e:
+        print(f"Error loading custom timetable: {e}")
+        _timetable_cache["error"] = e
+        return TIMETABLE_DATA
+
+
+def pop_timetable_error():
+    """Get (and clear) the error of a custom timetable that was replaced by the default"""
+    error = _timetable_cache["error"]
+    _timetable_cache["error"] = None
+    return error
+
+
+@timed()
+def get_active_timetable():
+    """
+    Get the active timetable (custom if exists, otherwise default)
+    
+    The result is cached in memory. Each call only does an os.stat() on the
+    custom timetable file; it is re-read when its mtime/size changes or after
+    invalidate_timetable_cache() is called (import / reset).
+    """
+    if _timetable_cache["pinned"]:
+        return _timetable_cache["timetable"]
+    signature = _get_timetable_file_signature()
+    if _timetable_cache["timetable"] is not None and _timetable_cache["signature"] == signature:
+        return _timetable_cache["timetable"]
+    
+    timetable = _load_timetable_file() if signature is not None else TIMETABLE_DATA
+    _timetable_cache["timetable"] = timetable
+    _timetable_cache["signature"] = signature
+    _timetable_cache["version"] += 1
+    bump_data_revision()
+    return timetable
+
+
+
+# Custom timetable files (the dialogs around them live in data_manager)
+TIMETABLE_DAYS = ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY']
+
+
+def _time_slot_sort_key(time_slot):
+    """Sort key for "HH:MM-HH:MM" slots in 24-hour chronological order"""
+    try:
+        start_time = time_slot.split("-")[0].strip()
+        hour, minute = start_time.split(":")
+        hour = int(hour)
+        # Convert 01:00-05:00 to PM times (13:00-17:00) for proper sorting
+        if 1 <= hour <= 5:
+            hour += 12
+        return hour * 60 + int(minute)
+    except (ValueError, AttributeError):
+        return 9999  # Put invalid slots at end
+
+
+def write_timetable_csv(filepath, timetable=None):
+    """
+    Write a timetable (default: the active one) as Day,Time,Subject CSV
+    
+    Raises:
+        OSError: If the file can't be written
+    """
+    if timetable is None:
+        timetable = get_active_timetable()
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Day', 'Time', 'Subject'])
+        for day in TIMETABLE_DAYS:
+            if day in timetable:
+                for time_slot in sorted(timetable[day].keys(), key=_time_slot_sort_key):
+                    writer.writerow([day, time_slot, timetable[day].get(time_slot, '')])
+
+
+# Time slots the app sorts and displays best ("09:00-10:00", "9:00 - 10:30")
+# Other formats are still imported, but reported in the diagnostics
+TIME_SLOT_PATTERN = re.compile(r"^\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2}$")
+
+# Problems listed per import summary (the counts always cover all of them)
+DIAGNOSTICS_SHOWN = 10
+
+
+def iter_timetable_csv(f):
+    """
+    Stream the rows of a Day,Time,Subject CSV file object
+    
+    Rows are read lazily, so a large file is never held in memory.
+    
+    Yields:
+        tuple: (row_number, day, time_slot, subject) - day upper-cased, all stripped
+    
+    Raises:
+        TimetableError: If the CSV has no header or lacks a required column
+    """
+    reader = csv.DictReader(f)
+    
+    # Validate headers exist
+    if not reader.fieldnames:
+        raise TimetableError("CSV file is empty or has no headers")
+    
+    # Validate required columns
+    if not all(col in reader.fieldnames for col in ['Day', 'Time', 'Subject']):
+        raise TimetableError("CSV must have columns: Day, Time, Subject")
+    
+    for row_number, row in enumerate(reader, start=1):
+        yield (
+            row_number,
+            (row.get('Day') or '').strip().upper(),
+            (row.get('Time') or '').strip(),
+            (row.get('Subject') or '').strip(),  # Subject can be empty
+        )
+
+
+def read_timetable_csv(filepath):
+    """
+    Read a Day,Time,Subject CSV into a timetable, validating it in one pass
+    
+    How it works:
+    1. Rows stream from iter_timetable_csv()
+    2. Each row is checked as it arrives - rows without Day/Time or with an
+       unknown day are skipped, unusual time formats and repeated slots are
+       kept but noted
+    3. Everything found ends up in one diagnostics report, so the caller
+       can show a single summary (or log it when running headless)
+    
+    Returns:
+        tuple: (timetable dict, diagnostics dict) - see format_import_diagnostics()
+        diagnostics = {
+            "rows": rows read, "slots": slots imported, "subjects": non-empty slots,
+            "skipped": [(row_number, reason), ...],     # Not imported
+            "warnings": [(row_number, reason), ...],    # Imported anyway
+            "missing_days": ["SATURDAY", ...]           # Days without any slot
+        }
+    
+    Raises:
+        TimetableError: If the CSV has no header or lacks a required column
+        OSError: If the file can't be read
+    """
+    new_timetable = {day: {} for day in TIMETABLE_DAYS}
+    diagnostics = {"rows": 0, "slots": 0, "subjects": 0, "skipped": [], "warnings": [], "missing_days": []}
+    
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for row_number, day, time_slot, subject in iter_timetable_csv(f):
+            diagnostics["rows"] = row_number
+            if not day or not time_slot:
+                diagnostics["skipped"].append((row_number, "Missing Day or Time"))
+                continue
+            if day not in new_timetable:
+                diagnostics["skipped"].append((row_number, f"Invalid day: {day}"))
+                continue
+            
+            # Any time format is accepted (full flexibility), unusual ones are only noted
+            if not TIME_SLOT_PATTERN.match(time_slot):
+                diagnostics["warnings"].append((row_number, f"Unusual time format: {time_slot}"))
+            if time_slot in new_timetable[day]:
+                diagnostics["warnings"].append((row_number, f"{day} {time_slot} appears again - the later row wins"))
+            new_timetable[day][time_slot] = subject
+    
+    diagnostics["slots"] = sum(len(slots) for slots in new_timetable.values())
+    diagnostics["subjects"] = count_timetable_subjects(new_timetable)
+    diagnostics["missing_days"] = [day for day in TIMETABLE_DAYS if not new_timetable[day]]
+    return new_timetable, diagnostics
+
+
+def format_import_diagnostics(diagnostics, limit=DIAGNOSTICS_SHOWN):
+    """
+    Human-readable summary of a timetable CSV import
+    
+    Args:
+        diagnostics: Report from read_timetable_csv()
+        limit: How many skipped rows / warnings to list (the rest are counted)
+    
+    Returns:
+        str: Multi-line summary
+    """
+    lines = [
+        f"Rows read: {diagnostics['rows']}",
+        f"Time slots imported: {diagnostics['slots']}",
+        f"Subjects found: {diagnostics['subjects']}",
+    ]
+    if diagnostics["missing_days"]:
+        lines.append(f"Days without classes: {', '.join(diagnostics['missing_days'])}")
+    for title, problems in (("Skipped rows", diagnostics["skipped"]), ("Warnings", diagnostics["warnings"])):
+        if not problems:
+            continue
+        lines.append("")
+        lines.append(f"{title} ({len(problems)}):")
+        lines.extend(f"  Row {row_number}: {reason}" for row_number, reason in problems[:limit])
+        if len(problems) > limit:
+            lines.append(f"  ... and {len(problems) - limit} more")
+    return "\n".join(lines)
+
+
+def import_timetable_csv(filepath, allow_missing_days=True):
+    """
+    Non-interactive CSV import (headless / scripts)
+    
+    The timetable becomes the custom one unless nothing usable was found
+    (or a day is missing and allow_missing_days is False).
+    
+    Returns:
+        dict: The diagnostics of read_timetable_csv() plus "saved": bool
+    
+    Raises:
+        TimetableError: If the CSV has no header or lacks a required column
+        OSError: If the file can't be read or the timetable can't be written
+    """
+    new_timetable, diagnostics = read_timetable_csv(filepath)
+    saved = diagnostics["slots"] > 0 and (allow_missing_days or not diagnostics["missing_days"])
+    if saved:
+        save_custom_timetable(new_timetable)
+    diagnostics["saved"] = saved
+    return diagnostics
+
+
+def count_timetable_subjects(timetable):
+    """Number of non-empty, non-lunch slots in a timetable"""
+    return sum(1 for day in timetable.values()
+               for subject in day.values()
+               if subject and subject != 'Lunch Break')
+
+
+def save_custom_timetable(timetable):
+    """Make a timetable the custom one (atomic write, caches invalidated)"""
+    write_file_atomic(CUSTOM_TIMETABLE_FILE, json.dumps(timetable, indent=2))
+    invalidate_timetable_cache()
+
+
+def has_custom_timetable():
+    return os.path.exists(CUSTOM_TIMETABLE_FILE)
+
+
+def remove_custom_timetable():
+    """
+    Delete the custom timetable so the default is used again
+    
+    Returns:
+        bool: False if there was no custom timetable
+    
+    Raises:
+        OSError: If the file can't be deleted
+    """
+    if not has_custom_timetable():
+        return False
+    os.remove(CUSTOM_TIMETABLE_FILE)
+    invalidate_timetable_cache()
+    return True
@@ -0,0 +1,345 @@
+"""
+Benchmark - Timings of the counting and summary hot paths
+Builds a synthetic timetable and data set at a chosen scale and times the
+pure computation functions headlessly (no Tk). Results are saved as JSON so
+runs from different commits can be compared.
+
+Usage:
+    python -m benchmark                                   (default scale)
+    python -m benchmark --subjects 40 --slots 16 --absences 5000 --output bench.json
+    python -m benchmark --output new.json --compare old.json
+
+Author: Siddhesh Bisen
+GitHub: https://github.com/siddhesh17b
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import attendance_core
+from attendance_core import ScheduleIndex, TIMETABLE_DAYS
+from calculations import build_absence_index, compute_summary, get_month_statuses
+from storage import STORAGE_BACKEND_ENV
+
+# Scale of the synthetic data (every key is also a command line option)
+DEFAULT_CONFIG = {
+    "slots": 8,            # Time slots per day
+    "batches": 2,          # Batches sharing the timetable
+    "subjects": 12,        # Distinct subjects
+    "semester_days": 150,  # Semester length in days
+    "holidays": 15,        # Single-day holidays within the semester
+    "skipped": 3,          # Week-long skipped periods within the semester
+    "absences": 300,       # Missed classes spread over the subjects
+    "lab_ratio": 0.2,      # Share of slots split between batches
+    "seed": 17,            # Random seed (same seed = same data)
+}
+
+SEMESTER_START = date(2025, 1, 6)
+REPEAT = 5  # Timing runs per benchmark (the best one is reported)
+REGRESSION_THRESHOLD = 1.25  # --compare flags benchmarks this much slower
+
+
+def make_timetable(config, rng):
+    """
+    Synthetic timetable {day: {time slot: cell}}
+
+    Some slots are batch-specific ("Subject 01 (B1) / Subject 02 (B2)"),
+    so batch matching is exercised like in a real timetable.
+    """
+    subjects = [f"Subject {i + 1:02d}" for i in range(config["subjects"])]
+    batches = [f"B{i + 1}" for i in range(config["batches"])]
+    timetable = {}
+    for day in TIMETABLE_DAYS:
+        slots = {}
+        for i in range(config["slots"]):
+            start = 8 * 60 + i * 45
+            time_slot = f"{start // 60 % 24:02d}:{start % 60:02d}-{(start + 45) // 60 % 24:02d}:{(start + 45) % 60:02d}"
+            if len(batches) > 1 and rng.random() < config["lab_ratio"]:
+                slots[time_slot] = " / ".join(f"{rng.choice(subjects)} Lab ({batch})" for batch in batches)
+            else:
+                slots[time_slot] = rng.choice(subjects)
+        timetable[day] = slots
+    return timetable
+
+
+def make_app_data(config, timetable, rng):
+    """Synthetic app data for the first batch, with absences on scheduled days only"""
+    batch = "B1"
+    schedule = ScheduleIndex(timetable, batch)
+    semester_end = SEMESTER_START + timedelta(days=config["semester_days"])
+    days = [SEMESTER_START + timedelta(days=i) for i in range(config["semester_days"] + 1)]
+
+    holidays = sorted(rng.sample(days, min(config["holidays"], len(days))))
+    subjects = {
+        name: {
+            "name": name,
+            "weekly_count": count,
+            "total_override": None,
+            "attendance_override": None,
+            "absent_dates": Counter(),
+        }
+        for name, count in schedule.weekly_counts.items()
+    }
+
+    class_days = [d for d in days if schedule.weekday_counts[d.weekday()]]
+    for _ in range(config["absences"] if class_days else 0):
+        day = rng.choice(class_days)
+        subject = rng.choice(list(schedule.weekday_counts[day.weekday()]))
+        subjects[subject]["absent_dates"][day.isoformat()] += 1
+
+    return {
+        "batch": batch,
+        "semester_start": SEMESTER_START.isoformat(),
+        "semester_end": semester_end.isoformat(),
+        "holidays": attendance_core.normalize_holidays(
+            [{"name": f"Holiday {i + 1}", "start": d.isoformat(), "end": d.isoformat()}
+             for i, d in enumerate(holidays)]
+        ),
+        "skipped_days": attendance_core.normalize_skipped_days(
+            [{"reason": f"Sick {i + 1}", "start": d.isoformat(), "end": (d + timedelta(days=6)).isoformat()}
+             for i, d in enumerate(sorted(rng.sample(days[:-6], min(config["skipped"], max(len(days) - 6, 0)))))]
+        ),
+        "subjects": list(subjects.values()),
+    }
+
+
+def semester_middle(app_data):
+    """Middle day of the semester (the benchmarks' "today")"""
+    start = datetime.strptime(app_data["semester_start"], "%Y-%m-%d")
+    end = datetime.strptime(app_data["semester_end"], "%Y-%m-%d")
+    return start + (end - start) / 2
+
+
+def build_benchmarks(timetable, app_data):
+    """
+    Benchmarks as (name, function) pairs
+
+    app_data is installed as the live data, so the "cached" benchmarks see
+    the same memoization as the GUI; "cold" ones bump the data revision
+    first, which is what every refresh after a mutation pays.
+    """
+    batch = app_data["batch"]
+    start, end = app_data["semester_start"], app_data["semester_end"]
+    holidays = app_data["holidays"]
+    subject_names = [s["name"] for s in app_data["subjects"]]
+    middle = semester_middle(app_data)
+    today = middle.strftime("%Y-%m-%d")
+
+    def schedule_index_build():
+        ScheduleIndex(timetable, batch)
+
+    def count_subject_classes():
+        # One semester count per subject (what a summary needs)
+        for name in subject_names:
+            attendance_core.count_subject_classes(name, batch, start, end, holidays)
+
+    def get_subjects_for_day():
+        for day in TIMETABLE_DAYS:
+            attendance_core.get_subjects_for_day(day, batch)
+
+    def month_statuses():
+        # One calendar month redraw (absence index already built)
+        get_month_statuses(app_data, middle.year, middle.month)
+
+    def month_statuses_cold():
+        attendance_core.bump_data_revision()
+        get_month_statuses(app_data, middle.year, middle.month)
+
+    def absence_index_cold():
+        attendance_core.bump_data_revision()
+        build_absence_index(app_data)
+
+    def summary_cold():
+        # The computation behind SummaryTab.refresh after a change
+        attendance_core.bump_data_revision()
+        compute_summary(app_data, today)
+
+    def summary_cached():
+        compute_summary(app_data, today)
+
+    return [
+        ("schedule_index_build", schedule_index_build),
+        ("count_subject_classes", count_subject_classes),
+        ("get_subjects_for_day", get_subjects_for_day),
+        ("month_statuses", month_statuses),
+        ("month_statuses_cold", month_statuses_cold),
+        ("absence_index_cold", absence_index_cold),
+        ("summary_cold", summary_cold),
+        ("summary_cached", summary_cached),
+    ]
+
+
+def build_sqlite_benchmarks(app_data, directory):
+    """
+    Benchmarks of the SQLite backend's aggregates, as (name, function) pairs
+
+    The live data is written to a database in directory and the storage is
+    switched to it. Before anything is timed, the query results are checked
+    against the in-memory engine - a mismatch raises AssertionError, so a
+    wrong query can't pass as a fast one.
+    """
+    middle = semester_middle(app_data)
+    today = middle.strftime("%Y-%m-%d")
+    months = sorted({(d.year, d.month) for d in (middle - timedelta(days=40), middle, middle + timedelta(days=40))})
+    expected_summary = compute_summary(app_data, today)
+    expected_months = [get_month_statuses(app_data, year, month) for year, month in months]
+
+    backend = os.environ.get(STORAGE_BACKEND_ENV)
+    os.environ[STORAGE_BACKEND_ENV] = "sqlite"
+    try:
+        attendance_core.set_data_file(os.path.join(directory, "data.json"))
+        attendance_core.get_storage()
+    finally:
+        if backend is None:
+            os.environ.pop(STORAGE_BACKEND_ENV)
+        else:
+            os.environ[STORAGE_BACKEND_ENV] = backend
+    attendance_core.save_data()
+    attendance_core.flush()
+
+    if compute_summary(app_data, today) != expected_summary:
+        raise AssertionError("SQLite absent counts differ from the in-memory engine")
+    if [get_month_statuses(app_data, year, month) for year, month in months] != expected_months:
+        raise AssertionError("SQLite month statuses differ from the in-memory engine")
+
+    def summary_sqlite_cold():
+        attendance_core.bump_data_revision()
+        compute_summary(app_data, today)
+
+    def month_statuses_sqlite():
+        get_month_statuses(app_data, middle.year, middle.month)
+
+    return [
+        ("summary_sqlite_cold", summary_sqlite_cold),
+        ("month_statuses_sqlite", month_statuses_sqlite),
+    ]
+
+
+def time_function(function, repeat=REPEAT):
+    """Best and mean microseconds per call (loop count picked by timeit.autorange)"""
+    timer = timeit.Timer(function)
+    loops, _ = timer.autorange()
+    runs = [total / loops for total in timer.repeat(repeat=repeat, number=loops)]
+    return {"best_us": min(runs) * 1e6, "mean_us": sum(runs) / len(runs) * 1e6, "loops": loops}
+
+
+def time_benchmarks(benchmarks, only, results):
+    """Time (name, function) pairs into results, printing each line"""
+    for name, function in benchmarks:
+        if only and name not in only:
+            continue
+        results[name] = time_function(function)
+        print(f"{name:<24} {results[name]['best_us']:>12.1f} us")
+
+
+def get_commit():
+    """Short hash of the current git commit, None outside a repository"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_benchmarks(config, only=None):
+    """
+    Build the synthetic data and time every benchmark
+
+    Args:
+        config: Scale (see DEFAULT_CONFIG)
+        only: Benchmark names to run (None = all)
+
+    Returns:
+        dict: Result document (what --output writes)
+    """
+    rng = random.Random(config["seed"])
+    timetable = make_timetable(config, rng)
+    app_data = make_app_data(config, timetable, rng)
+
+    # Headless; in memory only until the SQLite benchmarks, which write to
+    # a temporary directory
+    attendance_core.use_timetable(timetable)
+    attendance_core.replace_app_data(app_data)
+    live_data = attendance_core.get_app_data()
+
+    results = {}
+    time_benchmarks(build_benchmarks(timetable, live_data), only, results)
+    # Last - these move the live data's storage to a temporary database
+    if not only or any("sqlite" in name for name in only):
+        data_file = attendance_core.get_data_file()
+        with tempfile.TemporaryDirectory() as directory:
+            time_benchmarks(build_sqlite_benchmarks(live_data, directory), only, results)
+            attendance_core.set_data_file(data_file)
+
+    return {
+        "created": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+
+
+def compare_results(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Print current vs baseline timings
+
+    Returns:
+        list: Names of benchmarks slower than threshold × baseline
+    """
+    if current["config"] != baseline.get("config"):
+        print("Note: the baseline was run with a different scale")
+    print(f"\n{'Benchmark':<24} {'Baseline':>12} {'Current':>12} {'Ratio':>8}   (vs {baseline.get('commit')})")
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            print(f"{name:<24} {'-':>12} {result['best_us']:>12.1f}")
+            continue
+        ratio = result["best_us"] / old["best_us"] if old["best_us"] else float("inf")
+        flag = "  SLOWER" if ratio > threshold else ""
+        print(f"{name:<24} {old['best_us']:>12.1f} {result['best_us']:>12.1f} {ratio:>7.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmark", description="BunkMeter hot path benchmarks")
+    for key, value in DEFAULT_CONFIG.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(value), default=value)
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks")
+    parser.add_argument("--output", "-o", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Baseline results JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Slowdown ratio reported as a regression (exit code 1)")
+    args = parser.parse_args(argv)
+
+    config = {key: getattr(args, key) for key in DEFAULT_CONFIG}
+    document = run_benchmarks(config, args.only)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        if compare_results(document, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,13 @@ Author: Siddhesh Bisen
 GitHub: https://github.com/siddhesh17b
 """
 
-from datetime import datetime
+import sqlite3
+from bisect import bisect_left, bisect_right
+from calendar import monthrange
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from profiling import timed
 
 # Threshold constants
 SUBJECT_THRESHOLD = 60   # Minimum attendance per subject
@@ -28,40 +34,192 @@ def parse_date(date_str):
         return None
 
 
+def weekday_of_ordinal(ordinal):
+    """Weekday (0=Monday) of a date ordinal - ordinal 1 (0001-01-01) is a Monday"""
+    return (ordinal - 1) % 7
+
+
+def count_weekday_pattern(start_ordinal, end_ordinal, weekday_pattern):
+    """Count classes between two days (inclusive) from a weekly pattern
+    
+    Closed form instead of walking day by day:
+    full weeks × classes per week, plus the leftover days of the last partial week.
+    
+    Args:
+        start_ordinal: First day (date.toordinal())
+        end_ordinal: Last day (date.toordinal()), inclusive
+        weekday_pattern: 7 per-weekday class counts (0=Monday ... 6=Sunday)
+    
+    Returns:
+        int: Number of classes in the range (0 if start > end)
+    """
+    if start_ordinal > end_ordinal:
+        return 0
+    full_weeks, remainder = divmod(end_ordinal - start_ordinal + 1, 7)
+    total = full_weeks * sum(weekday_pattern)
+    first_weekday = weekday_of_ordinal(start_ordinal)
+    for offset in range(remainder):
+        total += weekday_pattern[(first_weekday + offset) % 7]
+    return total
+
+
+class HolidayIndex:
+    """
+    Normalized, query-friendly view of the holidays list
+    
+    Built once per holidays revision (see get_holiday_index()). Holidays are
+    kept as sorted, merged day ranges, so a month-long vacation is one
+    interval and every query is a binary search (bisect) - O(log n) in the
+    number of ranges, independent of how many days they cover.
+    
+    Supports both holiday formats:
+    - Range format: {name, start, end} (how holidays are stored)
+    - Legacy format: {name, date} - one entry per day (older data files)
+    
+    Skipped periods have the same {start, end} shape and are indexed with
+    the same class (see get_skipped_index()).
+    
+    Attributes:
+        intervals: sorted list of merged (start_ordinal, end_ordinal) ranges
+        starts / ends: the interval bounds as separate lists (for bisect)
+    """
+    
+    def __init__(self, holidays):
+        spans = []
+        for holiday in holidays or []:
+            try:
+                if "start" in holiday and "end" in holiday:
+                    start = parse_date(holiday.get('start'))
+                    end = parse_date(holiday.get('end'))
+                else:
+                    start = end = parse_date(holiday.get('date'))
+                if start and end and start <= end:
+                    spans.append((start.toordinal(), end.toordinal()))
+            except (KeyError, TypeError, AttributeError):
+                # Skip malformed holiday entries
+                continue
+        
+        # Merge overlapping and adjacent ranges
+        self.intervals = []
+        for start, end in sorted(spans):
+            if self.intervals and start <= self.intervals[-1][1] + 1:
+                if end > self.intervals[-1][1]:
+                    self.intervals[-1] = (self.intervals[-1][0], end)
+            else:
+                self.intervals.append((start, end))
+        
+        self.starts = [start for start, _ in self.intervals]
+        self.ends = [end for _, end in self.intervals]
+        # days_before[i] = holiday days in the intervals before interval i
+        self.days_before = [0]
+        for start, end in self.intervals:
+            self.days_before.append(self.days_before[-1] + end - start + 1)
+    
+    def __len__(self):
+        """Number of holiday days"""
+        return self.days_before[-1]
+    
+    def _to_ordinal(self, value):
+        if isinstance(value, int):
+            return value
+        if isinstance(value, str):
+            try:
+                return date.fromisoformat(value).toordinal()
+            except ValueError:
+                return None
+        return value.toordinal()
+    
+    def contains(self, value):
+        """Check if a day is a holiday - accepts "YYYY-MM-DD", date/datetime or ordinal"""
+        if not value:
+            return False
+        ordinal = self._to_ordinal(value)
+        if ordinal is None:
+            return False
+        i = bisect_right(self.starts, ordinal) - 1
+        return i >= 0 and ordinal <= self.ends[i]
+    
+    def _days_up_to(self, ordinal):
+        """Holiday days on or before an ordinal"""
+        i = bisect_right(self.starts, ordinal) - 1
+        if i < 0:
+            return 0
+        return self.days_before[i] + min(ordinal, self.ends[i]) - self.starts[i] + 1
+    
+    def count_in_range(self, start_ordinal, end_ordinal):
+        """Number of holiday days between two ordinals (inclusive) - O(log n)"""
+        if start_ordinal > end_ordinal:
+            return 0
+        return self._days_up_to(end_ordinal) - self._days_up_to(start_ordinal - 1)
+    
+    def intervals_in_range(self, start_ordinal, end_ordinal):
+        """Holiday ranges clipped to [start, end], as (start_ordinal, end_ordinal) pairs"""
+        i = bisect_left(self.ends, start_ordinal)
+        clipped = []
+        while i < len(self.intervals) and self.starts[i] <= end_ordinal:
+            clipped.append((max(self.starts[i], start_ordinal), min(self.ends[i], end_ordinal)))
+            i += 1
+        return clipped
+    
+    def count_pattern_in_range(self, start_ordinal, end_ordinal, weekday_pattern):
+        """Classes (from a 7-day weekly pattern) that fall on holidays within [start, end]"""
+        return sum(
+            count_weekday_pattern(start, end, weekday_pattern)
+            for start, end in self.intervals_in_range(start_ordinal, end_ordinal)
+        )
+
+
+# Last built index and the entries signature it was built from
+_holiday_index_cache = {"signature": None, "index": None}
+_skipped_index_cache = {"signature": None, "index": None}
+
+
+def _get_range_index(entries, cache):
+    """Cached HolidayIndex of a list of range entries (rebuilt only when they changed)"""
+    if isinstance(entries, HolidayIndex):
+        return entries
+    signature = tuple(
+        (e.get("date"), e.get("start"), e.get("end")) if isinstance(e, dict) else None
+        for e in entries or []
+    )
+    if cache["index"] is None or cache["signature"] != signature:
+        cache["index"] = HolidayIndex(entries)
+        cache["signature"] = signature
+    return cache["index"]
+
+
+def get_holiday_index(holidays):
+    """
+    Get the HolidayIndex for a holidays list, rebuilding only when it changed
+    
+    The cache key is a cheap signature of the raw entries (no date parsing),
+    so repeated lookups against the same holidays reuse one index.
+    """
+    return _get_range_index(holidays, _holiday_index_cache)
+
+
+def get_skipped_index(skipped_days):
+    """Get the index of the skipped periods (cached separately from the holidays)"""
+    return _get_range_index(skipped_days, _skipped_index_cache)
+
+
 def is_date_in_holidays(date, holidays):
     """Check if a date falls within any holiday
     
     Supports two formats:
-    - New format: {name, date} - individual dates
-    - Old format: {name, start, end} - date ranges (for backwards compatibility)
+    - Range format: {name, start, end}
+    - Legacy format: {name, date} - individual dates (older data files)
     
     Args:
         date: datetime object to check
-        holidays: List of holiday dicts
+        holidays: List of holiday dicts (or a prebuilt HolidayIndex)
     
     Returns:
         bool: True if date is a holiday
     """
     if not date or not holidays:
         return False
-    
-    for holiday in holidays:
-        try:
-            # New format: individual date
-            if "date" in holiday:
-                holiday_date = parse_date(holiday.get('date'))
-                if holiday_date and holiday_date.date() == date.date():
-                    return True
-            # Old format: date range (backwards compatibility)
-            elif "start" in holiday and "end" in holiday:
-                start = parse_date(holiday.get('start'))
-                end = parse_date(holiday.get('end'))
-                if start and end and start <= date <= end:
-                    return True
-        except (KeyError, TypeError, AttributeError):
-            # Skip malformed holiday entries
-            continue
-    return False
+    return get_holiday_index(holidays).contains(date)
 
 
 def calculate_attendance(attended, total):
@@ -151,3 +309,423 @@ def get_overall_status(percentage):
         return ("Safe", COLOR_WARNING)
     else:
         return ("At Risk", COLOR_RISK)
+
+
+def count_classes_in_range(weekday_pattern, start_ordinal, end_ordinal, holiday_index):
+    """Classes from a weekly pattern between two ordinals (inclusive), minus holidays"""
+    if start_ordinal > end_ordinal or not any(weekday_pattern):
+        return 0
+    total = count_weekday_pattern(start_ordinal, end_ordinal, weekday_pattern)
+    return total - holiday_index.count_pattern_in_range(start_ordinal, end_ordinal, weekday_pattern)
+
+
+# Memoized per-subject statistics: (subject, data revision, today) → row
+# Row selection, report export and tab refreshes reuse these instead of recounting
+STATS_CACHE_SIZE = 256
+_subject_stats_cache = OrderedDict()
+
+
+def _query_storage(app_data, query):
+    """
+    Run query(storage) on the SQLite backend's indexed aggregates when
+    app_data is the live data stored there - None means count in memory
+    """
+    from attendance_core import get_app_data, get_query_storage
+    
+    if app_data is not get_app_data():
+        return None
+    storage = get_query_storage()
+    if storage is None:
+        return None
+    try:
+        return query(storage)
+    except sqlite3.Error as e:
+        print(f"Statistics query failed, counting in memory: {e}")
+        return None
+
+
+def _build_summary_context(app_data, today):
+    """Precompute everything shared by all subjects (ranges, schedule, holidays)"""
+    # Imported here to avoid a circular import (attendance_core imports this module)
+    from attendance_core import get_schedule_index
+    
+    semester_start = parse_date(app_data.get("semester_start"))
+    semester_end_str = app_data.get("semester_end")
+    semester_end = parse_date(semester_end_str)
+    
+    # CRITICAL: Use TODAY as end date, not semester end
+    # This ensures future dates within semester are NOT counted in attendance
+    today_date = parse_date(today)
+    calculation_end = today_date
+    if semester_end and today > semester_end_str:
+        # If semester already ended, use semester end date
+        calculation_end = semester_end
+    
+    context = {
+        "today": today,
+        "start_ordinal": semester_start.toordinal(),
+        "end_ordinal": calculation_end.toordinal() if calculation_end else semester_start.toordinal() - 1,
+        "remaining_range": None,
+        "schedule": None,
+        "holiday_index": get_holiday_index(app_data.get("holidays", [])),
+        "skipped_index": get_skipped_index(app_data.get("skipped_days", [])),
+        "today_ordinal": today_date.toordinal() if today_date else None
+    }
+    
+    # Remaining classes: from tomorrow to semester end
+    if semester_end and today_date and today < semester_end_str:
+        context["remaining_range"] = ((today_date + timedelta(days=1)).toordinal(), semester_end.toordinal())
+    
+    batch = app_data.get("batch", "")
+    if batch:
+        context["schedule"] = get_schedule_index(batch)
+    
+    # Absences per subject from one SQL aggregate (SQLite backend), else None
+    weekday_counts = context["schedule"].weekday_counts if context["schedule"] else []
+    context["absent_counts"] = _query_storage(
+        app_data, lambda storage: storage.get_absent_counts(today, weekday_counts)
+    )
+    return context
+
+
+def _compute_subject_row(subject_data, context):
+    """Statistics row for one subject (see compute_summary for the fields)"""
+    from attendance_core import get_absences
+    
+    name = subject_data["name"]
+    today = context["today"]
+    holiday_index = context["holiday_index"]
+    schedule = context["schedule"]
+    pattern = schedule.get_weekday_pattern(name) if schedule else (0,) * 7
+    
+    if context["absent_counts"] is not None:
+        # Already counted by the database, with the same rules as below
+        absent_count = context["absent_counts"].get(name, 0)
+    else:
+        # Count absences up to TODAY that don't fall on holidays
+        skipped_index = context["skipped_index"]
+        absent_count = 0
+        for date_str, count in get_absences(subject_data).items():
+            if date_str <= today and not holiday_index.contains(date_str) and not skipped_index.contains(date_str):
+                absent_count += count
+        
+        # Skipped periods: every class of the subject in them, also only up to TODAY
+        if len(skipped_index) and context["today_ordinal"] is not None:
+            for start, end in skipped_index.intervals_in_range(skipped_index.starts[0], context["today_ordinal"]):
+                absent_count += count_classes_in_range(pattern, start, end, holiday_index)
+    
+    if subject_data.get("attendance_override") is not None:
+        # Manual override replaces both attended and total
+        present = subject_data["attendance_override"]["attended"]
+        total = subject_data["attendance_override"]["total"]
+        is_override = True
+    else:
+        if subject_data.get("total_override") is not None:
+            total = subject_data["total_override"]
+        else:
+            total = count_classes_in_range(
+                pattern, context["start_ordinal"], context["end_ordinal"], holiday_index
+            )
+        present = max(0, total - absent_count)
+        is_override = False
+    
+    remaining = 0
+    if context["remaining_range"]:
+        remaining = count_classes_in_range(pattern, *context["remaining_range"], holiday_index)
+    
+    attendance_pct = calculate_attendance(present, total)
+    
+    # Status category (60% threshold for subjects)
+    if attendance_pct >= 75:
+        status, tag = "Excellent", "safe"
+    elif attendance_pct >= 60:
+        status, tag = "Safe", "warning"
+    else:
+        status, tag = "At Risk", "risk"
+    
+    return {
+        "name": name,
+        "present": present,
+        "total": total,
+        "remaining": remaining,
+        "absent_count": absent_count,
+        "percentage": attendance_pct,
+        "safe_skip": calculate_safe_skip(present, total),
+        "status": status,
+        "tag": tag,
+        "is_override": is_override,
+        "weekly_count": subject_data.get("weekly_count")
+    }
+
+
+@timed()
+def compute_summary(app_data, today=None):
+    """
+    Compute attendance statistics for ALL subjects in one pass
+    
+    Shared engine for the Summary tab table, the subject details panel and
+    the exported report, so they never recompute (or disagree about) the
+    same numbers.
+    
+    How it works:
+    1. Timetable schedule and holiday index are looked up ONCE
+    2. Classes held (semester start → today) and remaining (tomorrow → semester end)
+       are counted in closed form per subject (see count_weekday_pattern)
+    3. Absences are counted once per subject, ignoring future dates and holidays;
+       skipped periods add every class of the subject inside them (closed form
+       again, nothing is expanded per day). With the SQLite backend one GROUP BY
+       query returns these counts for all subjects instead
+    4. Manual overrides are applied exactly like the Summary tab always did
+    5. For the live app data, rows are memoized per (subject, data revision, today),
+       so nothing is recounted until the data actually changes
+    
+    Args:
+        app_data: Application data dict (see attendance_core.app_data)
+        today: "YYYY-MM-DD" string (default: current date)
+    
+    Returns:
+        dict: {
+            "subjects": [row, ...] in app_data["subjects"] order,
+            "by_name": {subject_name: row},
+            "average": average attendance % across subjects,
+            "safe_count", "warning_count", "at_risk_count": subjects per category
+        }
+        Each row: {name, present, total, remaining, absent_count, percentage,
+                   safe_skip, status, tag, is_override, weekly_count}
+    """
+    if today is None:
+        today = datetime.now().strftime("%Y-%m-%d")
+    
+    summary = {
+        "subjects": [],
+        "by_name": {},
+        "average": 0.0,
+        "safe_count": 0,
+        "warning_count": 0,
+        "at_risk_count": 0
+    }
+    
+    if not parse_date(app_data.get("semester_start")):
+        return summary
+    
+    shared = {}  # Context is built lazily, only if some row isn't cached
+    for subject_data in app_data.get("subjects", []):
+        row = _get_subject_row(app_data, subject_data, today, shared)
+        summary["subjects"].append(row)
+        summary["by_name"][row["name"]] = row
+        if row["tag"] == "safe":
+            summary["safe_count"] += 1
+        elif row["tag"] == "warning":
+            summary["warning_count"] += 1
+        else:
+            summary["at_risk_count"] += 1
+    
+    if summary["subjects"]:
+        summary["average"] = sum(row["percentage"] for row in summary["subjects"]) / len(summary["subjects"])
+    return summary
+
+
+def _get_subject_row(app_data, subject_data, today, shared):
+    """Memoized _compute_subject_row - keyed by (subject, data revision, today)
+    
+    Only the live app data has a revision number, so other dicts
+    (e.g. reports built from other files) are always computed fresh.
+    """
+    from attendance_core import get_app_data, get_data_revision, get_active_timetable
+    
+    key = None
+    if app_data is get_app_data():
+        # Revalidate the timetable first - reloading an edited file bumps the revision
+        get_active_timetable()
+        key = (subject_data["name"], get_data_revision(), today)
+        row = _subject_stats_cache.get(key)
+        if row is not None:
+            _subject_stats_cache.move_to_end(key)
+            return row
+    
+    if "context" not in shared:
+        shared["context"] = _build_summary_context(app_data, today)
+    row = _compute_subject_row(subject_data, shared["context"])
+    
+    if key is not None:
+        _subject_stats_cache[key] = row
+        if len(_subject_stats_cache) > STATS_CACHE_SIZE:
+            _subject_stats_cache.popitem(last=False)  # Evict least recently used
+    return row
+
+
+def get_subject_stats(app_data, subject_name, today=None):
+    """
+    Statistics row for a single subject (memoized, see compute_summary)
+    
+    Returns:
+        dict or None: Row for the subject, None if it doesn't exist
+    """
+    if today is None:
+        today = datetime.now().strftime("%Y-%m-%d")
+    if not parse_date(app_data.get("semester_start")):
+        return None
+    from attendance_core import get_app_data, get_subject
+    
+    if app_data is get_app_data():
+        subject_data = get_subject(subject_name)
+    else:
+        subject_data = next((s for s in app_data.get("subjects", []) if s["name"] == subject_name), None)
+    if subject_data is None:
+        return None
+    return _get_subject_row(app_data, subject_data, today, {})
+
+
+# Date -> per-subject absence counts, rebuilt once per data revision
+_absence_index_cache = {"revision": None, "index": None}
+
+
+def build_absence_index(app_data):
+    """
+    Index absences by date: {"YYYY-MM-DD": {subject: absent count}}
+    
+    Every subject's absence store is scanned once, so a day's status
+    becomes a single dict lookup per subject. Only explicit marks are
+    indexed - days in skipped periods are classified by get_month_statuses.
+    For the live app data the index is cached until the data revision changes.
+    """
+    from attendance_core import get_app_data, get_data_revision, get_absences
+    
+    is_live = app_data is get_app_data()
+    if is_live and _absence_index_cache["revision"] == get_data_revision():
+        return _absence_index_cache["index"]
+    
+    index = {}
+    for subject_data in app_data.get("subjects", []):
+        name = subject_data["name"]
+        for absent_date, count in get_absences(subject_data).items():
+            index.setdefault(absent_date, {})[name] = count
+    
+    if is_live:
+        _absence_index_cache["revision"] = get_data_revision()
+        _absence_index_cache["index"] = index
+    return index
+
+
+@timed()
+def get_month_statuses(app_data, year, month):
+    """
+    Attendance status of every day of a month, computed in one pass
+    
+    How it works:
+    1. Semester bounds, holiday and skipped period indexes and the
+       date -> absence index are fetched once (with the SQLite backend the
+       month's absences come from a date-range query instead)
+    2. The schedule index gives each weekday's subjects with occurrence counts
+    3. Each day is classified with dict lookups only
+    
+    Statuses (same rules as the calendar's per-day status):
+    - "no_class": outside semester or nothing scheduled
+    - "holiday":  marked as holiday
+    - "skipped":  inside a skipped period, or every class of the day marked absent
+    - "absent":   some classes absent
+    - "present":  no absences
+    
+    Calling it for 12 months is cheap (the indexes are shared), so it can
+    also feed a year-at-a-glance heatmap.
+    
+    Args:
+        app_data: Application data dict
+        year: Year of the month
+        month: Month number (1-12)
+    
+    Returns:
+        list: Status per day of the month (index 0 = day 1)
+    """
+    from attendance_core import get_schedule_index
+    
+    semester_start = app_data.get("semester_start")
+    semester_end = app_data.get("semester_end")
+    holiday_index = get_holiday_index(app_data.get("holidays", []))
+    skipped_index = get_skipped_index(app_data.get("skipped_days", []))
+    known_subjects = {s["name"] for s in app_data.get("subjects", [])}
+    
+    schedule = get_schedule_index(app_data.get("batch", "B1/B3"))
+    weekday_counts = schedule.weekday_counts
+    
+    month_days = monthrange(year, month)[1]
+    first, last = f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{month_days:02d}"
+    absence_index = _query_storage(
+        app_data, lambda storage: storage.get_date_absences(first, last, weekday_counts)
+    )
+    if absence_index is None:
+        absence_index = build_absence_index(app_data)
+    
+    statuses = []
+    first_ordinal = date(year, month, 1).toordinal()
+    for offset in range(month_days):
+        ordinal = first_ordinal + offset
+        date_str = f"{year:04d}-{month:02d}-{offset + 1:02d}"
+        
+        if semester_start and semester_end and not (semester_start <= date_str <= semester_end):
+            statuses.append("no_class")
+            continue
+        if holiday_index.contains(ordinal):
+            statuses.append("holiday")
+            continue
+        
+        scheduled = weekday_counts[weekday_of_ordinal(ordinal)]
+        if not scheduled:
+            statuses.append("no_class")
+            continue
+        if skipped_index.contains(ordinal):
+            statuses.append("skipped")
+            continue
+        
+        absences = absence_index.get(date_str, {})
+        has_absent = any(absences.get(subject, 0) > 0 for subject in scheduled if subject in known_subjects)
+        all_absent = all(
+            subject in known_subjects and absences.get(subject, 0) >= count
+            for subject, count in scheduled.items()
+        )
+        if all_absent and has_absent:
+            statuses.append("skipped")
+        elif has_absent:
+            statuses.append("absent")
+        else:
+            statuses.append("present")
+    return statuses
+
+
+def format_text_report(app_data, summary=None, generated=None):
+    """
+    Plain-text attendance report (used by the Summary tab export and report_cli)
+    
+    Args:
+        app_data: Application data dict
+        summary: Result of compute_summary (computed if None)
+        generated: Timestamp text for the header (now if None)
+    
+    Returns:
+        str: Report text
+    """
+    if summary is None:
+        # Same numbers as the dashboard (TODAY is the end date, not semester end)
+        summary = compute_summary(app_data)
+    if generated is None:
+        generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    lines = [
+        "=" * 70,
+        "BUNKMETER - ATTENDANCE REPORT",
+        "=" * 70,
+        "",
+        f"Generated: {generated}",
+        f"Batch: {app_data.get('batch', 'N/A')}",
+        f"Semester: {app_data.get('semester_start', 'N/A')} to {app_data.get('semester_end', 'N/A')}",
+        "",
+        "-" * 70,
+        f"{'Subject':<20} {'Present':>10} {'Classes Held':>12} {'%':>8} {'Status':>10}",
+        "-" * 70,
+    ]
+    for stats in summary["subjects"]:
+        attendance_pct = stats["percentage"]
+        status, _ = get_attendance_status(attendance_pct)
+        lines.append(f"{stats['name']:<20} {stats['present']:>10} {stats['total']:>10} {attendance_pct:>7.1f}% {status:>10}")
+    lines.append("-" * 70)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,240 @@
+"""
+Profile Manager - Several students in one workspace
+Registry of profiles, each with its own data file, sharing one timetable
+
+Author: Siddhesh Bisen
+GitHub: https://github.com/siddhesh17b
+"""
+
+import json
+import os
+import sqlite3
+from collections import OrderedDict, Counter
+from datetime import datetime
+
+import attendance_core
+from attendance_core import DataError
+from calculations import compute_summary
+from storage import create_storage, read_data_file, write_file_atomic
+
+PROFILES_FILE = "profiles.json"
+PROFILES_DIR = "profiles"
+DEFAULT_PROFILE = "default"
+
+# How many inactive profiles keep their app_data in memory
+PROFILE_CACHE_SIZE = 8
+
+# Registry: {"active": name, "profiles": {name: {"data_file": path}}}
+_registry = None
+
+# LRU of loaded, inactive profiles: name -> app_data dict
+_profile_cache = OrderedDict()
+
+# Summary per profile, keyed by data file signature: name -> (signature, summary)
+_summary_cache = {}
+
+
+def _default_registry():
+    """Registry with the single pre-profiles data file"""
+    return {
+        "active": DEFAULT_PROFILE,
+        "profiles": {DEFAULT_PROFILE: {"data_file": attendance_core.get_data_file()}},
+    }
+
+
+def load_registry():
+    """Load profiles.json (or start with the default profile) - cheap, no data files are read"""
+    global _registry
+    if _registry is None:
+        _registry = _default_registry()
+        if os.path.exists(PROFILES_FILE):
+            try:
+                with open(PROFILES_FILE, 'r') as f:
+                    loaded = json.load(f)
+                if loaded.get("profiles"):
+                    _registry = loaded
+            except (OSError, ValueError) as e:
+                print(f"Failed to read {PROFILES_FILE}, using default profile: {e}")
+    return _registry
+
+
+def save_registry():
+    write_file_atomic(PROFILES_FILE, json.dumps(load_registry(), indent=2))
+
+
+def list_profiles():
+    """Profile names in creation order"""
+    return list(load_registry()["profiles"])
+
+
+def get_active_profile():
+    return load_registry()["active"]
+
+
+def get_profile_file(name):
+    """Data file path of a profile"""
+    return load_registry()["profiles"][name]["data_file"]
+
+
+def activate_active_profile():
+    """Point attendance_core at the active profile's data file (call before load_data at startup)"""
+    attendance_core.set_data_file(get_profile_file(get_active_profile()))
+
+
+def create_profile(name):
+    """
+    Create a profile seeded from the active one
+
+    A cohort shares the timetable, batch, semester dates and holidays, so
+    those are copied; attendance (absences, skipped days, overrides) starts empty.
+
+    Returns:
+        bool: False if the name is empty or already taken
+    """
+    registry = load_registry()
+    name = name.strip()
+    if not name or name in registry["profiles"]:
+        return False
+
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+    data_file = os.path.join(PROFILES_DIR, f"{safe_name}.json")
+    suffix = 1
+    while os.path.exists(data_file):
+        suffix += 1
+        data_file = os.path.join(PROFILES_DIR, f"{safe_name}_{suffix}.json")
+
+    current = attendance_core.get_app_data()
+    seeded = {
+        "batch": current.get("batch", ""),
+        "semester_start": current.get("semester_start"),
+        "semester_end": current.get("semester_end"),
+        "holidays": [dict(h) for h in current.get("holidays", [])],
+        "skipped_days": [],
+        "subjects": [
+            {
+                "name": s["name"],
+                "weekly_count": s.get("weekly_count"),
+                "total_override": None,
+                "attendance_override": None,
+                "absent_dates": Counter(),
+            }
+            for s in current.get("subjects", [])
+        ],
+    }
+    create_storage(data_file).save(attendance_core.encode_app_data(seeded))
+
+    registry["profiles"][name] = {"data_file": data_file}
+    save_registry()
+    return True
+
+
+def switch_profile(name):
+    """
+    Make another profile active without restarting
+
+    How it works:
+    1. Pending saves of the current profile are flushed
+    2. Its data is parked in the LRU (so switching back doesn't re-read the file)
+    3. The new profile comes from the LRU or is loaded from its file
+    4. app_data is updated IN PLACE (other modules keep their reference)
+
+    The compiled timetable is shared: schedule indexes are cached per
+    (timetable version, batch), so students of one batch reuse the same one.
+
+    Returns:
+        bool: True if the profile is now active, False if it doesn't exist
+
+    Raises:
+        StorageError: If the current profile's pending changes can't be written
+        DataError: If the new profile's file can't be read
+        (either way the current profile stays active)
+    """
+    registry = load_registry()
+    if name not in registry["profiles"]:
+        return False
+    current_name = registry["active"]
+    if name == current_name:
+        return True
+
+    attendance_core.flush()
+
+    # Park the current profile (a shallow copy owns the nested objects from now on)
+    _profile_cache[current_name] = dict(attendance_core.get_app_data())
+    _profile_cache.move_to_end(current_name)
+    while len(_profile_cache) > PROFILE_CACHE_SIZE:
+        _profile_cache.popitem(last=False)  # Evict least recently used
+
+    attendance_core.set_data_file(get_profile_file(name))
+    cached = _profile_cache.pop(name, None)
+    try:
+        if cached is not None:
+            attendance_core.replace_app_data(cached)
+        elif not attendance_core.load_data():
+            attendance_core.replace_app_data({})
+    except DataError:
+        # app_data still holds the current profile - point back at its file
+        attendance_core.set_data_file(get_profile_file(current_name))
+        _profile_cache.pop(current_name, None)
+        raise
+
+    registry["active"] = name
+    save_registry()
+    return True
+
+
+def _file_signature(path):
+    """(mtime_ns, size) of a data file or its sidecar files, None if missing"""
+    signature = []
+    for candidate in (path, path + ".journal", os.path.splitext(path)[0] + ".db"):
+        try:
+            st = os.stat(candidate)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature) if any(signature) else None
+
+
+def get_profile_summary(name, today=None):
+    """
+    Summary statistics (compute_summary) of any profile
+
+    The active profile uses the live data; other profiles are read on
+    demand and the result is cached until their file changes, so a cohort
+    overview never loads every file at startup nor re-reads unchanged ones.
+    Reading is side-effect free (read_data_file): listing statistics never
+    creates a database or removes a journal.
+
+    Returns:
+        dict or None: Summary, None if the profile has no readable data
+    """
+    if today is None:
+        today = datetime.now().strftime("%Y-%m-%d")
+    if name == get_active_profile():
+        return compute_summary(attendance_core.get_app_data(), today)
+
+    if name in _profile_cache:
+        return compute_summary(_profile_cache[name], today)
+
+    path = get_profile_file(name)
+    signature = _file_signature(path)
+    if signature is None:
+        return None
+    cached = _summary_cache.get(name)
+    if cached is not None and cached[0] == (signature, today):
+        return cached[1]
+
+    try:
+        data = attendance_core.decode_app_data(read_data_file(path))
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Failed to read profile '{name}': {e}")
+        return None
+    summary = compute_summary(data, today)
+    _summary_cache[name] = ((signature, today), summary)
+    return summary
+
+
+def iter_profile_summaries(today=None):
+    """Yield (name, summary) for every profile, loading each one only when reached"""
+    for name in list_profiles():
+        yield name, get_profile_summary(name, today)
@@ -0,0 +1,142 @@
+"""
+Profiling - Optional timing of the hot paths
+Answers "where did the time go?" when the UI feels slow: file loading,
+timetable parsing, class counting or redrawing widgets.
+
+Enabled with the BUNKMETER_PROFILE environment variable (read at startup):
+    BUNKMETER_PROFILE=1         call counts and cumulative time of @timed functions
+    BUNKMETER_PROFILE=cprofile  the same, plus a cProfile capture of the whole session
+
+When disabled, @timed returns the function itself - no wrapper, no cost.
+The statistics are printed at exit (and cProfile data saved to
+bunkmeter.prof); in the app Ctrl+Shift+P opens a panel with them.
+
+Author: Siddhesh Bisen
+GitHub: https://github.com/siddhesh17b
+"""
+
+import atexit
+import functools
+import os
+import threading
+import time
+
+PROFILE_MODE = os.environ.get("BUNKMETER_PROFILE", "").strip().lower()
+ENABLED = PROFILE_MODE not in ("", "0", "off", "false")
+CPROFILE_ENABLED = PROFILE_MODE == "cprofile"
+
+CPROFILE_FILE = "bunkmeter.prof"
+CPROFILE_TOP = 30  # Functions listed from the cProfile capture
+
+# name -> [calls, cumulative seconds, slowest call seconds]
+_stats = {}
+_stats_lock = threading.Lock()  # Background saves are timed from another thread
+_profiler = None
+
+
+def timed(name=None):
+    """
+    Decorator - count calls and time spent in a function
+
+    Times are inclusive (a timed function calling another timed function
+    counts the inner time in both), like cProfile's "cumtime".
+
+    Args:
+        name: Label in the statistics (default: module.qualname)
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with _stats_lock:
+                    entry = _stats.get(label)
+                    if entry is None:
+                        _stats[label] = [1, elapsed, elapsed]
+                    else:
+                        entry[0] += 1
+                        entry[1] += elapsed
+                        if elapsed > entry[2]:
+                            entry[2] = elapsed
+        return wrapper
+    return decorator
+
+
+def get_stats():
+    """
+    Timing statistics, slowest total first
+
+    Returns:
+        list: [{"name", "calls", "total_ms", "mean_ms", "max_ms"}, ...]
+    """
+    with _stats_lock:
+        entries = [(label, list(entry)) for label, entry in _stats.items()]
+    rows = [
+        {
+            "name": label,
+            "calls": calls,
+            "total_ms": total * 1000,
+            "mean_ms": total * 1000 / calls,
+            "max_ms": slowest * 1000,
+        }
+        for label, (calls, total, slowest) in entries
+    ]
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+
+def reset_stats():
+    """Forget the collected timings (e.g. before reproducing a slow action)"""
+    with _stats_lock:
+        _stats.clear()
+
+
+def format_stats():
+    """Timing statistics as a text table"""
+    rows = get_stats()
+    if not rows:
+        return "No timings recorded." if ENABLED else "Profiling is off (set BUNKMETER_PROFILE=1)."
+    lines = [f"{'Function':<48} {'Calls':>7} {'Total ms':>10} {'Mean ms':>9} {'Max ms':>9}", "-" * 87]
+    for row in rows:
+        lines.append(f"{row['name']:<48} {row['calls']:>7} {row['total_ms']:>10.1f} "
+                     f"{row['mean_ms']:>9.3f} {row['max_ms']:>9.2f}")
+    return "\n".join(lines)
+
+
+def format_cprofile(limit=CPROFILE_TOP):
+    """Top functions of the cProfile capture by cumulative time ("" when not capturing)"""
+    if _profiler is None:
+        return ""
+    import io
+    import pstats
+    stream = io.StringIO()
+    pstats.Stats(_profiler, stream=stream).sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+def dump_stats():
+    """Print the statistics (and save the cProfile capture) - runs at exit when enabled"""
+    if not ENABLED:
+        return
+    print("\n" + format_stats())
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(CPROFILE_FILE)
+        print(f"\ncProfile data saved to {CPROFILE_FILE} (open with: python -m pstats {CPROFILE_FILE})")
+        print(format_cprofile())
+        _profiler.enable()
+
+
+if ENABLED:
+    if CPROFILE_ENABLED:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    atexit.register(dump_stats)
@@ -0,0 +1,309 @@
+"""
+Report CLI - Attendance reports without the GUI
+Loads data files (or folders of them) and writes text, CSV or JSON reports
+
+Reads every storage backend: JSON snapshots (plus their journal) and SQLite
+databases - for a profile with both, whichever was written last.
+
+Usage:
+    python -m report_cli data.json
+    python -m report_cli data.db
+    python -m report_cli profiles/ --format csv --output nightly.csv
+    python -m report_cli profiles/ --format json --today 2025-11-30 --timetable custom_timetable.json
+    python -m report_cli profiles/ --format csv --jobs 0 --output nightly.csv   (all cores)
+
+Author: Siddhesh Bisen
+GitHub: https://github.com/siddhesh17b
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import attendance_core
+from calculations import compute_summary, format_text_report
+from storage import read_data_file
+
+# Files in a directory that are not profile data
+NON_DATA_FILES = {"profiles.json", "custom_timetable.json"}
+
+# Profiles sent to a worker per round trip (bounded so results keep streaming)
+MAX_CHUNK_SIZE = 32
+
+# Chunks submitted but not yet reported, per worker process
+CHUNKS_IN_FLIGHT_PER_JOB = 2
+
+CSV_COLUMNS = ["file", "batch", "subject", "present", "total", "remaining",
+               "absent", "percentage", "safe_skip", "status", "override"]
+
+
+def _modified_time(*paths):
+    """Latest mtime of the existing paths (0 if none exists)"""
+    times = [os.path.getmtime(p) for p in paths if os.path.exists(p)]
+    return max(times, default=0)
+
+
+def current_data_file(path):
+    """
+    The file holding a profile's latest data
+
+    With the sqlite backend the app writes "<name>.db" and the JSON snapshot
+    stops changing (and vice versa after switching back), so of a .json/.db
+    pair the one written last wins. Other paths are returned unchanged.
+    """
+    stem, ext = os.path.splitext(path)
+    if ext not in (".json", ".db"):
+        return path
+    json_path, db_path = stem + ".json", stem + ".db"
+    if _modified_time(db_path) > _modified_time(json_path, json_path + ".journal"):
+        return db_path
+    return json_path if os.path.exists(json_path) else path
+
+
+def find_data_files(paths):
+    """Expand the given files/directories into data file paths (sorted per directory)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            stems = sorted({
+                os.path.splitext(name)[0] for name in os.listdir(path)
+                if name.endswith((".json", ".db")) and name not in NON_DATA_FILES
+            })
+            files.extend(current_data_file(os.path.join(path, stem + ".json")) for stem in stems)
+        else:
+            files.append(current_data_file(path))
+    return files
+
+
+def load_data_file(path):
+    """
+    Load one data file into the in-memory form
+
+    JSON files include their journal if present; .db files are read from
+    the SQLite backend. Reading is side-effect free (read_data_file), so
+    reports can run next to a running app.
+
+    Raises ValueError if the file is JSON but not a BunkMeter data file.
+    """
+    data = read_data_file(path, "sqlite" if path.endswith(".db") else "json")
+    if not isinstance(data, dict) or not isinstance(data.get("subjects"), list):
+        raise ValueError("not a BunkMeter data file")
+    return attendance_core.decode_app_data(data)
+
+
+def build_report(path, today):
+    """
+    Compute the report of one data file
+
+    Only the header fields and the summary are kept (not the whole app_data),
+    so reports are cheap to send back from worker processes.
+
+    Never raises: any problem with the file (unreadable, not JSON, wrong
+    shape, a subject without a name, ...) becomes an error report, so one
+    bad file doesn't stop a run over thousands.
+
+    Returns:
+        dict: {"file", "batch", "semester_start", "semester_end", "summary"}
+              or {"file", "error"}
+    """
+    try:
+        app_data = load_data_file(path)
+        return {
+            "file": path,
+            "batch": app_data.get("batch"),
+            "semester_start": app_data.get("semester_start"),
+            "semester_end": app_data.get("semester_end"),
+            "summary": compute_summary(app_data, today),
+        }
+    except (OSError, ValueError, sqlite3.Error) as e:
+        return {"file": path, "error": str(e)}
+    except Exception as e:
+        # Valid JSON with unexpected content (KeyError, TypeError, ...)
+        return {"file": path, "error": f"invalid data ({type(e).__name__}: {e})"}
+
+
+def _build_reports(paths, today):
+    """Reports of one chunk of files (runs in a worker process)"""
+    return [build_report(path, today) for path in paths]
+
+
+def _init_worker(timetable, schedule_indexes):
+    """Worker process setup - install the parent's timetable and compiled schedules once per process"""
+    attendance_core.use_timetable(timetable, schedule_indexes)
+
+
+def iter_reports(files, today, jobs=1):
+    """
+    Yield the report of every file, in file order
+
+    How it works:
+    1. jobs=1 (or a single file): computed one by one in this process
+    2. Otherwise the files are fanned out over a ProcessPoolExecutor
+    3. Each worker receives the active timetable and the ScheduleIndex of
+       every batch named in it once (initializer), compiled here; a batch
+       the timetable doesn't name is compiled once per worker on first use
+    4. Files go out in chunks, with at most CHUNKS_IN_FLIGHT_PER_JOB chunks
+       per worker submitted at a time: a new chunk is submitted whenever the
+       oldest one is reported, so output starts early and neither memory nor
+       queued work grows with the file count
+    5. build_report never raises, so a bad file comes back as an error
+       report; if a worker process itself dies, the files not yet reported
+       are finished in this process
+
+    Args:
+        files: Data file paths
+        today: Report date "YYYY-MM-DD"
+        jobs: Worker processes (0/None = one per CPU core)
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(files) < 2:
+        for path in files:
+            yield build_report(path, today)
+        return
+
+    jobs = min(jobs, len(files))
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, len(files) // (jobs * 4)))
+    chunks = (files[i:i + chunk_size] for i in range(0, len(files), chunk_size))
+    timetable = attendance_core.get_active_timetable()
+    schedule_indexes = [attendance_core.get_schedule_index(batch)
+                        for batch in attendance_core.extract_batch_names(timetable)]
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(timetable, schedule_indexes)) as pool:
+            pending = deque()
+            try:
+                for chunk in chunks:
+                    pending.append(pool.submit(_build_reports, chunk, today))
+                    if len(pending) >= jobs * CHUNKS_IN_FLIGHT_PER_JOB:
+                        break
+                while pending:
+                    reports = pending.popleft().result()
+                    # Keep the workers busy while this chunk is written out
+                    chunk = next(chunks, None)
+                    if chunk is not None:
+                        pending.append(pool.submit(_build_reports, chunk, today))
+                    for report in reports:
+                        yield report
+                        done += 1
+            finally:
+                # Output stopped early (or a worker died) - don't compute the rest
+                for future in pending:
+                    future.cancel()
+    except BrokenProcessPool:
+        # A worker was killed (out of memory, ...) - finish the rest here
+        for path in files[done:]:
+            yield build_report(path, today)
+
+
+def write_text(reports, out, generated):
+    for report in reports:
+        out.write(f"# {report['file']}\n")
+        if "error" in report:
+            out.write(f"ERROR: {report['error']}\n\n")
+            continue
+        out.write(format_text_report(report, report["summary"], generated))
+        out.write("\n")
+
+
+def write_csv(reports, out):
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    for report in reports:
+        if "error" in report:
+            print(f"{report['file']}: {report['error']}", file=sys.stderr)
+            continue
+        batch = report["batch"] or ""
+        for row in report["summary"]["subjects"]:
+            writer.writerow([
+                report["file"], batch, row["name"], row["present"], row["total"], row["remaining"],
+                row["absent_count"], f"{row['percentage']:.1f}", row["safe_skip"], row["status"],
+                "yes" if row["is_override"] else "no",
+            ])
+
+
+def write_json(reports, out, generated):
+    """Write {"generated", "reports": [...]} one report at a time (never all in memory)"""
+    out.write("{\n" + f'  "generated": {json.dumps(generated)},\n' + '  "reports": [')
+    separator = "\n"
+    for report in reports:
+        if "error" in report:
+            result = {"file": report["file"], "error": report["error"]}
+        else:
+            summary = report["summary"]
+            result = {
+                "file": report["file"],
+                "batch": report["batch"],
+                "semester_start": report["semester_start"],
+                "semester_end": report["semester_end"],
+                "average": summary["average"],
+                "safe_count": summary["safe_count"],
+                "warning_count": summary["warning_count"],
+                "at_risk_count": summary["at_risk_count"],
+                "subjects": summary["subjects"],
+            }
+        text = json.dumps(result, indent=2)
+        out.write(separator + "    " + text.replace("\n", "\n    "))
+        separator = ",\n"
+    out.write("\n  ]\n}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="report_cli", description="BunkMeter attendance reports (no GUI)")
+    parser.add_argument("paths", nargs="+", help="Data files and/or directories of data files")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    parser.add_argument("--today", help="Report date YYYY-MM-DD (default: today)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes for many files (0 = one per CPU core)")
+    parser.add_argument("--timetable", help="Custom timetable JSON shared by all files "
+                                            "(default: custom_timetable.json if present)")
+    args = parser.parse_args(argv)
+
+    today = args.today or datetime.now().strftime("%Y-%m-%d")
+    try:
+        datetime.strptime(today, "%Y-%m-%d")
+    except ValueError:
+        parser.error(f"invalid --today date: {today}")
+    if args.timetable:
+        if not os.path.exists(args.timetable):
+            parser.error(f"timetable not found: {args.timetable}")
+        try:
+            attendance_core.read_timetable_file(args.timetable)
+        except attendance_core.TimetableError as e:
+            parser.error(str(e))
+        attendance_core.set_timetable_file(args.timetable)
+
+    files = find_data_files(args.paths)
+    if not files:
+        parser.error("no data files found")
+
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or more")
+    # Generator - reports are written as they arrive, even for thousands of profiles
+    reports = iter_reports(files, today, args.jobs)
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(reports, out)
+        elif args.format == "json":
+            write_json(reports, out, generated)
+        else:
+            write_text(reports, out, generated)
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,14 +10,21 @@ import tkinter as tk
 from tkinter import ttk
 from tkcalendar import Calendar
 from datetime import datetime
+from collections import Counter
 from data_manager import get_app_data, save_data, parse_timetable_csv, \
     export_timetable_to_csv, import_timetable_from_csv, reset_to_default_timetable, \
-    get_subjects_for_day, get_active_timetable
-from calculations import parse_date
+    get_active_timetable, extract_batch_names, rebuild_subject_index, \
+    get_holidays, add_holiday, remove_holiday_days, get_holiday_day_count, iter_holiday_days, \
+    get_skipped_days, add_skipped_period, remove_skipped_days, get_skipped_day_count, \
+    CHANGE_HOLIDAYS, CHANGE_SKIPPED, CHANGE_ABSENCES, CHANGE_OVERRIDES, CHANGE_BATCH, \
+    CHANGE_SEMESTER, CHANGE_TIMETABLE, CHANGE_PROFILE
+from calculations import parse_date, get_holiday_index
 from modern_dialogs import messagebox
-import re
 
 class SetupTab:
+    # Change topics this tab displays (see app.ChangeBus)
+    WATCHED_CHANGES = frozenset({CHANGE_HOLIDAYS, CHANGE_SKIPPED, CHANGE_PROFILE})
+    
     def __init__(self, notebook, refresh_callback):
         self.notebook = notebook
         self.refresh_all_tabs = refresh_callback
@@ -27,6 +34,7 @@ class SetupTab:
         self.start_date_cal = None
         self.end_date_cal = None
         self.holidays_tree = None
+        self.holidays_per_day = None  # BooleanVar - list every day instead of ranges
         self.skipped_tree = None
         # Setup mode tracking - forces user to select batch & dates after import
         self.setup_mode = False
@@ -250,10 +258,10 @@ class SetupTab:
                                          show="headings", height=4)
         self.holidays_tree.heading("No", text="#")
         self.holidays_tree.heading("Name", text="Holiday Name")
-        self.holidays_tree.heading("Date", text="Date")
+        self.holidays_tree.heading("Date", text="Date(s)")
         self.holidays_tree.column("No", width=40, minwidth=30, stretch=False)
-        self.holidays_tree.column("Name", width=200, minwidth=150)
-        self.holidays_tree.column("Date", width=120, minwidth=100)
+        self.holidays_tree.column("Name", width=170, minwidth=120)
+        self.holidays_tree.column("Date", width=200, minwidth=100)
         self.holidays_tree.pack(fill=tk.BOTH, expand=True, pady=5)
         
         # Enable isolated mouse wheel scrolling on holidays tree
@@ -328,6 +336,20 @@ class SetupTab:
         )
         remove_all_btn.pack(side=tk.LEFT)
         
+        # Holidays are stored as ranges - optionally list every day
+        self.holidays_per_day = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            btn_frame,
+            text="Show each day",
+            variable=self.holidays_per_day,
+            font=("Segoe UI", 9),
+            bg="#fff8e1",
+            fg="#e65100",
+            activebackground="#fff8e1",
+            cursor="hand2",
+            command=self.refresh_holidays
+        ).pack(side=tk.RIGHT)
+        
         # Timetable Management Section (RIGHT) - Enhanced with better styling
         self.timetable_frame = tk.Frame(right_column, bg="#e8eaf6", relief=tk.FLAT, bd=0, highlightthickness=2, highlightbackground="#5c6bc0")
         self.timetable_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -448,10 +470,10 @@ class SetupTab:
                                          show="headings", height=4)
         self.skipped_tree.heading("No", text="#")
         self.skipped_tree.heading("Name", text="Reason")
-        self.skipped_tree.heading("Date", text="Date")
+        self.skipped_tree.heading("Date", text="Date(s)")
         self.skipped_tree.column("No", width=40, minwidth=30, stretch=False)
-        self.skipped_tree.column("Name", width=200, minwidth=150)
-        self.skipped_tree.column("Date", width=120, minwidth=100)
+        self.skipped_tree.column("Name", width=170, minwidth=120)
+        self.skipped_tree.column("Date", width=200, minwidth=100)
         self.skipped_tree.pack(fill=tk.BOTH, expand=True, pady=5)
         
         # Enable isolated mouse wheel scrolling on skipped days tree
@@ -581,79 +603,81 @@ class SetupTab:
         self.refresh()
         return tab
     
+    def on_data_changed(self, changes, dates):
+        """Change-bus handler - reload only the list(s) that changed"""
+        if CHANGE_PROFILE in changes:
+            self.load_profile_settings()
+        if CHANGE_HOLIDAYS in changes:
+            self.refresh_holidays()
+        if CHANGE_SKIPPED in changes:
+            self.refresh_skipped()
+    
+    def load_profile_settings(self):
+        """Show the batch and semester dates of the (newly switched) profile"""
+        app_data = get_app_data()
+        self.update_batch_options()
+        for date_cal, key in ((self.start_date_cal, "semester_start"), (self.end_date_cal, "semester_end")):
+            date_obj = parse_date(app_data.get(key))
+            if date_obj:
+                date_cal.selection_set(date_obj)
+                date_cal.see(date_obj)
+    
     def refresh(self):
         """Refresh holidays and skipped days lists with serial numbers"""
-        app_data = get_app_data()
-        
-        # Refresh holidays with serial numbers (individual date format)
-        for item in self.holidays_tree.get_children():
-            self.holidays_tree.delete(item)
-        for idx, holiday in enumerate(app_data.get("holidays", []), start=1):
-            # Support both old format {name, start, end} and new format {name, date}
-            date_val = holiday.get("date", holiday.get("start", ""))
-            self.holidays_tree.insert("", tk.END, values=(idx, holiday["name"], date_val))
-        
-        # Refresh skipped days with serial numbers (individual date format)
-        for item in self.skipped_tree.get_children():
-            self.skipped_tree.delete(item)
-        for idx, skipped in enumerate(app_data.get("skipped_days", []), start=1):
-            # Support both old format {name, start, end} and new format {reason, date}
-            date_val = skipped.get("date", skipped.get("start", ""))
-            reason = skipped.get("reason", skipped.get("name", ""))
-            self.skipped_tree.insert("", tk.END, values=(idx, reason, date_val))
+        self.refresh_holidays()
+        self.refresh_skipped()
     
-    def extract_batch_names(self):
+    def refresh_holidays(self):
         """
-        Extract all unique batch names from timetable
+        Refresh the holidays list with serial numbers
         
-        Scans timetable for entries like:
-        - \"CN Lab (B1&B3) / DAA Lab (B2&B4)\" → Extracts: B1&B3, B2&B4
-        - \"Software Lab (Group A) / Software Lab (Group B)\" → Extracts: Group A, Group B
+        One row per holiday range ("start → end (N days)"), or one row per
+        day when "Show each day" is ticked. The row iid says what a row
+        stands for, so remove_holiday() can delete a range or a single day.
+        """
+        holidays = get_holidays(get_app_data())
         
-        How it works:
-        1. Uses regex \\(([^)]+)\\) to find text inside parentheses
-        2. Filters out common words like \"Lab\", \"Tutorial\"
-        3. Returns unique sorted batch names
-        4. Falls back to default B1/B3, B2/B4 if none found
+        self.holidays_tree.delete(*self.holidays_tree.get_children())
+        if self.holidays_per_day is not None and self.holidays_per_day.get():
+            for idx, (name, date_str) in enumerate(iter_holiday_days(holidays), start=1):
+                self.holidays_tree.insert("", tk.END, iid=f"day:{date_str}", values=(idx, name, date_str))
+            return
+        for idx, holiday in enumerate(holidays, start=1):
+            days = get_holiday_day_count(holiday)
+            if days == 1:
+                date_val = holiday["start"]
+            else:
+                date_val = f"{holiday['start']} → {holiday['end']} ({days} days)"
+            self.holidays_tree.insert("", tk.END, iid=f"range:{holiday['start']}:{holiday['end']}",
+                                      values=(idx, holiday["name"], date_val))
+    
+    def refresh_skipped(self):
+        """Refresh the skipped periods list with serial numbers (one row per period)"""
+        self.skipped_tree.delete(*self.skipped_tree.get_children())
+        for idx, period in enumerate(get_skipped_days(get_app_data()), start=1):
+            days = get_skipped_day_count(period)
+            if days == 1:
+                date_val = period["start"]
+            else:
+                date_val = f"{period['start']} → {period['end']} ({days} days)"
+            self.skipped_tree.insert("", tk.END, iid=f"range:{period['start']}:{period['end']}",
+                                     values=(idx, period["reason"], date_val))
+    
+    def extract_batch_names(self):
+        """
+        Extract all unique batch names from the active timetable
         
-        To modify:
-        - Add more filter words to the exclusion list [\"Lab\", \"Tutorial\", ...]
-        - Change regex pattern for different parentheses formats
-        - Update fallback batch names
+        See attendance_core.extract_batch_names (regex, exclusion list and
+        the B1/B3, B2/B4 fallback live there).
         
         Returns:
             list: Sorted list of unique batch names
         """
-        batch_names = set()
         try:
-            active_timetable = get_active_timetable()
-            
-            # Scan all days and time slots
-            for day, time_slots_dict in active_timetable.items():
-                for time_slot, cell_value in time_slots_dict.items():
-                    # Skip empty cells and lunch breaks
-                    if not cell_value or "Lunch" in cell_value:
-                        continue
-                        
-                    # Extract all text inside parentheses using regex
-                    # Pattern: \(([^)]+)\) matches anything between ( and )
-                    matches = re.findall(r'\(([^)]+)\)', cell_value)
-                    
-                    for match in matches:
-                        # Clean whitespace and validate
-                        batch_name = match.strip()
-                        # Exclude common non-batch words
-                        if batch_name and batch_name not in ["Lab", "Tutorial"]:
-                            batch_names.add(batch_name)
-                            
+            return extract_batch_names(get_active_timetable())
         except Exception as e:
             print(f"Error extracting batch names: {e}")
-        
-        # Fallback: Use default batches if none detected
-        if not batch_names:
-            batch_names = {"B1/B3", "B2/B4"}
-        
-        return sorted(batch_names)
+            return ["B1/B3", "B2/B4"]
     
     def update_batch_options(self):
         """Update batch selection with modern horizontal toggle buttons"""
@@ -720,7 +744,6 @@ class SetupTab:
             return
         
         if new_batch != app_data.get("batch"):
-            app_data["batch"] = new_batch
             weekly_counts = parse_timetable_csv(new_batch)
             
             # Validate that subjects exist for this batch
@@ -728,6 +751,7 @@ class SetupTab:
                 messagebox.showerror("Error", f"No subjects found for batch '{new_batch}'!\nPlease check your timetable.")
                 return
             
+            app_data["batch"] = new_batch
             existing_subjects = {s["name"]: s for s in app_data["subjects"]}
             app_data["subjects"] = []
             for subject, count in weekly_counts.items():
@@ -735,10 +759,11 @@ class SetupTab:
                     existing_subjects[subject]["weekly_count"] = count
                     app_data["subjects"].append(existing_subjects[subject])
                 else:
-                    app_data["subjects"].append({"name": subject, "weekly_count": count, "total_override": None, "attendance_override": None, "absent_dates": []})
+                    app_data["subjects"].append({"name": subject, "weekly_count": count, "total_override": None, "attendance_override": None, "absent_dates": Counter()})
+            rebuild_subject_index()
             
             save_data()
-            self.refresh_all_tabs()
+            self.refresh_all_tabs(CHANGE_BATCH)
             
             # Check if setup is complete (batch + dates set)
             if self.setup_mode:
@@ -762,7 +787,7 @@ class SetupTab:
         app_data["semester_start"] = start_date
         app_data["semester_end"] = end_date
         save_data()
-        self.refresh_all_tabs()
+        self.refresh_all_tabs(CHANGE_SEMESTER)
         
         # Check if setup is complete (batch + dates set)
         if self.setup_mode:
@@ -875,33 +900,13 @@ class SetupTab:
                     )
                     return
             
-            # Add each day as individual holiday entry
-            from datetime import datetime, timedelta
-            try:
-                start_date = datetime.strptime(start, "%Y-%m-%d")
-                end_date = datetime.strptime(end, "%Y-%m-%d")
-            except ValueError:
-                messagebox.showerror("Error", "Invalid date format")
-                return
-            
-            # Check for existing holidays on these dates
-            existing_holidays = set(h.get("date", h.get("start", "")) for h in app_data.get("holidays", []))
-            added_count = 0
-            skipped_count = 0
-            
-            current = start_date
-            while current <= end_date:
-                date_str = current.strftime("%Y-%m-%d")
-                if date_str not in existing_holidays:
-                    app_data["holidays"].append({"name": name, "date": date_str})
-                    added_count += 1
-                else:
-                    skipped_count += 1
-                current += timedelta(days=1)
-            
+            # Stored as one range, merged with touching ranges of the same name
+            # Days that already are holidays keep their existing name
+            added_dates = add_holiday(app_data, name, start, end)
+            added_count = len(added_dates)
+            skipped_count = (parse_date(end) - parse_date(start)).days + 1 - added_count
             save_data()
-            self.refresh()
-            self.refresh_all_tabs()
+            self.refresh_all_tabs(CHANGE_HOLIDAYS, dates=added_dates)
             dialog.destroy()
             
             if skipped_count > 0:
@@ -932,19 +937,19 @@ class SetupTab:
             messagebox.showwarning("Warning", "Please select a holiday to remove")
             return
         
-        try:
-            index = self.holidays_tree.index(selected[0])
-            if 0 <= index < len(app_data.get("holidays", [])):
-                del app_data["holidays"][index]
-            else:
-                messagebox.showerror("Error", "Invalid holiday selection")
-                return
-        except (tk.TclError, IndexError) as e:
-            messagebox.showerror("Error", f"Failed to remove holiday: {str(e)}")
+        # iid "range:<start>:<end>" removes the whole range, "day:<date>" only
+        # that day (splitting its range in two if needed)
+        kind, _, dates = selected[0].partition(":")
+        if kind == "range":
+            start, _, end = dates.partition(":")
+        else:
+            start = end = dates
+        removed_dates = remove_holiday_days(app_data, start, end)
+        if not removed_dates:
+            messagebox.showerror("Error", "Invalid holiday selection")
             return
         save_data()
-        self.refresh()
-        self.refresh_all_tabs()
+        self.refresh_all_tabs(CHANGE_HOLIDAYS, dates=removed_dates)
     
     def remove_all_holidays(self):
         """Remove all holidays after confirmation"""
@@ -954,7 +959,7 @@ class SetupTab:
             messagebox.showinfo("Info", "No holidays to remove")
             return
         
-        count = len(app_data["holidays"])
+        count = sum(get_holiday_day_count(h) for h in get_holidays(app_data))
         confirm = messagebox.askyesno(
             "Confirm Remove All",
             f"Are you sure you want to remove all {count} holiday(s)?\n\nThis action cannot be undone.",
@@ -964,8 +969,7 @@ class SetupTab:
         if confirm:
             app_data["holidays"] = []
             save_data()
-            self.refresh()
-            self.refresh_all_tabs()
+            self.refresh_all_tabs(CHANGE_HOLIDAYS)
             messagebox.showinfo("Success", f"Removed all {count} holiday(s)")
     
     def add_skipped_days(self):
@@ -1086,7 +1090,7 @@ class SetupTab:
                     return
             
             # Validate dates are not in the future
-            from datetime import datetime, timedelta
+            from datetime import datetime
             today = datetime.now().strftime("%Y-%m-%d")
             if start > today:
                 messagebox.showerror(
@@ -1097,70 +1101,23 @@ class SetupTab:
                 )
                 return
             
-            # Initialize skipped_days if not exists
-            if "skipped_days" not in app_data:
-                app_data["skipped_days"] = []
-            
-            # Get existing holidays and skipped days to check for overlaps
-            existing_holidays = set(h.get("date", h.get("start", "")) for h in app_data.get("holidays", []))
-            existing_skipped = set(s.get("date", s.get("start", "")) for s in app_data.get("skipped_days", []))
-            
-            try:
-                start_date = datetime.strptime(start, "%Y-%m-%d")
-                end_date = datetime.strptime(end, "%Y-%m-%d")
-            except ValueError:
-                messagebox.showerror("Error", "Invalid date format")
-                dialog.destroy()
-                return
-            
-            current = start_date
-            batch = app_data.get("batch", "B1/B3")
-            added_count = 0
-            skipped_holiday = 0
-            skipped_duplicate = 0
-            
-            while current <= end_date:
-                date_str = current.strftime("%Y-%m-%d")
-                
-                # Skip if date is a holiday (holidays take priority)
-                if date_str in existing_holidays:
-                    skipped_holiday += 1
-                    current += timedelta(days=1)
-                    continue
-                
-                # Skip if already marked as skipped
-                if date_str in existing_skipped:
-                    skipped_duplicate += 1
-                    current += timedelta(days=1)
-                    continue
-                
-                # Add this date as a skipped day
-                app_data["skipped_days"].append({"reason": name, "date": date_str})
-                added_count += 1
-                
-                # Mark all subjects as absent for this date
-                day_name = current.strftime("%A").upper()
-                subjects = get_subjects_for_day(day_name, batch)
-                
-                for subject in subjects:
-                    subject_data = next((s for s in app_data["subjects"] if s["name"] == subject), None)
-                    if subject_data:
-                        if "absent_dates" not in subject_data:
-                            subject_data["absent_dates"] = []
-                        # Append date for EACH occurrence (allows duplicates)
-                        subject_data["absent_dates"].append(date_str)
-                
-                current += timedelta(days=1)
+            # One range entry - the absences are derived from the timetable
+            # when counted, not written per class (holidays stay excluded)
+            added_dates = add_skipped_period(app_data, name, start, end)
+            added_count = len(added_dates)
+            total_days = (datetime.strptime(end, "%Y-%m-%d") - datetime.strptime(start, "%Y-%m-%d")).days + 1
+            skipped_duplicate = total_days - added_count
+            holiday_index = get_holiday_index(app_data.get("holidays", []))
+            skipped_holiday = sum(1 for date_str in added_dates if holiday_index.contains(date_str))
             
             save_data()
-            self.refresh()
-            self.refresh_all_tabs()
+            self.refresh_all_tabs(CHANGE_SKIPPED, CHANGE_ABSENCES, dates=added_dates)
             dialog.destroy()
             
             # Build result message
-            msg_parts = [f"Marked {added_count} day(s) as absent."]
+            msg_parts = [f"Marked {added_count - skipped_holiday} day(s) as absent."]
             if skipped_holiday > 0:
-                msg_parts.append(f"{skipped_holiday} day(s) skipped (already holidays).")
+                msg_parts.append(f"{skipped_holiday} day(s) not counted (holidays).")
             if skipped_duplicate > 0:
                 msg_parts.append(f"{skipped_duplicate} day(s) skipped (already marked).")
             messagebox.showinfo("Success", "\n".join(msg_parts))
@@ -1181,74 +1138,33 @@ class SetupTab:
         save_btn.pack(side="right")
     
     def remove_skipped_days(self):
-        """Remove selected skipped period and its absence marks"""
+        """Remove the selected skipped period and restore the attendance marked before it"""
         app_data = get_app_data()
         selected = self.skipped_tree.selection()
         if not selected:
             messagebox.showwarning("Warning", "Please select a skipped period to remove")
             return
         
-        if "skipped_days" not in app_data or not app_data["skipped_days"]:
-            messagebox.showinfo("Info", "No skipped days to remove")
-            return
-        
-        try:
-            index = self.skipped_tree.index(selected[0])
-            if not (0 <= index < len(app_data["skipped_days"])):
-                messagebox.showerror("Error", "Invalid skipped period selection")
-                return
-            
-            skipped = app_data["skipped_days"][index]
-        except (tk.TclError, IndexError, KeyError) as e:
-            messagebox.showerror("Error", f"Failed to access skipped period: {str(e)}")
-            return
-        
-        # Get the date from new format or fallback to old format
-        date_str = skipped.get("date", skipped.get("start", ""))
-        if not date_str:
-            messagebox.showerror("Error", "Invalid skipped day entry - no date found")
-            return
-        
-        # Remove absence marks for this single date
-        from datetime import datetime
-        try:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        except ValueError as e:
-            messagebox.showerror("Error", f"Invalid date format: {str(e)}")
+        # iid "range:<start>:<end>" - a single range delete; the period's
+        # absences were derived, the days' own marks count again
+        _, _, dates = selected[0].partition(":")
+        start, _, end = dates.partition(":")
+        removed_dates = remove_skipped_days(app_data, start, end)
+        if not removed_dates:
+            messagebox.showerror("Error", "Invalid skipped period selection")
             return
-        
-        batch = app_data.get("batch", "B1/B3")
-        day_name = date_obj.strftime("%A").upper()
-        subjects = get_subjects_for_day(day_name, batch)
-        
-        # Count occurrences of each subject on this day
-        subject_counts = {}
-        for subject in subjects:
-            subject_counts[subject] = subject_counts.get(subject, 0) + 1
-        
-        # Remove ALL occurrences for each subject (matches how they were added)
-        for subject, count in subject_counts.items():
-            subject_data = next((s for s in app_data["subjects"] if s["name"] == subject), None)
-            if subject_data:
-                # Remove 'count' occurrences of this date from absent_dates
-                for _ in range(count):
-                    if date_str in subject_data.get("absent_dates", []):
-                        subject_data["absent_dates"].remove(date_str)
-        
-        del app_data["skipped_days"][index]
         save_data()
-        self.refresh()
-        self.refresh_all_tabs()
+        self.refresh_all_tabs(CHANGE_SKIPPED, CHANGE_ABSENCES, dates=removed_dates)
     
     def remove_all_skipped_days(self):
-        """Remove all skipped days and their absence marks after confirmation"""
+        """Remove all skipped periods after confirmation"""
         app_data = get_app_data()
         
         if not app_data.get("skipped_days"):
             messagebox.showinfo("Info", "No skipped days to remove")
             return
         
-        count = len(app_data["skipped_days"])
+        count = sum(get_skipped_day_count(p) for p in get_skipped_days(app_data))
         confirm = messagebox.askyesno(
             "Confirm Remove All",
             f"Are you sure you want to remove all {count} skipped day(s)?\n\n"
@@ -1260,40 +1176,9 @@ class SetupTab:
         if not confirm:
             return
         
-        # Remove absence marks for all skipped days
-        from datetime import datetime
-        batch = app_data.get("batch", "B1/B3")
-        
-        for skipped in app_data.get("skipped_days", []):
-            date_str = skipped.get("date", skipped.get("start", ""))
-            if not date_str:
-                continue
-            
-            try:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                day_name = date_obj.strftime("%A").upper()
-                subjects = get_subjects_for_day(day_name, batch)
-                
-                # Count occurrences of each subject on this day
-                subject_counts = {}
-                for subject in subjects:
-                    subject_counts[subject] = subject_counts.get(subject, 0) + 1
-                
-                # Remove ALL occurrences for each subject
-                for subject, count in subject_counts.items():
-                    subject_data = next((s for s in app_data["subjects"] if s["name"] == subject), None)
-                    if subject_data:
-                        for _ in range(count):
-                            if date_str in subject_data.get("absent_dates", []):
-                                subject_data["absent_dates"].remove(date_str)
-            except (ValueError, KeyError):
-                continue
-        
-        # Clear all skipped days
         app_data["skipped_days"] = []
         save_data()
-        self.refresh()
-        self.refresh_all_tabs()
+        self.refresh_all_tabs(CHANGE_SKIPPED, CHANGE_ABSENCES)
         messagebox.showinfo("Success", f"Removed all {count} skipped day(s) and restored attendance marks")
     
     def reset_data(self):
@@ -1323,7 +1208,7 @@ class SetupTab:
         
         # Clear absent dates and total overrides for all subjects
         for subject in app_data.get("subjects", []):
-            subject["absent_dates"] = []
+            subject["absent_dates"] = Counter()
             subject["total_override"] = None
             subject["attendance_override"] = None
         
@@ -1331,8 +1216,7 @@ class SetupTab:
         save_data()
         
         # Refresh all tabs
-        self.refresh()
-        self.refresh_all_tabs()
+        self.refresh_all_tabs(CHANGE_HOLIDAYS, CHANGE_SKIPPED, CHANGE_ABSENCES, CHANGE_OVERRIDES)
         
         messagebox.showinfo("Success", "All data has been reset successfully!")
     
@@ -1442,7 +1326,7 @@ class SetupTab:
             # Enter setup mode
             self.enter_setup_mode()
             
-            self.refresh()
+            # Everything changed
             self.refresh_all_tabs()
     
     def export_timetable(self):
@@ -1472,10 +1356,11 @@ class SetupTab:
                         "weekly_count": weekly_count,
                         "total_override": None,
                         "attendance_override": None,
-                        "absent_dates": []
+                        "absent_dates": Counter()
                     })
+            rebuild_subject_index()
             
             save_data()
-            self.refresh_all_tabs()
+            self.refresh_all_tabs(CHANGE_TIMETABLE, CHANGE_BATCH)
             messagebox.showinfo("Success", "Timetable reset to default successfully!\nAll tabs have been updated.")
 
@@ -0,0 +1,643 @@
+"""
+Storage Backends - How app data reaches the disk
+JSON snapshot file (default), an append-only journal of attendance events
+and an SQLite database with indexed queries
+
+Author: Siddhesh Bisen
+GitHub: https://github.com/siddhesh17b
+"""
+
+import json
+import os
+import sqlite3
+from urllib.request import pathname2url
+
+# Backend used by attendance_core: "json" (default), "journal" or "sqlite"
+STORAGE_BACKEND_ENV = "BUNKMETER_STORAGE"
+
+# Journal is compacted into a fresh snapshot after this many events
+JOURNAL_COMPACT_EVENTS = 500
+
+# Snapshot key / journal header pairing a journal with the snapshot it extends
+JOURNAL_GENERATION_KEY = "journal_generation"
+
+
+def write_file_atomic(path, text):
+    """Atomically replace path with text (temp file + fsync + os.replace)"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _dump(data):
+    """Compact JSON text"""
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _absence_counts(absences):
+    """{date: count} of stored absences - older files keep a flat list with one entry per missed class"""
+    if isinstance(absences, dict):
+        return dict(absences)
+    counts = {}
+    for date_str in absences or []:
+        counts[date_str] = counts.get(date_str, 0) + 1
+    return counts
+
+
+def _shadow(data):
+    """Comparable copy of the data: absences, holidays, skipped days, structure"""
+    subjects = data.get("subjects", [])
+    structure = dict(data)
+    structure.pop("holidays", None)
+    structure.pop("skipped_days", None)
+    structure["subjects"] = [
+        {k: v for k, v in s.items() if k != "absent_dates"} for s in subjects
+    ]
+    return {
+        "structure": json.dumps(structure, sort_keys=True),
+        "absences": {s["name"]: _absence_counts(s.get("absent_dates")) for s in subjects},
+        "holidays": [json.dumps(h, sort_keys=True) for h in data.get("holidays", [])],
+        "skips": [json.dumps(h, sort_keys=True) for h in data.get("skipped_days", [])],
+    }
+
+
+def _diff_list(old, new, add_op, remove_op, splice_op):
+    """Events turning list old into new (appends, removals, or one splice)"""
+    if new[:len(old)] == old:
+        return [{"op": add_op, "v": json.loads(item)} for item in new[len(old):]]
+
+    # Is new old with some entries removed? Walk both lists once
+    removed = []
+    j = 0
+    for i, item in enumerate(old):
+        if j < len(new) and new[j] == item:
+            j += 1
+        else:
+            removed.append(i)
+    if j == len(new):
+        # Highest index first so earlier indexes stay valid while replaying
+        return [{"op": remove_op, "i": i} for i in reversed(removed)]
+
+    # Sorted lists (holiday ranges) change in the middle - replace only the
+    # part between the unchanged prefix and suffix
+    prefix = 0
+    while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(old), len(new)) - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return [{"op": splice_op, "i": prefix, "n": len(old) - prefix - suffix,
+             "v": [json.loads(item) for item in new[prefix:len(new) - suffix]]}]
+
+
+def _diff(old, new):
+    """Events that turn the persisted shadow old into the new one"""
+    events = []
+    for name, absences in new["absences"].items():
+        old_absences = old["absences"].get(name, {})
+        if absences == old_absences:
+            continue
+        for date_str, count in absences.items():
+            if old_absences.get(date_str) != count:
+                events.append({"op": "absent", "s": name, "d": date_str, "n": count})
+        for date_str in old_absences:
+            if date_str not in absences:
+                events.append({"op": "absent", "s": name, "d": date_str, "n": 0})
+
+    if new["holidays"] != old["holidays"]:
+        events.extend(_diff_list(old["holidays"], new["holidays"], "holiday+", "holiday-", "holiday~"))
+    if new["skips"] != old["skips"]:
+        events.extend(_diff_list(old["skips"], new["skips"], "skip+", "skip-", "skip~"))
+    return events
+
+
+class JsonStorage:
+    """
+    Whole-file storage - every save rewrites the snapshot
+
+    All backends take and return the JSON form of app data
+    (see attendance_core.encode_app_data / decode_app_data).
+
+    A "<path>.journal" left by JournalStorage (the backend was switched) is
+    replayed on load and folded into the next snapshot, so its recent
+    changes are not lost.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.generation = 0
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """Read the stored data (raises OSError / ValueError on failure)"""
+        data, self.generation, _, _ = self._read_with_journal()
+        return data
+
+    def read(self):
+        """
+        Read the stored data without side effects - nothing is created,
+        imported or removed (summaries and reports of files the app owns)
+        """
+        return self.load()
+
+    def save(self, data):
+        journal = os.path.exists(self.journal_path)
+        if journal:
+            # Next generation first, so a journal that survives a crash
+            # before it is removed no longer matches the snapshot
+            self.generation += 1
+        if self.generation:
+            data = dict(data, **{JOURNAL_GENERATION_KEY: self.generation})
+        write_file_atomic(self.path, _dump(data))
+        if journal:
+            os.remove(self.journal_path)
+
+    def _read_with_journal(self):
+        """Snapshot + replayed journal -> (data, generation, events replayed, journal is stale)"""
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        generation = data.pop(JOURNAL_GENERATION_KEY, 0) if isinstance(data, dict) else 0
+        if not os.path.exists(self.journal_path):
+            return data, generation, 0, False
+
+        events = []
+        journal_generation = 0  # Journals written before generations existed
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    break  # Torn write at the end of the journal
+                if event.get("op") == "generation":
+                    journal_generation = event["g"]
+                else:
+                    events.append(event)
+        if journal_generation != generation:
+            return data, generation, 0, True
+        for event in events:
+            self._apply_event(data, event)
+        return data, generation, len(events), False
+
+    @staticmethod
+    def _apply_event(data, event):
+        """Replay one journal event onto loaded data"""
+        op = event.get("op")
+        if op == "absent":
+            for subject in data.get("subjects", []):
+                if subject["name"] == event["s"]:
+                    absences = subject.get("absent_dates")
+                    if not isinstance(absences, dict):
+                        # Legacy list snapshot - convert to {date: count}
+                        absences = subject["absent_dates"] = _absence_counts(absences)
+                    if event["n"] > 0:
+                        absences[event["d"]] = event["n"]
+                    else:
+                        absences.pop(event["d"], None)
+                    break
+        elif op == "holiday+":
+            data.setdefault("holidays", []).append(event["v"])
+        elif op == "holiday-":
+            del data["holidays"][event["i"]]
+        elif op == "holiday~":
+            data.setdefault("holidays", [])[event["i"]:event["i"] + event["n"]] = event["v"]
+        elif op == "holidays":
+            data["holidays"] = event["v"]
+        elif op == "skip+":
+            data.setdefault("skipped_days", []).append(event["v"])
+        elif op == "skip-":
+            del data["skipped_days"][event["i"]]
+        elif op == "skip~":
+            data.setdefault("skipped_days", [])[event["i"]:event["i"] + event["n"]] = event["v"]
+        elif op == "skips":
+            data["skipped_days"] = event["v"]
+
+
+
+class JournalStorage(JsonStorage):
+    """
+    Snapshot + append-only journal of attendance events
+
+    How it works:
+    1. The snapshot (same file and format as JsonStorage) holds the full data
+    2. Each save compares the data with what is already on disk and appends
+       one compact JSON line per change to "<path>.journal":
+       - {"op": "absent", "s": subject, "d": date, "n": count}  (n=0: present)
+       - {"op": "holiday+", "v": entry} / {"op": "holiday-", "i": index}
+       - {"op": "skip+", "v": entry} / {"op": "skip-", "i": index}
+       - {"op": "holiday~", "i": index, "n": count, "v": [...]} / same for "skip~"
+         (splice: n entries from index replaced by v - inserts and edits
+         in the middle of the sorted holiday ranges)
+       - {"op": "holidays", "v": [...]} / {"op": "skips", "v": [...]}
+         (full list - written by older versions, still replayed)
+    3. Anything else (batch, semester dates, subjects, overrides) changes the
+       structural fingerprint and is written as a new snapshot, as is a
+       journal longer than JOURNAL_COMPACT_EVENTS (compaction)
+    4. Load = snapshot + replay of the journal (a torn last line from a crash
+       is ignored)
+    5. Snapshot and journal carry a generation number (snapshot key
+       "journal_generation", journal header {"op": "generation", "g": n}).
+       Compaction writes the snapshot with the next generation before the
+       old journal is removed, so after a crash in between the leftover
+       journal no longer matches and is discarded instead of being replayed
+       a second time on top of the changes it already holds
+
+    A toggle therefore writes a few dozen bytes, however long the history is.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.journal_events = 0
+        # What is on disk (snapshot + journal), to diff against on save
+        self.persisted = None
+
+    def load(self):
+        data, self.generation, events, stale = self._read_with_journal()
+        self.journal_events = events
+        if stale:
+            # Left over from a compaction interrupted after the snapshot
+            # was written - its changes are already in the snapshot
+            os.remove(self.journal_path)
+        self.persisted = _shadow(data)
+        return data
+
+    def read(self):
+        return self._read_with_journal()[0]
+
+    def save(self, data):
+        shadow = _shadow(data)
+        if self.persisted is None or shadow["structure"] != self.persisted["structure"]:
+            self._write_snapshot(data, shadow)
+            return
+
+        events = _diff(self.persisted, shadow)
+        if not events:
+            return
+        if self.journal_events + len(events) > JOURNAL_COMPACT_EVENTS:
+            self._write_snapshot(data, shadow)
+            return
+
+        lines = [_dump(event) + "\n" for event in events]
+        if not os.path.exists(self.journal_path):
+            lines.insert(0, _dump({"op": "generation", "g": self.generation}) + "\n")
+        with open(self.journal_path, 'a') as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_events += len(events)
+        self.persisted = shadow
+
+    def _write_snapshot(self, data, shadow):
+        """Compaction: write the full snapshot (next generation), then drop the journal - see JsonStorage.save"""
+        super().save(data)
+        self.journal_events = 0
+        self.persisted = shadow
+
+
+# SQLite schema - one row per subject / absence date / holiday / skipped day
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS subjects (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    weekly_count INTEGER,
+    total_override INTEGER,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS overrides (
+    subject TEXT PRIMARY KEY,
+    attended INTEGER NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS absences (
+    subject TEXT NOT NULL,
+    date TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (subject, date)
+);
+CREATE INDEX IF NOT EXISTS idx_absences_date ON absences (date);
+CREATE TABLE IF NOT EXISTS holidays (
+    position INTEGER PRIMARY KEY,
+    date TEXT,
+    start TEXT,
+    end TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_holidays_date ON holidays (date);
+CREATE INDEX IF NOT EXISTS idx_holidays_range ON holidays (start, end);
+CREATE TABLE IF NOT EXISTS skipped_days (
+    position INTEGER PRIMARY KEY,
+    date TEXT,
+    start TEXT,
+    end TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_skipped_days_date ON skipped_days (date);
+CREATE INDEX IF NOT EXISTS idx_skipped_days_range ON skipped_days (start, end);
+"""
+
+# Statistics queries - SQL versions of the counting rules in calculations.py.
+# A day is a holiday / skipped if a legacy single-day row has its date or the
+# last range starting on or before it reaches it (ranges never overlap, so two
+# index seeks instead of a scan); skipped periods are expanded into days
+# (recursive CTE, clipped to :lo..:hi) and joined with the timetable's classes
+# per weekday (temp table "schedule", weekday as strftime('%w'): 0 = Sunday).
+_IN_RANGES = ("(EXISTS (SELECT 1 FROM {table} WHERE date = {day})"
+              " OR COALESCE((SELECT end FROM {table} WHERE start <= {day} ORDER BY start DESC LIMIT 1), '') >= {day})")
+_IS_HOLIDAY = _IN_RANGES.replace("{table}", "holidays").replace("{day}", "{0}")
+_IS_SKIPPED = _IN_RANGES.replace("{table}", "skipped_days").replace("{day}", "{0}")
+
+_DERIVED_ABSENCES = f"""
+skipped(day, last) AS (
+    SELECT MAX(COALESCE(start, date), :lo), MIN(COALESCE(end, date), :hi) FROM skipped_days
+    WHERE COALESCE(start, date) <= :hi AND COALESCE(end, date) >= :lo
+    UNION ALL
+    SELECT date(day, '+1 day'), last FROM skipped WHERE day < last
+),
+derived(date, subject, count) AS (
+    SELECT k.day, s.subject, s.count FROM skipped k
+    JOIN schedule s ON s.weekday = CAST(strftime('%w', k.day) AS INTEGER)
+    WHERE NOT {_IS_HOLIDAY.format("k.day")}
+)"""
+
+# Marks count unless on a holiday or inside a skipped period (the period's
+# classes are counted instead) - compute_summary's absent_count
+_ABSENT_COUNTS_QUERY = f"""
+WITH RECURSIVE {_DERIVED_ABSENCES}
+SELECT subject, SUM(count) FROM (
+    SELECT a.subject, a.count FROM absences a
+    WHERE a.date <= :hi AND NOT {_IS_HOLIDAY.format("a.date")} AND NOT {_IS_SKIPPED.format("a.date")}
+    UNION ALL
+    SELECT subject, count FROM derived
+)
+GROUP BY subject
+"""
+
+# Classes missed per date - attendance_core.get_day_absent_count for every day
+_DATE_ABSENCES_QUERY = f"""
+WITH RECURSIVE {_DERIVED_ABSENCES}
+SELECT a.date, a.subject, a.count FROM absences a
+WHERE a.date BETWEEN :lo AND :hi
+  AND (NOT {_IS_SKIPPED.format("a.date")} OR {_IS_HOLIDAY.format("a.date")})
+UNION ALL
+SELECT date, subject, count FROM derived
+"""
+
+# Subject keys stored in their own columns/tables (the rest goes to "extra")
+_SUBJECT_COLUMNS = ("name", "weekly_count", "total_override", "attendance_override", "absent_dates")
+
+
+class SqliteStorage:
+    """
+    SQLite database next to the JSON file ("data.json" -> "data.db")
+
+    How it works:
+    - Tables: settings, subjects, overrides, absences(subject, date, count),
+      holidays and skipped_days, with indexes on date (and subject via the
+      absences primary key)
+    - Saves are incremental like JournalStorage: only changed absence rows
+      are upserted/deleted; holidays/skipped days tables are rewritten when
+      they change and subjects/settings when the structure changes
+    - If there is no database yet but a JSON file exists, it is imported
+      on first load (the JSON file itself is left untouched and no longer
+      updated); read() opens the database read-only and never imports
+    - get_absent_counts / get_date_absences answer statistics with indexed
+      SQL aggregates instead of scanning Python dicts (see
+      attendance_core.get_query_storage)
+    """
+
+    def __init__(self, path):
+        self.json_path = path
+        self.path = os.path.splitext(path)[0] + ".db"
+        self.persisted = None
+
+    def _connect(self):
+        # One short-lived connection per call - saves run on a timer thread
+        conn = sqlite3.connect(self.path)
+        conn.executescript(SQLITE_SCHEMA)
+        return conn
+
+    def exists(self):
+        return os.path.exists(self.path) or os.path.exists(self.json_path)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            # Compatibility: import the existing JSON data into a new database
+            data = JsonStorage(self.json_path).load()
+            self.persisted = None
+            self.save(data)
+            return data
+
+        conn = self._connect()
+        try:
+            data = self._read_tables(conn)
+        finally:
+            conn.close()
+
+        self.persisted = _shadow(data)
+        return data
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return JsonStorage(self.json_path).read()
+        conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(self.path))}?mode=ro", uri=True)
+        try:
+            return self._read_tables(conn)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _read_tables(conn):
+        """Rebuild the JSON form of the data from the tables"""
+        data = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM settings")}
+
+        overrides = {
+            subject: {"total": total, "attended": attended}
+            for subject, attended, total in conn.execute("SELECT subject, attended, total FROM overrides")
+        }
+        absences = {}
+        for subject, date_str, count in conn.execute(
+                "SELECT subject, date, count FROM absences ORDER BY subject, date"):
+            absences.setdefault(subject, {})[date_str] = count
+
+        data["subjects"] = []
+        for name, weekly_count, total_override, extra in conn.execute(
+                "SELECT name, weekly_count, total_override, extra FROM subjects ORDER BY position"):
+            subject = {
+                "name": name,
+                "weekly_count": weekly_count,
+                "total_override": total_override,
+                "attendance_override": overrides.get(name),
+                "absent_dates": absences.get(name, {}),
+            }
+            subject.update(json.loads(extra) if extra else {})
+            data["subjects"].append(subject)
+
+        data["holidays"] = [json.loads(entry) for (entry,) in
+                            conn.execute("SELECT entry FROM holidays ORDER BY position")]
+        data["skipped_days"] = [json.loads(entry) for (entry,) in
+                                conn.execute("SELECT entry FROM skipped_days ORDER BY position")]
+        return data
+
+    def save(self, data):
+        shadow = _shadow(data)
+        old = self.persisted
+        conn = self._connect()
+        try:
+            with conn:  # One transaction
+                if old is None or shadow["structure"] != old["structure"]:
+                    self._write_structure(conn, data)
+                if old is None:
+                    conn.execute("DELETE FROM absences")
+                    for subject in data.get("subjects", []):
+                        conn.executemany(
+                            "INSERT INTO absences (subject, date, count) VALUES (?, ?, ?)",
+                            [(subject["name"], d, c) for d, c in _absence_counts(subject.get("absent_dates")).items()]
+                        )
+                else:
+                    for event in _diff(old, shadow):
+                        if event["op"] != "absent":
+                            continue
+                        if event["n"] > 0:
+                            conn.execute(
+                                "INSERT OR REPLACE INTO absences (subject, date, count) VALUES (?, ?, ?)",
+                                (event["s"], event["d"], event["n"])
+                            )
+                        else:
+                            conn.execute("DELETE FROM absences WHERE subject = ? AND date = ?",
+                                         (event["s"], event["d"]))
+                if old is None or shadow["holidays"] != old["holidays"]:
+                    self._write_entries(conn, "holidays", data.get("holidays", []))
+                if old is None or shadow["skips"] != old["skips"]:
+                    self._write_entries(conn, "skipped_days", data.get("skipped_days", []))
+        finally:
+            conn.close()
+        self.persisted = shadow
+
+    @staticmethod
+    def _write_structure(conn, data):
+        """Rewrite settings, subjects and overrides"""
+        conn.execute("DELETE FROM settings")
+        conn.executemany(
+            "INSERT INTO settings (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in data.items()
+             if key not in ("subjects", "holidays", "skipped_days")]
+        )
+        conn.execute("DELETE FROM subjects")
+        conn.execute("DELETE FROM overrides")
+        for position, subject in enumerate(data.get("subjects", [])):
+            extra = {k: v for k, v in subject.items() if k not in _SUBJECT_COLUMNS}
+            conn.execute(
+                "INSERT INTO subjects (name, position, weekly_count, total_override, extra) VALUES (?, ?, ?, ?, ?)",
+                (subject["name"], position, subject.get("weekly_count"), subject.get("total_override"),
+                 json.dumps(extra) if extra else None)
+            )
+            override = subject.get("attendance_override")
+            if override is not None:
+                conn.execute(
+                    "INSERT INTO overrides (subject, attended, total) VALUES (?, ?, ?)",
+                    (subject["name"], override["attended"], override["total"])
+                )
+        # Absences of subjects that no longer exist
+        conn.execute("DELETE FROM absences WHERE subject NOT IN (SELECT name FROM subjects)")
+
+    @staticmethod
+    def _write_entries(conn, table, entries):
+        """Rewrite the holidays or skipped_days table (small, order-preserving)"""
+        conn.execute(f"DELETE FROM {table}")
+        conn.executemany(
+            f"INSERT INTO {table} (position, date, start, end, entry) VALUES (?, ?, ?, ?, ?)",
+            [(position, e.get("date"), e.get("start"), e.get("end"), json.dumps(e))
+             for position, e in enumerate(entries)]
+        )
+
+    def get_absent_counts(self, until, weekday_counts):
+        """
+        Absences per subject up to a date - one GROUP BY over the absences
+        and the expanded skipped periods (same rules as compute_summary)
+
+        Args:
+            until: Last date counted "YYYY-MM-DD"
+            weekday_counts: Classes per weekday, 0=Monday ([{subject: count}, ...],
+                            see ScheduleIndex.weekday_counts)
+
+        Returns:
+            dict: {subject: absent count} (subjects without absences are left out)
+        """
+        conn = self._connect_with_schedule(weekday_counts)
+        try:
+            return dict(conn.execute(_ABSENT_COUNTS_QUERY, {"lo": "", "hi": until}))
+        finally:
+            conn.close()
+
+    def get_date_absences(self, start, end, weekday_counts):
+        """
+        Classes missed per date in a range - a range scan on the date index
+        plus the skipped days in it (same rules as get_day_absent_count)
+
+        Returns:
+            dict: {"YYYY-MM-DD": {subject: count}}
+        """
+        conn = self._connect_with_schedule(weekday_counts)
+        try:
+            result = {}
+            for date_str, subject, count in conn.execute(_DATE_ABSENCES_QUERY, {"lo": start, "hi": end}):
+                result.setdefault(date_str, {})[subject] = count
+            return result
+        finally:
+            conn.close()
+
+    def _connect_with_schedule(self, weekday_counts):
+        """Connection with the weekly schedule in a temp table (the timetable isn't stored)"""
+        # Queries only run on a database the app has loaded - no schema script needed
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TEMP TABLE schedule (weekday INTEGER, subject TEXT, count INTEGER)")
+        conn.executemany(
+            "INSERT INTO schedule (weekday, subject, count) VALUES (?, ?, ?)",
+            [((weekday + 1) % 7, subject, count)
+             for weekday, counts in enumerate(weekday_counts) for subject, count in counts.items()]
+        )
+        return conn
+
+
+STORAGE_BACKENDS = {
+    "json": JsonStorage,
+    "journal": JournalStorage,
+    "sqlite": SqliteStorage,
+}
+
+
+def create_storage(path, backend=None):
+    """
+    Create the storage backend for a data file
+
+    Args:
+        path: Data file path
+        backend: Backend name (None = BUNKMETER_STORAGE env var, default "json")
+    """
+    if backend is None:
+        backend = os.environ.get(STORAGE_BACKEND_ENV, "json")
+    storage_class = STORAGE_BACKENDS.get(backend)
+    if storage_class is None:
+        print(f"Unknown storage backend '{backend}', using json")
+        storage_class = JsonStorage
+    return storage_class(path)
+
+
+def read_data_file(path, backend=None):
+    """
+    Read a data file without side effects (see the backends' read())
+
+    Unlike create_storage(path).load(), this never creates a database,
+    imports JSON into one or removes a stale journal - safe for summaries
+    and reports of files another process may be using.
+    """
+    return create_storage(path, backend).read()
@@ -17,16 +17,14 @@ import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
 
-from data_manager import get_app_data, count_subject_classes
+from data_manager import get_app_data, get_subject, list_absent_dates, ALL_CHANGES, CHANGE_OVERRIDES
 from modern_dialogs import messagebox
+from profiling import timed
 from calculations import (
     calculate_attendance, 
-    calculate_safe_skip, 
-    get_attendance_status,
-    get_subject_status,
-    get_overall_status,
-    SUBJECT_THRESHOLD,
-    OVERALL_THRESHOLD
+    compute_summary,
+    get_subject_stats,
+    format_text_report
 )
 
 # Enhanced color scheme
@@ -40,9 +38,16 @@ COLOR_BG_RISK = "#f8d7da"     # Light red background
 COLOR_BG_DARK = "#ffffff"     # White background for modern look
 COLOR_BG_CARD = "#ffffff"     # White card background
 
+ABSENT_DATES_PAGE = 50  # Absent dates added to the details list at a time (more on scroll)
+
 
 class SummaryTab:
     """Enhanced dashboard with visual attendance statistics"""
+    
+    # Change topics this tab displays (see app.ChangeBus) - every statistic
+    # depends on all of the data, so any change refreshes the dashboard
+    WATCHED_CHANGES = ALL_CHANGES
+    
     def __init__(self, notebook, refresh_callback):
         self.notebook = notebook
         self.refresh_all_tabs = refresh_callback
@@ -53,8 +58,8 @@ class SummaryTab:
         self.sort_reverse = False
         self.semester_progress_frame = None
         self.details_panel = None
-        self.subject_data_cache = {}  # Cache for quick lookup
         self.overall_warning_frame = None  # Warning for overall attendance <75%
+        self.row_cache = {}  # subject name (= tree iid) -> (values, tag, absent count) shown
     
     def create(self):
         """Create the enhanced summary dashboard tab"""
@@ -220,6 +225,13 @@ class SummaryTab:
         else:
             self.sort_column = col
             self.sort_reverse = False
+        self.apply_sort()
+    
+    def apply_sort(self):
+        """Order the rows by the current sort column (kept across refreshes)"""
+        col = self.sort_column
+        if col is None:
+            return
         
         # Get all items
         items = [(self.summary_tree.set(item, col), item) for item in self.summary_tree.get_children('')]
@@ -245,9 +257,10 @@ class SummaryTab:
         else:
             items.sort(key=lambda x: str(x[0]).lower(), reverse=self.sort_reverse)
         
-        # Rearrange items
+        # Rearrange items (only the ones not already in place)
         for index, (val, item) in enumerate(items):
-            self.summary_tree.move(item, '', index)
+            if self.summary_tree.index(item) != index:
+                self.summary_tree.move(item, '', index)
     
     def create_progress_bar(self, percentage):
         """Create visual progress bar representation
@@ -322,13 +335,7 @@ class SummaryTab:
             widget.destroy()
         
         app_data = get_app_data()
-        subject_data = None
-        
-        # Find subject
-        for subj in app_data.get("subjects", []):
-            if subj["name"] == subject_name:
-                subject_data = subj
-                break
+        subject_data = get_subject(subject_name)
         
         if not subject_data:
             self.show_details_placeholder()
@@ -367,43 +374,18 @@ class SummaryTab:
             wraplength=260
         ).pack(pady=(5, 10), padx=5)
         
-        # Get cached data or calculate
-        today = datetime.now().strftime("%Y-%m-%d")
-        semester_end = app_data.get("semester_end")
-        end_date = today
-        if semester_end and today > semester_end:
-            end_date = semester_end
-        
-        # Calculate values
-        if subject_data.get("attendance_override"):
-            present = subject_data["attendance_override"]["attended"]
-            total = subject_data["attendance_override"]["total"]
-            is_override = True
-        else:
-            total = count_subject_classes(
-                subject_name,
-                app_data.get("batch", ""),
-                app_data["semester_start"],
-                end_date,
-                app_data.get("holidays", [])
-            )
-            
-            from calculations import parse_date, is_date_in_holidays
-            absent_dates = subject_data.get("absent_dates", [])
-            holidays = app_data.get("holidays", [])
-            absent_count = 0
-            for date_str in absent_dates:
-                if date_str > today:
-                    continue
-                date_obj = parse_date(date_str)
-                if date_obj and not is_date_in_holidays(date_obj, holidays):
-                    absent_count += 1
-            
-            present = max(0, total - absent_count)
-            is_override = False
+        # Same numbers as the table (same engine)
+        # Memoized per (subject, data revision, today) - a row click never recounts
+        subject_stats = get_subject_stats(app_data, subject_name)
+        if subject_stats is None:
+            self.show_details_placeholder()
+            return
         
-        attendance_pct = calculate_attendance(present, total)
-        safe_skip = calculate_safe_skip(present, total)
+        present = subject_stats["present"]
+        total = subject_stats["total"]
+        is_override = subject_stats["is_override"]
+        attendance_pct = subject_stats["percentage"]
+        safe_skip = subject_stats["safe_skip"]
         
         # Stats frame
         stats_frame = tk.LabelFrame(self.details_panel, text="Statistics", font=("Segoe UI", 9, "bold"), bg="#f8f9fa")
@@ -465,49 +447,47 @@ class SummaryTab:
         ).pack(pady=10)
         
         # Absent dates section
-        absent_dates = subject_data.get("absent_dates", [])
+        # One entry per missed class, most recent first (skipped periods included)
+        absent_dates = list_absent_dates(subject_data, reverse=True, app_data=get_app_data())
         if absent_dates:
             dates_frame = tk.LabelFrame(self.details_panel, text=f"Absent Dates ({len(absent_dates)})", 
                                         font=("Segoe UI", 9, "bold"), bg="#f8f9fa")
             dates_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=5)
             
-            # Scrollable list
-            dates_canvas = tk.Canvas(dates_frame, bg="#f8f9fa", height=100, highlightthickness=0)
-            dates_scrollbar = ttk.Scrollbar(dates_frame, orient="vertical", command=dates_canvas.yview)
-            dates_list = tk.Frame(dates_canvas, bg="#f8f9fa")
-            
-            dates_canvas.configure(yscrollcommand=dates_scrollbar.set)
-            dates_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            # One Listbox for the whole list (not a widget per date), filled a
+            # page at a time as it is scrolled towards the end
+            dates_list = tk.Listbox(
+                dates_frame, height=6, font=("Segoe UI", 10), bg="#f8f9fa", fg="#666",
+                relief=tk.FLAT, highlightthickness=0, activestyle="none", selectmode=tk.BROWSE
+            )
+            dates_scrollbar = ttk.Scrollbar(dates_frame, orient="vertical", command=dates_list.yview)
+            dates_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
             dates_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
             
-            dates_canvas.create_window((0, 0), window=dates_list, anchor="nw")
-            dates_list.bind("<Configure>", lambda e: dates_canvas.configure(scrollregion=dates_canvas.bbox("all")))
+            page_pending = [False]
             
-            # Sort dates (most recent first)
-            sorted_dates = sorted(absent_dates, reverse=True)
-            for date_str in sorted_dates[:15]:  # Show max 15 dates
-                try:
-                    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                    formatted = date_obj.strftime("%b %d, %Y (%a)")
-                    tk.Label(
-                        dates_list,
-                        text=f"• {formatted}",
-                        font=("Segoe UI", 10),
-                        bg="#f8f9fa",
-                        fg="#666",
-                        anchor=tk.W
-                    ).pack(anchor=tk.W, padx=5)
-                except:
-                    pass
+            def load_page():
+                page_pending[0] = False
+                if not dates_list.winfo_exists():
+                    return  # Another subject was opened meanwhile
+                start = dates_list.size()
+                dates_list.insert(tk.END, *(f"• {self.format_absent_date(date_str)}"
+                                            for date_str in absent_dates[start:start + ABSENT_DATES_PAGE]))
             
-            if len(absent_dates) > 15:
-                tk.Label(
-                    dates_list,
-                    text=f"... and {len(absent_dates) - 15} more",
-                    font=("Segoe UI", 8, "italic"),
-                    bg="#f8f9fa",
-                    fg="#999"
-                ).pack(anchor=tk.W, padx=5)
+            def on_list_scroll(first, last):
+                dates_scrollbar.set(first, last)
+                # Near the end - append the next page once Tk is idle
+                if float(last) >= 0.9 and dates_list.size() < len(absent_dates) and not page_pending[0]:
+                    page_pending[0] = True
+                    dates_list.after_idle(load_page)
+            
+            def _on_list_mousewheel(event):
+                dates_list.yview_scroll(int(-1*(event.delta/120)), "units")
+                return "break"  # Prevent event from propagating
+            
+            dates_list.configure(yscrollcommand=on_list_scroll)
+            dates_list.bind("<MouseWheel>", _on_list_mousewheel)
+            load_page()
         else:
             tk.Label(
                 self.details_panel,
@@ -524,6 +504,13 @@ class SummaryTab:
             command=lambda: self.open_override_dialog(subject_name)
         ).pack(pady=10)
     
+    def format_absent_date(self, date_str):
+        """Absent date as shown in the details list ("Jan 06, 2025 (Mon)")"""
+        try:
+            return datetime.strptime(date_str, "%Y-%m-%d").strftime("%b %d, %Y (%a)")
+        except ValueError:
+            return date_str
+    
     def update_semester_progress(self):
         """Update the semester progress bar and days left display"""
         # Clear existing
@@ -590,7 +577,6 @@ class SummaryTab:
             progress_container.pack_propagate(False)
             
             # Filled portion
-            fill_width = max(1, int(progress_pct))
             if progress_pct >= 75:
                 bar_color = "#dc3545"  # Red - semester almost over
             elif progress_pct >= 50:
@@ -641,6 +627,11 @@ class SummaryTab:
         except Exception as e:
             print(f"Error updating semester progress: {e}")
 
+    def on_data_changed(self, changes, dates):
+        """Change-bus handler"""
+        self.refresh()
+    
+    @timed()
     def refresh(self):
         """Refresh summary display with enhanced visualizations"""
         app_data = get_app_data()
@@ -651,10 +642,6 @@ class SummaryTab:
         # Update semester progress bar
         self.update_semester_progress()
         
-        # Clear existing items
-        for item in self.summary_tree.get_children():
-            self.summary_tree.delete(item)
-        
         # Clear stats
         for widget in self.stats_frame.winfo_children():
             widget.destroy()
@@ -665,113 +652,16 @@ class SummaryTab:
             self.overall_warning_frame = None
         
         if not app_data.get("semester_start"):
+            self.update_rows([])
             return
         
-        # Calculate metrics
-        total_attendance_pct = 0
-        at_risk_count = 0
-        warning_count = 0
-        safe_count = 0
-        
-        # CRITICAL: Use TODAY as end date, not semester end
-        # This ensures future dates within semester are NOT counted in attendance
-        today = datetime.now().strftime("%Y-%m-%d")
-        semester_end = app_data.get("semester_end")
+        # Calculate metrics for all subjects in one pass
+        summary = compute_summary(app_data)
+        at_risk_count = summary["at_risk_count"]
+        warning_count = summary["warning_count"]
+        safe_count = summary["safe_count"]
         
-        # Calculate weeks only up to TODAY (ignore future dates)
-        calculation_end_date = today
-        if semester_end and today > semester_end:
-            # If semester already ended, use semester end date
-            calculation_end_date = semester_end
-        
-        for subject_data in app_data.get("subjects", []):
-            name = subject_data["name"]
-            
-            # Check if manual override exists
-            if subject_data.get("attendance_override") is not None:
-                override_data = subject_data["attendance_override"]
-                present = override_data["attended"]
-                total = override_data["total"]
-                mode_text = "📝 Manual"
-            else:
-                # Calculate total classes using ACCURATE day-by-day counting
-                # This counts actual occurrences of the subject's scheduled days
-                # instead of simple weekly_count × weeks estimation
-                if subject_data.get("total_override") is not None:
-                    total = subject_data["total_override"]
-                else:
-                    batch = app_data.get("batch", "")
-                    holidays = app_data.get("holidays", [])
-                    total = count_subject_classes(
-                        name, 
-                        batch, 
-                        app_data["semester_start"], 
-                        calculation_end_date, 
-                        holidays
-                    )
-                
-                # Calculate present classes (total - absent)
-                # CRITICAL: Only count absences up to TODAY (ignore future dates)
-                # Exclude dates that fall on holidays from absent count
-                from calculations import parse_date, is_date_in_holidays
-                all_absent_dates = subject_data.get("absent_dates", [])
-                absent_count = 0
-                holidays = app_data.get("holidays", [])
-                for date_str in all_absent_dates:
-                    # Ignore future dates - only count past absences
-                    if date_str > today:
-                        continue
-                    date_obj = parse_date(date_str)
-                    if date_obj and not is_date_in_holidays(date_obj, holidays):
-                        absent_count += 1
-                
-                present = max(0, total - absent_count)
-                mode_text = "Auto"
-            
-            attendance_pct = calculate_attendance(present, total)
-            safe_skip = calculate_safe_skip(present, total)
-            status, color = get_attendance_status(attendance_pct)
-            
-            # Create progress bar
-            progress_bar = self.create_progress_bar(attendance_pct)
-            
-            # Determine status icon and category (60% threshold for subjects)
-            if attendance_pct >= 75:
-                status_icon = "Excellent"
-                tag = "safe"
-                safe_count += 1
-            elif attendance_pct >= 60:
-                status_icon = "Safe"
-                tag = "warning"
-                warning_count += 1
-            else:
-                status_icon = "At Risk"
-                tag = "risk"
-                at_risk_count += 1
-            
-            total_attendance_pct += attendance_pct
-            
-            # Calculate remaining classes till semester end using accurate counting
-            # Count from tomorrow to semester end
-            if semester_end and today < semester_end:
-                from datetime import timedelta
-                tomorrow = (datetime.strptime(today, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
-                remaining_classes = count_subject_classes(
-                    name,
-                    app_data.get("batch", ""),
-                    tomorrow,
-                    semester_end,
-                    app_data.get("holidays", [])
-                )
-            else:
-                remaining_classes = 0
-            
-            item = self.summary_tree.insert(
-                "", tk.END,
-                values=(name, present, total, remaining_classes, f"{attendance_pct:.1f}%", progress_bar, status_icon, safe_skip, mode_text)
-            )
-            
-            self.summary_tree.item(item, tags=(tag,))
+        self.update_rows(summary["subjects"])
         
         # Configure tags with background colors
         self.summary_tree.tag_configure("safe", background=COLOR_BG_SAFE, foreground="#155724")
@@ -779,9 +669,8 @@ class SummaryTab:
         self.summary_tree.tag_configure("risk", background=COLOR_BG_RISK, foreground="#721c24")
         
         # Display enhanced stats cards
-        subjects_list = app_data.get("subjects", [])
-        num_subjects = len(subjects_list)
-        avg_attendance = total_attendance_pct / num_subjects if num_subjects > 0 else 0
+        num_subjects = len(summary["subjects"])
+        avg_attendance = summary["average"]
         
         # Determine average color (75% threshold for overall)
         if avg_attendance >= 85:
@@ -813,6 +702,67 @@ class SummaryTab:
                 fg="#721c24"
             ).pack(pady=4)
     
+    def update_rows(self, rows):
+        """
+        Bring the table in line with the summary rows, touching only what changed
+        
+        How it works:
+        1. Each row's tree item id is the subject name
+        2. Rows of subjects that are gone are deleted, new subjects inserted
+        3. Existing rows are re-set only if their values, tag or absent count
+           differ from what is shown (row_cache), so an absence in one
+           subject updates one row
+        4. The order follows the data, or the active sort column
+        
+        If the selected subject's row changed, its details panel is redrawn
+        (or cleared if the subject is gone).
+        
+        Args:
+            rows: Summary rows (see calculations.compute_summary)
+        """
+        wanted = {}
+        for stats in rows:
+            attendance_pct = stats["percentage"]
+            mode_text = "📝 Manual" if stats["is_override"] else "Auto"
+            values = (stats["name"], stats["present"], stats["total"], stats["remaining"],
+                      f"{attendance_pct:.1f}%", self.create_progress_bar(attendance_pct),
+                      stats["status"], stats["safe_skip"], mode_text)
+            wanted[stats["name"]] = (values, stats["tag"], stats["absent_count"])
+        
+        selected = self.summary_tree.selection()
+        changed = set()
+        
+        # Subjects that no longer exist
+        stale = [item for item in self.row_cache if item not in wanted]
+        if stale:
+            self.summary_tree.delete(*stale)
+            for item in stale:
+                del self.row_cache[item]
+        
+        for index, (name, row) in enumerate(wanted.items()):
+            values, tag, _ = row
+            shown = self.row_cache.get(name)
+            if shown is None:
+                self.summary_tree.insert("", index, iid=name, values=values, tags=(tag,))
+            elif shown != row:
+                self.summary_tree.item(name, values=values, tags=(tag,))
+            else:
+                continue
+            self.row_cache[name] = row
+            changed.add(name)
+        
+        if self.sort_column is not None:
+            self.apply_sort()
+        else:
+            for index, name in enumerate(wanted):
+                if self.summary_tree.index(name) != index:
+                    self.summary_tree.move(name, "", index)
+        
+        if selected and selected[0] in stale:
+            self.show_details_placeholder()
+        elif selected and selected[0] in changed:
+            self.show_subject_details(selected[0])
+    
     def get_bg_color(self, percentage):
         """Get background color based on percentage (60% threshold for subjects)"""
         if percentage >= 75:
@@ -880,66 +830,7 @@ class SummaryTab:
             filename = f"attendance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
             
             with open(filename, 'w') as f:
-                # Header
-                f.write("=" * 70 + "\n")
-                f.write("BUNKMETER - ATTENDANCE REPORT\n")
-                f.write("=" * 70 + "\n\n")
-                f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Batch: {app_data.get('batch', 'N/A')}\n")
-                f.write(f"Semester: {app_data.get('semester_start', 'N/A')} to {app_data.get('semester_end', 'N/A')}\n\n")
-                
-                f.write("-" * 70 + "\n")
-                f.write(f"{'Subject':<20} {'Present':>10} {'Classes Held':>12} {'%':>8} {'Status':>10}\n")
-                f.write("-" * 70 + "\n")
-                
-                # Use TODAY as end date for calculations (not semester end)
-                today = datetime.now().strftime("%Y-%m-%d")
-                end_date = today
-                if app_data.get("semester_end") and today > app_data["semester_end"]:
-                    end_date = app_data["semester_end"]
-                
-                for subject_data in app_data.get("subjects", []):
-                    name = subject_data["name"]
-                    
-                    # Check if manual override exists
-                    if subject_data.get("attendance_override") is not None:
-                        override_data = subject_data["attendance_override"]
-                        present = override_data["attended"]
-                        total = override_data["total"]
-                    else:
-                        # Use accurate day-by-day counting
-                        if subject_data.get("total_override") is not None:
-                            total = subject_data["total_override"]
-                        else:
-                            total = count_subject_classes(
-                                name,
-                                app_data.get("batch", ""),
-                                app_data["semester_start"],
-                                end_date,
-                                app_data.get("holidays", [])
-                            )
-                        
-                        # Exclude dates that fall on holidays and future dates from absent count
-                        from calculations import parse_date, is_date_in_holidays
-                        all_absent_dates = subject_data.get("absent_dates", [])
-                        absent_count = 0
-                        holidays = app_data.get("holidays", [])
-                        for date_str in all_absent_dates:
-                            # Ignore future dates
-                            if date_str > today:
-                                continue
-                            date_obj = parse_date(date_str)
-                            if date_obj and not is_date_in_holidays(date_obj, holidays):
-                                absent_count += 1
-                        
-                        present = max(0, total - absent_count)
-                    
-                    attendance_pct = calculate_attendance(present, total)
-                    status, _ = get_attendance_status(attendance_pct)
-                    
-                    f.write(f"{name:<20} {present:>10} {total:>10} {attendance_pct:>7.1f}% {status:>10}\n")
-                
-                f.write("-" * 70 + "\n")
+                f.write(format_text_report(app_data))
             
             messagebox.showinfo("Success", f"Report exported to {filename}")
         
@@ -962,16 +853,10 @@ class SummaryTab:
     
     def open_override_dialog(self, subject_name):
         """Open dialog to manually override attendance data"""
-        from data_manager import get_app_data, save_data
+        from data_manager import get_app_data, save_data, get_subject
         
         app_data = get_app_data()
-        subject_data = None
-        
-        # Find the subject
-        for subj in app_data.get("subjects", []):
-            if subj["name"] == subject_name:
-                subject_data = subj
-                break
+        subject_data = get_subject(subject_name)
         
         if not subject_data:
             messagebox.showerror("Error", "Subject not found")
@@ -1019,44 +904,11 @@ class SummaryTab:
             fg="#2c3e50"
         ).pack(anchor=tk.W, pady=(0, 15))
         
-        # Calculate current values using TODAY as end date
-        today = datetime.now().strftime("%Y-%m-%d")
-        end_date = today
-        if app_data.get("semester_end") and today > app_data["semester_end"]:
-            end_date = app_data["semester_end"]
-        
-        # Check for existing override
+        # Current values - same engine as the dashboard (TODAY as end date)
         has_override = subject_data.get("attendance_override") is not None
-        if has_override:
-            current_attended = subject_data["attendance_override"]["attended"]
-            current_total = subject_data["attendance_override"]["total"]
-        else:
-            # Use accurate day-by-day counting
-            if subject_data.get("total_override") is not None:
-                current_total = subject_data["total_override"]
-            else:
-                current_total = count_subject_classes(
-                    subject_name,
-                    app_data.get("batch", ""),
-                    app_data["semester_start"],
-                    end_date,
-                    app_data.get("holidays", [])
-                )
-            
-            # Exclude dates that fall on holidays and future dates from absent count
-            from calculations import parse_date, is_date_in_holidays
-            all_absent_dates = subject_data.get("absent_dates", [])
-            absent_count = 0
-            holidays = app_data.get("holidays", [])
-            for date_str in all_absent_dates:
-                # Ignore future dates
-                if date_str > today:
-                    continue
-                date_obj = parse_date(date_str)
-                if date_obj and not is_date_in_holidays(date_obj, holidays):
-                    absent_count += 1
-            
-            current_attended = max(0, current_total - absent_count)
+        stats = get_subject_stats(app_data, subject_name)
+        current_attended = stats["present"] if stats else 0
+        current_total = stats["total"] if stats else 0
         
         current_pct = calculate_attendance(current_attended, current_total)
         
@@ -1149,7 +1001,7 @@ class SummaryTab:
                 }
                 
                 save_data()
-                self.refresh_all_tabs()
+                self.refresh_all_tabs(CHANGE_OVERRIDES)
                 dialog.destroy()
                 messagebox.showinfo("Success", f"Manual override applied for {subject_name}")
                 
@@ -1164,7 +1016,7 @@ class SummaryTab:
             if messagebox.askyesno("Confirm", "Remove manual override and use calculated attendance?"):
                 subject_data["attendance_override"] = None
                 save_data()
-                self.refresh_all_tabs()
+                self.refresh_all_tabs(CHANGE_OVERRIDES)
                 dialog.destroy()
                 messagebox.showinfo("Success", f"Manual override removed for {subject_name}")
         
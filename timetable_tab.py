@@ -8,9 +8,14 @@ GitHub: https://github.com/siddhesh17b
 
 import tkinter as tk
 from tkinter import ttk
-from data_manager import get_app_data, get_active_timetable
+from data_manager import get_app_data, get_active_timetable, get_schedule_index, \
+    CHANGE_TIMETABLE, CHANGE_BATCH
+from profiling import timed
 
 class TimetableTab:
+    # Change topics this tab displays (see app.ChangeBus)
+    WATCHED_CHANGES = frozenset({CHANGE_TIMETABLE, CHANGE_BATCH})
+    
     def __init__(self, parent, refresh_callback=None):
         self.parent = parent
         self.refresh_callback = refresh_callback
@@ -113,6 +118,11 @@ class TimetableTab:
         canvas.bind("<Enter>", _bind_mousewheel)
         canvas.bind("<Leave>", _unbind_mousewheel)
     
+    def on_data_changed(self, changes, dates):
+        """Change-bus handler - the grid only depends on timetable and batch"""
+        self.refresh()
+    
+    @timed()
     def refresh(self):
         app_data = get_app_data()
         batch = app_data.get("batch", "B1/B3")
@@ -179,35 +189,13 @@ class TimetableTab:
     
     def get_subject_for_slot(self, day, time_slot, batch):
         """Get subject for a specific day/time slot, handling batch-specific entries"""
-        day_upper = day.upper()
-        active_timetable = get_active_timetable()
-        if day_upper not in active_timetable:
-            return ""
-        
-        subject_cell = active_timetable[day_upper].get(time_slot, "")
+        # Batch-specific entries ("Subject (BatchA) / Subject (BatchB)") are already
+        # resolved for this batch by the compiled schedule index
+        subject_cell = get_schedule_index(batch).get_slot_cell(day, time_slot)
         if not subject_cell:
             return ""
         if "Lunch" in subject_cell:
             return "LUNCH"
-        
-        # Handle batch-specific entries: "Subject (BatchA) / Subject (BatchB)"
-        if "/" in subject_cell and "(" in subject_cell:
-            parts = subject_cell.split("/")
-            # Normalize batch for comparison (remove spaces, slashes, hyphens)
-            normalized_batch = batch.replace("/", "").replace(" ", "").replace("-", "").replace("&", "").upper()
-            
-            for part in parts:
-                # Normalize part for comparison
-                normalized_part = part.replace("&", "").replace(" ", "").replace("-", "").upper()
-                
-                # Check if normalized batch appears in the normalized part
-                if normalized_batch in normalized_part:
-                    # Extract subject name (before the parenthesis)
-                    if "(" in part:
-                        return self.extract_subject_name(part.split("(")[0].strip())
-                    return self.extract_subject_name(part.strip())
-            return ""  # Batch not found in any part
-        
         return self.extract_subject_name(subject_cell)
     
     def extract_subject_name(self, cell_value):